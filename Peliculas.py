@@ -1,13 +1,23 @@
 import csv
 import os
+from typing import TYPE_CHECKING
 
-import readchar
-from rich import box
-from rich.console import Console
-from rich.panel import Panel
-from rich.table import Table
+from almacenamiento import (  # noqa: F401
+    CAMPOS_PELICULAS,
+    obtener_almacenamiento,
+    safe_write_csv,
+)
+from consola import Consola, importar_perezoso
+from metricas import instrumentar
+from paginacion import mostrar_paginado
+from perfilado import perfilar_accion
+from validacion import TEXTO_PELICULA
 
-console = Console()
+if TYPE_CHECKING:
+    from rich.table import Table
+
+readchar = importar_perezoso("readchar")
+console = Consola()
 
 
 def validar_texto(valor: str, campo: str, max_len: int = 120) -> str:
@@ -17,10 +27,7 @@ def validar_texto(valor: str, campo: str, max_len: int = 120) -> str:
     if len(valor) > max_len:
         raise ValueError(f"{campo} demasiado largo (máx {max_len} caracteres).")
     # permitimos letras, números, espacios, guiones, comas y puntos
-    import re
-
-    patron = r"^[A-Za-zÁÉÍÓÚáéíóú0-9\s\-\.,]+$"
-    if not re.match(patron, valor):
+    if not TEXTO_PELICULA.fullmatch(valor):
         raise ValueError(f"{campo} contiene caracteres inválidos.")
     return valor
 
@@ -53,20 +60,6 @@ def verificar_encabezados_csv(ruta: str, expected):
     return True, None
 
 
-def safe_write_csv(ruta: str, fieldnames: list, rows: list):
-    temp = ruta + ".tmp"
-    try:
-        with open(temp, "w", encoding="utf-8", newline="") as f:
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
-            writer.writeheader()
-            writer.writerows(rows)
-        os.replace(temp, ruta)
-    except Exception:
-        if os.path.exists(temp):
-            os.remove(temp)
-        raise
-
-
 def limpiar_pantalla():
     os.system("cls" if os.name == "nt" else "clear")
 
@@ -91,25 +84,17 @@ def inicializar_csv():
 
 
 def agregar_pelicula():
+    from rich.panel import Panel
+
     limpiar_pantalla()
     console.print(
         Panel("[bold cyan]Agregar nueva película[/bold cyan]", border_style="cyan")
     )
 
     try:
+        almacen = obtener_almacenamiento()
         # ID
-        if os.path.exists("peliculas.csv"):
-            with open(
-                "peliculas.csv", mode="r", newline="", encoding="utf-8"
-            ) as archivo:
-                reader = csv.DictReader(archivo)
-                ids = [int(fila["ID"]) for fila in reader if fila["ID"].isdigit()]
-                if ids:
-                    id_ = str(max(ids) + 1)
-                else:
-                    id_ = "1"
-        else:
-            id_ = "1"
+        id_ = almacen.siguiente_id_pelicula()
         console.print(f"[cyan]ID de película asignado automáticamente: {id_}[/cyan]")
 
         titulo_input = input("Título de la película (o '-' para salir): ")
@@ -134,17 +119,7 @@ def agregar_pelicula():
             "Genero": genero,
             "Duracion_min": str(duracion),
         }
-        rows = []
-        if os.path.exists("peliculas.csv"):
-            with open(
-                "peliculas.csv", mode="r", newline="", encoding="utf-8"
-            ) as archivo:
-                reader = csv.DictReader(archivo)
-                rows = list(reader)
-        rows.append(row)
-        safe_write_csv(
-            "peliculas.csv", ["ID", "Titulo", "Genero", "Duracion_min"], rows
-        )
+        almacen.insertar_pelicula(row)
 
         console.print(
             f"[bold yellow]Película '{titulo}' agregada correctamente.[/bold yellow]"
@@ -157,39 +132,17 @@ def agregar_pelicula():
 
 
 def listar_peliculas():
+    from rich.panel import Panel
+
     limpiar_pantalla()
     console.print(
         Panel("[bold yellow]Listado de películas[/bold yellow]", border_style="yellow")
     )
 
     try:
-        with open("peliculas.csv", mode="r", newline="", encoding="utf-8") as archivo:
-            reader = csv.DictReader(archivo)
-
-            if not reader.fieldnames or [
-                h.strip().lower() for h in reader.fieldnames
-            ] != [e.lower() for e in ["ID", "Titulo", "Genero", "Duracion_min"]]:
-                console.print(
-                    "[yellow]Encabezados inesperados en peliculas.csv[/yellow]"
-                )
-                pausar()
-                return
-
-            filas = []
-            for fila in reader:
-                # ignorar filas malformadas
-                if not all(
-                    k in fila for k in ["ID", "Titulo", "Genero", "Duracion_min"]
-                ):
-                    continue
-                filas.append(
-                    {
-                        k: (fila.get(k) or "").strip()
-                        for k in ["ID", "Titulo", "Genero", "Duracion_min"]
-                    }
-                )
-    except FileNotFoundError:
-        console.print("[yellow]El archivo peliculas.csv no existe.[/yellow]")
+        filas = obtener_almacenamiento().iterar_peliculas(estricto=True)
+    except ValueError:
+        console.print("[yellow]Encabezados inesperados en peliculas.csv[/yellow]")
         pausar()
         return
     except Exception as e:
@@ -197,27 +150,15 @@ def listar_peliculas():
         pausar()
         return
 
-    if not filas:
-        console.print("[yellow]No hay películas registradas.[/yellow]")
+    try:
+        hubo_filas = mostrar_paginado(console, filas, _tabla_peliculas)
+    except Exception as e:
+        console.print(f"[red]Error leyendo el archivo: {e}[/red]")
         pausar()
         return
 
-    tabla = Table(
-        show_header=True,
-        header_style="bold bright_white",
-        box=box.ROUNDED,
-        border_style="bold dark_blue",
-        show_lines=True,
-    )
-    tabla.add_column("ID", justify="center", style="orange3")
-    tabla.add_column("Título", justify="left", style="bold grey70")
-    tabla.add_column("Género", justify="center", style="bold grey70")
-    tabla.add_column("Duración (min)", justify="center", style="bold grey70")
-
-    for fila in filas:
-        tabla.add_row(fila["ID"], fila["Titulo"], fila["Genero"], fila["Duracion_min"])
-
-    console.print(tabla)
+    if not hubo_filas:
+        console.print("[yellow]No hay películas registradas.[/yellow]")
     pausar()
 
 
@@ -232,47 +173,37 @@ def actualizar_pelicula():
         if id_buscar.isdigit():
             break
         console.print("[yellow]El ID debe contener solo números.[/yellow]")
-    peliculas = []
-    encontrado = False
-
-    with open("peliculas.csv", mode="r", encoding="utf-8") as archivo:
-        reader = csv.DictReader(archivo)
-        for fila in reader:
-            if fila["ID"] == id_buscar:
-                console.print(f"[cyan]Película encontrada:[/cyan] {fila['Titulo']}")
-
-                # Validar nuevas entradas
-                nuevo_titulo = input(
-                    "Nuevo título (dejar vacío para mantener el actual): "
-                ).strip()
-                nuevo_genero = input(
-                    "Nuevo género (dejar vacío para mantener el actual): "
-                ).strip()
-                nueva_duracion = input(
-                    "Nueva duración (min, dejar vacío para mantener el actual): "
-                ).strip()
-
-                if nuevo_titulo:
-                    fila["Titulo"] = nuevo_titulo
-                if nuevo_genero:
-                    fila["Genero"] = nuevo_genero
-                if nueva_duracion:
-                    if nueva_duracion.isdigit() and int(nueva_duracion) > 0:
-                        fila["Duracion_min"] = nueva_duracion
-                    else:
-                        console.print(
-                            "[yellow]Duración inválida, se mantiene el valor anterior.[/yellow]"
-                        )
-
-                encontrado = True
-            peliculas.append(fila)
-
-    if encontrado:
-        # normalizar rows ya llenadas en 'peliculas'
+    almacen = obtener_almacenamiento()
+    fila = almacen.obtener_pelicula(id_buscar)
+
+    if fila:
+        console.print(f"[cyan]Película encontrada:[/cyan] {fila['Titulo']}")
+
+        # Validar nuevas entradas
+        nuevo_titulo = input(
+            "Nuevo título (dejar vacío para mantener el actual): "
+        ).strip()
+        nuevo_genero = input(
+            "Nuevo género (dejar vacío para mantener el actual): "
+        ).strip()
+        nueva_duracion = input(
+            "Nueva duración (min, dejar vacío para mantener el actual): "
+        ).strip()
+
+        if nuevo_titulo:
+            fila["Titulo"] = nuevo_titulo
+        if nuevo_genero:
+            fila["Genero"] = nuevo_genero
+        if nueva_duracion:
+            if nueva_duracion.isdigit() and int(nueva_duracion) > 0:
+                fila["Duracion_min"] = nueva_duracion
+            else:
+                console.print(
+                    "[yellow]Duración inválida, se mantiene el valor anterior.[/yellow]"
+                )
+
         try:
-            safe_write_csv(
-                "peliculas.csv", ["ID", "Titulo", "Genero", "Duracion_min"], peliculas
-            )
+            almacen.actualizar_pelicula(fila)
             console.print("[bold yellow]Película actualizada con éxito.[/bold yellow]")
         except Exception as e:
             console.print(f"[red]Error al guardar cambios: {e}[/red]")
@@ -295,22 +226,7 @@ def eliminar_pelicula():
             break
         console.print("[red]El ID debe contener solo números.[/red]")
 
-    peliculas = []
-    eliminado = False
-
-    with open("peliculas.csv", mode="r", encoding="utf-8") as archivo:
-        reader = csv.DictReader(archivo)
-        for fila in reader:
-            if fila["ID"] != id_eliminar:
-                peliculas.append(fila)
-            else:
-                eliminado = True
-
-    with open("peliculas.csv", mode="w", newline="", encoding="utf-8") as archivo:
-        fieldnames = ["ID", "Titulo", "Genero", "Duracion_min"]
-        writer = csv.DictWriter(archivo, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(peliculas)
+    eliminado = obtener_almacenamiento().eliminar_pelicula(id_eliminar)
 
     if eliminado:
         console.print("[bold yellow]Película eliminada correctamente.[/bold yellow]")
@@ -325,23 +241,24 @@ def eliminar_pelicula():
 # Menú interactivo
 
 
+@instrumentar("cargar_peliculas_dict")
 def cargar_peliculas_dict():
     peliculas = {}
-    if not os.path.exists("peliculas.csv"):
-        return peliculas
-    with open("peliculas.csv", mode="r", newline="", encoding="utf-8") as archivo:
-        reader = csv.DictReader(archivo)
-        for fila in reader:
-            peliculas[fila["ID"]] = fila["Titulo"]
+    for fila in obtener_almacenamiento().leer_peliculas():
+        peliculas[fila["ID"]] = fila["Titulo"]
     return peliculas
 
 
 def menu_peliculas():
+    from rich import box
+    from rich.table import Table
+
     inicializar_csv()
     opciones = [
         "AGREGAR PELÍCULA",
         "LISTAR PELÍCULAS",
         "BUSCAR POR GÉNERO",
+        "BUSCAR POR TÍTULO",
         "ACTUALIZAR PELÍCULA",
         "ELIMINAR PELÍCULA",
         "VOLVER AL MENÚ PRINCIPAL",
@@ -383,68 +300,25 @@ def menu_peliculas():
         elif tecla == readchar.key.DOWN:
             seleccionado = (seleccionado + 1) % len(opciones)
         elif tecla == readchar.key.ENTER or tecla == readchar.key.CR:
-            if seleccionado == 0:
-                agregar_pelicula()
-            elif seleccionado == 1:
-                listar_peliculas()
-            elif seleccionado == 2:
-                buscar_peliculas_por_genero()
-            elif seleccionado == 3:
-                actualizar_pelicula()
-            elif seleccionado == 4:
-                eliminar_pelicula()
-            elif seleccionado == 5:
+            if seleccionado == 6:
                 break
-
-
-def buscar_peliculas_por_genero():
-    """
-    Buscar películas por género (coincidencia exacta)
-    """
-    limpiar_pantalla()
-    console.print(
-        Panel(
-            "[bold gold1]Buscar películas por género[/bold gold1]",
-            border_style="dark_red",
-        )
-    )
-
-    # Validar existencia del archivo
-    if not os.path.exists("peliculas.csv"):
-        console.print("[yellow]No existe el archivo 'peliculas.csv'.[/yellow]")
-        pausar()
-        return
-
-    # Validar y leer encabezados del CSV
-    try:
-        with open("peliculas.csv", mode="r", newline="", encoding="utf-8") as archivo:
-            reader = csv.DictReader(archivo)
-            expected = ["ID", "Titulo", "Genero", "Duracion_min"]
-            if reader.fieldnames is None:
-                console.print(
-                    "[yellow]El archivo 'peliculas.csv' está vacío o malformado.[/yellow]"
-                )
-                pausar()
-                return
-            headers = [h.strip() for h in reader.fieldnames]
-            if headers != expected:
-                console.print(
-                    f"[yellow]Encabezados inesperados en 'peliculas.csv'. Se esperaban: {expected}[/yellow]"
-                )
-                console.print(f"[yellow]Encabezados encontrados: {headers}[/yellow]")
-                pausar()
-                return
-    except Exception as e:
-        console.print(f"[red]Error al leer 'peliculas.csv': {e}[/red]")
-        pausar()
-        return
-
-    # Pedir género y validarlo
+            accion, ejecutar = [
+                ("agregar_pelicula", agregar_pelicula),
+                ("listar_peliculas", listar_peliculas),
+                ("buscar_por_genero", buscar_peliculas_por_genero),
+                ("buscar_por_titulo", buscar_peliculas_por_titulo),
+                ("actualizar_pelicula", actualizar_pelicula),
+                ("eliminar_pelicula", eliminar_pelicula),
+            ][seleccionado]
+            with perfilar_accion(accion):
+                ejecutar()
+
+
+def _pedir_busqueda(etiqueta: str):
+    """Pide el texto a buscar; devuelve None si el usuario cancela."""
     while True:
-        genero_buscar = input(
-            "Ingresa el género a buscar (coincidencia exacta): "
-        ).strip()
-        if not genero_buscar:
+        texto = input(f"Ingresa el {etiqueta} a buscar: ").strip()
+        if not texto:
             console.print(
                 "[yellow]Búsqueda vacía. Intenta nuevamente o escribe 'q' para cancelar.[/yellow]"
             )
@@ -456,55 +330,19 @@ def buscar_peliculas_por_genero():
             if opcion in ("s", "q"):
                 console.print("[dim]Búsqueda cancelada.[/dim]")
                 pausar()
-                return
+                return None
             continue
-        if len(genero_buscar) > 50:
+        if len(texto) > 50:
             console.print(
-                "[yellow]El género es demasiado largo. Usa menos de 50 caracteres.[/yellow]"
+                f"[yellow]El {etiqueta} es demasiado largo. Usa menos de 50 caracteres.[/yellow]"
             )
             continue
-        break
+        return texto
 
-    genero_buscar_norm = genero_buscar.lower()
 
-    # Buscar y recopilar resultados por coincidencia exacta
-    resultados = []
-    try:
-        with open("peliculas.csv", mode="r", newline="", encoding="utf-8") as archivo:
-            reader = csv.DictReader(archivo)
-            for fila in reader:
-                if not all(
-                    k in fila for k in ("ID", "Titulo", "Genero", "Duracion_min")
-                ):
-                    continue  # Salta filas malformadas
-
-                genero_fila_raw = fila.get("Genero") or ""
-                genero_fila = genero_fila_raw.strip().lower()
-
-                if genero_buscar_norm == genero_fila:
-                    id_val = (fila.get("ID") or "").strip()
-                    titulo_val = (fila.get("Titulo") or "").strip()
-                    duracion_val = (fila.get("Duracion_min") or "").strip()
-                    resultados.append(
-                        {
-                            "ID": id_val,
-                            "Titulo": titulo_val,
-                            "Genero": genero_fila_raw.strip(),
-                            "Duracion_min": duracion_val,
-                        }
-                    )
-    except Exception as e:
-        console.print(f"[red]Error al procesar 'peliculas.csv': {e}[/red]")
-        pausar()
-        return
-
-    # Mostrar resultados
-    if not resultados:
-        console.print(
-            f"[yellow]No se encontraron películas con el género exacto: '{genero_buscar}'[/yellow]"
-        )
-        pausar()
-        return
+def _tabla_peliculas(filas) -> "Table":
+    from rich import box
+    from rich.table import Table
 
     tabla = Table(
         show_header=True,
@@ -518,8 +356,76 @@ def buscar_peliculas_por_genero():
     tabla.add_column("Género", justify="center", style="bold grey70")
     tabla.add_column("Duración (min)", justify="center", style="bold grey70")
 
-    for fila in resultados:
-        tabla.add_row(fila["ID"], fila["Titulo"], fila["Genero"], fila["Duracion_min"])
+    for fila in filas:
+        tabla.add_row(*((fila.get(k) or "").strip() for k in CAMPOS_PELICULAS))
+    return tabla
+
+
+def _buscar(campo: str, etiqueta: str, modos: tuple):
+    """
+    Busca en el índice del catálogo probando los modos en orden (por ejemplo
+    exacto, luego prefijo, luego palabras) hasta que alguno dé resultados.
+    """
+    from rich.panel import Panel
+
+    limpiar_pantalla()
+    console.print(
+        Panel(
+            f"[bold gold1]Buscar películas por {etiqueta}[/bold gold1]",
+            border_style="dark_red",
+        )
+    )
+
+    texto = _pedir_busqueda(etiqueta)
+    if texto is None:
+        return
 
-    console.print(tabla)
+    # Buscar en el índice del catálogo validando los encabezados
+    resultados = []
+    modo_usado = modos[0]
+    try:
+        almacenamiento = obtener_almacenamiento()
+        for modo_usado in modos:
+            resultados = almacenamiento.buscar_peliculas(
+                texto, campo=campo, modo=modo_usado, estricto=True
+            )
+            if resultados:
+                break
+    except ValueError as e:
+        console.print(f"[yellow]{e}[/yellow]")
+        pausar()
+        return
+    except Exception as e:
+        console.print(f"[red]Error al leer 'peliculas.csv': {e}[/red]")
+        pausar()
+        return
+
+    if not resultados:
+        console.print(
+            f"[yellow]No se encontraron películas con el {etiqueta}: '{texto}'[/yellow]"
+        )
+        pausar()
+        return
+
+    if modo_usado != "exacto":
+        console.print(
+            f"[dim]Sin coincidencia exacta; se muestran coincidencias por {modo_usado}.[/dim]"
+        )
+    mostrar_paginado(console, resultados, _tabla_peliculas)
     pausar()
+
+
+def buscar_peliculas_por_genero():
+    """
+    Buscar películas por género, sin distinguir mayúsculas ni tildes.
+    Si no hay coincidencia exacta, prueba por prefijo y luego por palabras.
+    """
+    _buscar("Genero", "género", ("exacto", "prefijo", "palabras"))
+
+
+def buscar_peliculas_por_titulo():
+    """
+    Buscar películas por título: cada palabra ingresada debe ser el comienzo
+    de alguna palabra del título ("señor an" encuentra "El Señor de los Anillos").
+    """
+    _buscar("Titulo", "título", ("palabras",))
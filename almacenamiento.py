@@ -0,0 +1,1169 @@
+"""
+Capa de almacenamiento de películas, funciones y reservas.
+
+Hay dos motores intercambiables con la misma interfaz:
+- "archivos": peliculas.csv, funciones.csv y reservas.json (por defecto).
+- "sqlite": una base SQLite en modo WAL con claves primarias indexadas,
+  donde cada alta, cambio o baja toca una sola fila.
+
+El motor se elige con la variable de entorno CINE_ALMACENAMIENTO y la ruta
+de la base con CINE_BD. Los CSV/JSON siguen siendo el formato de
+importación/exportación: python -m almacenamiento importar|exportar
+
+Con CINE_RESERVAS=diario el motor de archivos agrega cada reserva como una
+línea de reservas.jsonl en vez de reescribir reservas.json (ver DiarioReservas).
+
+Los ids nuevos salen de secuencias persistentes (ver secuencias.py y la
+tabla `secuencias` de SQLite): no se repiten aunque se borren filas ni con
+varios procesos escribiendo a la vez.
+"""
+
+import csv
+import json
+import os
+import threading
+from contextlib import contextmanager
+
+from asientos import serializar_asientos
+from bloqueo import bloquear
+from cache_datos import CacheArchivos
+from catalogo import CatalogoPeliculas
+from escritura import agrupar_escrituras, escribir_atomico, sincronizar_archivo
+from indice_ocupados import DIR_INDICE_OCUPADOS, IndiceOcupados
+from metricas import instrumentar
+from secuencias import Secuencia, mayor_id
+
+ARCHIVO_PELICULAS = "peliculas.csv"
+ARCHIVO_FUNCIONES = "funciones.csv"
+ARCHIVO_RESERVAS = "reservas.json"
+ARCHIVO_DIARIO = "reservas.jsonl"
+ARCHIVO_BD = "cine.db"
+
+# Tamaño a partir del cual el diario de reservas se compacta en reservas.json
+LIMITE_DIARIO_BYTES = 1_000_000
+
+CAMPOS_PELICULAS = ["ID", "Titulo", "Genero", "Duracion_min"]
+CAMPOS_FUNCIONES = [
+    "id_funcion",
+    "id_pelicula",
+    "sala",
+    "hora",
+    "asientos_disponibles",
+    "asientos",
+]
+
+
+class AsientosOcupados(Exception):
+    """Alguno de los asientos pedidos ya estaba vendido al confirmar la reserva."""
+
+    def __init__(self, asientos):
+        self.asientos = sorted(asientos)
+        super().__init__(f"Asientos ya ocupados: {', '.join(self.asientos)}")
+
+
+def safe_write_csv(ruta: str, fieldnames: list, rows: list):
+    def escribir(f):
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        writer.writerows(rows)
+
+    escribir_atomico(ruta, escribir, encoding="utf-8", newline="")
+
+
+def escribir_json(ruta: str, datos):
+    escribir_atomico(
+        ruta,
+        lambda f: json.dump(datos, f, indent=4, ensure_ascii=False),
+        encoding="utf-8",
+    )
+
+
+def _filas_de_archivo(archivo, reader):
+    """Genera las filas del CSV y cierra el archivo al terminar o al cerrarse."""
+    with archivo:
+        for fila in reader:
+            yield fila
+
+
+def fila_funcion(fn: dict) -> dict:
+    """Normaliza una función al formato de columnas de funciones.csv."""
+    fila = {k: v for k, v in fn.items() if k in CAMPOS_FUNCIONES}
+    fila["id_funcion"] = str(fila.get("id_funcion", ""))
+    fila["id_pelicula"] = str(fila.get("id_pelicula", ""))
+    fila["sala"] = str(fila.get("sala", ""))
+    fila["hora"] = str(fila.get("hora", ""))
+    fila["asientos_disponibles"] = str(fila.get("asientos_disponibles", 0))
+    asientos = fila.get("asientos", {})
+    if not isinstance(asientos, str):
+        asientos = serializar_asientos(asientos)
+    fila["asientos"] = asientos
+    return fila
+
+
+class DiarioReservas:
+    """
+    Reservas en modo diario: una instantánea (reservas.json, mismo formato de
+    siempre) más un diario JSON Lines con una línea por reserva.
+    Reservar solo agrega una línea con fsync; cuando el diario supera
+    `limite_bytes` se compacta dentro de la instantánea.
+    """
+
+    def __init__(
+        self,
+        ruta_instantanea: str = ARCHIVO_RESERVAS,
+        ruta_diario: str = ARCHIVO_DIARIO,
+        limite_bytes: int = LIMITE_DIARIO_BYTES,
+    ):
+        self.ruta_instantanea = ruta_instantanea
+        self.ruta_diario = ruta_diario
+        self.limite_bytes = limite_bytes
+        self._ultimo_instantanea = None  # (firma del archivo, último id)
+
+    def _leer_instantanea(self) -> list:
+        if not os.path.exists(self.ruta_instantanea):
+            return []
+        with open(self.ruta_instantanea, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _leer_diario(self):
+        """Recorre las líneas válidas del diario (ignora una línea cortada)."""
+        if not os.path.exists(self.ruta_diario):
+            return
+        with open(self.ruta_diario, "r", encoding="utf-8") as f:
+            for linea in f:
+                try:
+                    reserva = json.loads(linea)
+                except ValueError:
+                    continue
+                if isinstance(reserva, dict):
+                    yield reserva
+
+    @staticmethod
+    def _max_id(reservas) -> int:
+        return max((int(r.get("id_reserva") or 0) for r in reservas), default=0)
+
+    def _ultimo_id_instantanea(self) -> int:
+        try:
+            st = os.stat(self.ruta_instantanea)
+        except FileNotFoundError:
+            return 0
+        firma = (st.st_mtime_ns, st.st_size)
+        if self._ultimo_instantanea is None or self._ultimo_instantanea[0] != firma:
+            self._ultimo_instantanea = (
+                firma,
+                self._max_id(self._leer_instantanea()),
+            )
+        return self._ultimo_instantanea[1]
+
+    def _ultimo_id_diario(self) -> int:
+        """Lee solo el final del diario para obtener el último id."""
+        try:
+            f = open(self.ruta_diario, "rb")
+        except FileNotFoundError:
+            return 0
+        with f:
+            fin = f.seek(0, os.SEEK_END)
+            inicio = fin
+            datos = b""
+            while inicio > 0:
+                inicio = max(0, inicio - 4096)
+                f.seek(inicio)
+                datos = f.read(fin - inicio)
+                # Hace falta al menos una línea completa antes de la última
+                if datos.count(b"\n") >= 2 or inicio == 0:
+                    break
+        for linea in reversed(datos.split(b"\n")):
+            try:
+                reserva = json.loads(linea)
+            except ValueError:
+                continue
+            if isinstance(reserva, dict):
+                return int(reserva.get("id_reserva") or 0)
+        return 0
+
+    def leer(self) -> list:
+        """Instantánea + las reservas del diario que aún no se compactaron."""
+        reservas = self._leer_instantanea()
+        ultimo = self._max_id(reservas)
+        for reserva in self._leer_diario():
+            if int(reserva.get("id_reserva") or 0) > ultimo:
+                reservas.append(reserva)
+        return reservas
+
+    def ultimo_id(self) -> int:
+        return max(self._ultimo_id_diario(), self._ultimo_id_instantanea())
+
+    def agregar(
+        self, nombre_cliente: str, id_funcion: str, asientos: list, id_reserva=None
+    ) -> dict:
+        if id_reserva is None:
+            id_reserva = self.ultimo_id() + 1
+        nueva_reserva = {
+            "id_reserva": id_reserva,
+            "nombre_cliente": nombre_cliente,
+            "id_funcion": id_funcion,
+            "asientos": asientos,
+            "cantidad_boletos": len(asientos),
+        }
+        linea = json.dumps(nueva_reserva, ensure_ascii=False) + "\n"
+        with open(self.ruta_diario, "ab+") as f:
+            tamano = f.seek(0, os.SEEK_END)
+            if tamano:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    # Una escritura anterior quedó cortada: cerrar esa línea
+                    f.write(b"\n")
+            f.write(linea.encode("utf-8"))
+            sincronizar_archivo(f)
+            tamano = f.tell()
+        if tamano >= self.limite_bytes:
+            self.compactar()
+        return nueva_reserva
+
+    def reemplazar(self, reservas: list):
+        """Escribe la instantánea completa y vacía el diario."""
+        escribir_json(self.ruta_instantanea, reservas)
+        # Si se corta aquí, leer() descarta las líneas ya incluidas por id
+        escribir_atomico(self.ruta_diario, lambda f: None, encoding="utf-8")
+
+    def compactar(self) -> int:
+        """Pasa el diario a la instantánea. Devuelve el total de reservas."""
+        reservas = self.leer()
+        self.reemplazar(reservas)
+        return len(reservas)
+
+
+def numerar_reservas(actuales: list, nuevas, ids=None) -> list:
+    """
+    Arma las reservas nuevas con los `ids` dados (por defecto, a partir del
+    mayor existente). Lanza AsientosOcupados si alguna repite un asiento ya
+    vendido (o vendido antes en el mismo lote).
+    """
+    ocupados = {}
+    for r in actuales:
+        ocupados.setdefault(str(r.get("id_funcion")), set()).update(
+            r.get("asientos", [])
+        )
+    if ids is None:
+        siguiente = DiarioReservas._max_id(actuales) + 1
+        ids = range(siguiente, siguiente + len(nuevas))
+    resultado = []
+    for (nombre_cliente, id_funcion, asientos), id_reserva in zip(nuevas, ids):
+        vendidos = ocupados.setdefault(str(id_funcion), set())
+        conflictos = vendidos.intersection(asientos)
+        if conflictos:
+            raise AsientosOcupados(conflictos)
+        vendidos.update(asientos)
+        resultado.append(
+            {
+                "id_reserva": id_reserva,
+                "nombre_cliente": nombre_cliente,
+                "id_funcion": id_funcion,
+                "asientos": list(asientos),
+                "cantidad_boletos": len(asientos),
+            }
+        )
+    return resultado
+
+
+class AlmacenamientoArchivos:
+    """
+    Motor basado en los archivos CSV/JSON de siempre.
+    Lo leído queda en una CacheArchivos validada por mtime/tamaño, y cada
+    escritura deja ahí el contenido nuevo, así que leer sin cambios no
+    vuelve a parsear los archivos. Las lecturas devuelven copias de las filas.
+
+    Cada entidad tiene su secuencia de ids en "<archivo>.seq" (o en
+    `dir_secuencias`). Películas y funciones pueden reservar `bloque_ids`
+    ids por proceso; las reservas van de a una porque el diario necesita
+    ids crecientes en el orden en que se agregan.
+    """
+
+    nombre = "archivos"
+
+    def __init__(
+        self,
+        ruta_peliculas: str = ARCHIVO_PELICULAS,
+        ruta_funciones: str = ARCHIVO_FUNCIONES,
+        ruta_reservas: str = ARCHIVO_RESERVAS,
+        modo_reservas: str = "json",
+        ruta_diario: str = ARCHIVO_DIARIO,
+        dir_indice: str = DIR_INDICE_OCUPADOS,
+        dir_secuencias: str = None,
+        bloque_ids: int = 1,
+    ):
+        self.ruta_peliculas = ruta_peliculas
+        self.ruta_funciones = ruta_funciones
+        self.ruta_reservas = ruta_reservas
+        if modo_reservas not in ("json", "diario"):
+            raise ValueError(f"Modo de reservas desconocido: {modo_reservas}")
+        self.diario = (
+            DiarioReservas(ruta_reservas, ruta_diario)
+            if modo_reservas == "diario"
+            else None
+        )
+        self.rutas_reservas = [ruta_reservas] + ([ruta_diario] if self.diario else [])
+        self.cache = CacheArchivos()
+        self.indice = IndiceOcupados(
+            dir_indice, self.rutas_reservas, self.leer_reservas
+        )
+
+        def secuencia(ruta: str, semilla, bloque: int = 1) -> Secuencia:
+            if dir_secuencias:
+                ruta = os.path.join(dir_secuencias, os.path.basename(ruta))
+            return Secuencia(ruta + ".seq", semilla, bloque)
+
+        self.secuencias = {
+            "peliculas": secuencia(
+                ruta_peliculas, lambda: self.catalogo().max_id, bloque_ids
+            ),
+            "funciones": secuencia(
+                ruta_funciones,
+                lambda: mayor_id(fn.get("id_funcion") for fn in self.leer_funciones()),
+                bloque_ids,
+            ),
+            "reservas": secuencia(ruta_reservas, self._ultimo_id_reserva),
+        }
+
+    # ------------------- Ids -------------------
+
+    def siguiente_id(self, entidad: str) -> int:
+        """Próximo id de "peliculas", "funciones" o "reservas"; nunca se repite."""
+        return self.secuencias[entidad].siguiente()
+
+    def reservar_ids(self, entidad: str, cantidad: int) -> range:
+        """Reserva `cantidad` ids consecutivos de la entidad."""
+        return self.secuencias[entidad].reservar(cantidad)
+
+    def _ultimo_id_reserva(self) -> int:
+        if self.diario:
+            return self.diario.ultimo_id()
+        return DiarioReservas._max_id(self.leer_reservas())
+
+    # ------------------- Películas -------------------
+
+    @instrumentar("leer_csv_peliculas")
+    def _cargar_peliculas(self) -> CatalogoPeliculas:
+        if not os.path.exists(self.ruta_peliculas):
+            return CatalogoPeliculas()
+        with open(
+            self.ruta_peliculas, mode="r", newline="", encoding="utf-8"
+        ) as archivo:
+            reader = csv.DictReader(archivo)
+            return CatalogoPeliculas(reader, list(reader.fieldnames or []))
+
+    def catalogo(self) -> CatalogoPeliculas:
+        """Catálogo indexado por ID (se lee del archivo solo si cambió)."""
+        return self.cache.leer(
+            "peliculas", [self.ruta_peliculas], self._cargar_peliculas
+        )
+
+    def leer_peliculas(self, estricto: bool = False) -> list:
+        """
+        Devuelve las filas de películas como dicts.
+        Con estricto=True lanza ValueError si los encabezados no coinciden.
+        """
+        catalogo = self._catalogo_validado(estricto)
+        return [dict(fila) for fila in catalogo.filas()]
+
+    def _catalogo_validado(self, estricto: bool) -> CatalogoPeliculas:
+        catalogo = self.catalogo()
+        if estricto and catalogo.encabezados is not None:
+            headers = [h.strip().lower() for h in catalogo.encabezados]
+            if headers != [c.lower() for c in CAMPOS_PELICULAS]:
+                raise ValueError(
+                    f"Encabezados inesperados en {self.ruta_peliculas}: {headers}"
+                )
+        return catalogo
+
+    def buscar_peliculas(
+        self,
+        consulta: str,
+        campo: str = "Genero",
+        modo: str = "exacto",
+        estricto: bool = False,
+    ) -> list:
+        """
+        Busca por género o título en el índice invertido del catálogo.
+        `modo` es "exacto", "prefijo" o "palabras" (ver catalogo.IndiceTexto).
+        """
+        catalogo = self._catalogo_validado(estricto)
+        if campo == "Titulo":
+            filas = catalogo.buscar_titulo(consulta, modo)
+        else:
+            filas = catalogo.buscar_genero(consulta, modo)
+        return [dict(fila) for fila in filas]
+
+    def iterar_peliculas(self, estricto: bool = False):
+        """
+        Recorre las películas sin armar la lista completa. Si el catálogo ya
+        está en memoria se recorre ese; si no, se lee el CSV fila a fila.
+        Con estricto=True los encabezados se validan antes de devolver.
+        """
+        catalogo = self.cache.vigente("peliculas", [self.ruta_peliculas])
+        if catalogo is not None:
+            self._catalogo_validado(estricto)
+            return (dict(fila) for fila in catalogo.filas())
+        if not os.path.exists(self.ruta_peliculas):
+            return iter(())
+        archivo = open(self.ruta_peliculas, mode="r", newline="", encoding="utf-8")
+        reader = csv.DictReader(archivo)
+        headers = [h.strip().lower() for h in reader.fieldnames or []]
+        if estricto and headers != [c.lower() for c in CAMPOS_PELICULAS]:
+            archivo.close()
+            raise ValueError(
+                f"Encabezados inesperados en {self.ruta_peliculas}: {headers}"
+            )
+        return _filas_de_archivo(archivo, reader)
+
+    def obtener_pelicula(self, id_pelicula: str):
+        fila = self.catalogo().obtener(id_pelicula)
+        return dict(fila) if fila else None
+
+    def siguiente_id_pelicula(self) -> str:
+        return str(self.siguiente_id("peliculas"))
+
+    def insertar_pelicula(self, fila: dict):
+        with bloquear(self.ruta_peliculas):
+            self.secuencias["peliculas"].asegurar(mayor_id([fila.get("ID")]))
+            catalogo = self.catalogo()
+            safe_write_csv(
+                self.ruta_peliculas, CAMPOS_PELICULAS, catalogo.filas() + [fila]
+            )
+            catalogo.agregar(dict(fila))
+            self._cachear_peliculas(catalogo)
+
+    def actualizar_pelicula(self, fila: dict) -> bool:
+        with bloquear(self.ruta_peliculas):
+            catalogo = self.catalogo()
+            actual = catalogo.obtener(fila["ID"])
+            if actual is None:
+                return False
+            filas = [fila if f is actual else f for f in catalogo.filas()]
+            safe_write_csv(self.ruta_peliculas, CAMPOS_PELICULAS, filas)
+            catalogo.actualizar(dict(fila))
+            self._cachear_peliculas(catalogo)
+            return True
+
+    def eliminar_pelicula(self, id_pelicula: str) -> bool:
+        with bloquear(self.ruta_peliculas):
+            catalogo = self.catalogo()
+            eliminada = catalogo.obtener(id_pelicula)
+            if eliminada is None:
+                return False
+            restantes = [f for f in catalogo.filas() if f is not eliminada]
+            safe_write_csv(self.ruta_peliculas, CAMPOS_PELICULAS, restantes)
+            catalogo.eliminar(id_pelicula)
+            self._cachear_peliculas(catalogo)
+            return True
+
+    def reemplazar_peliculas(self, filas: list):
+        with bloquear(self.ruta_peliculas):
+            self.secuencias["peliculas"].asegurar(mayor_id(f.get("ID") for f in filas))
+            safe_write_csv(self.ruta_peliculas, CAMPOS_PELICULAS, filas)
+            self._cachear_peliculas(
+                CatalogoPeliculas((dict(f) for f in filas), list(CAMPOS_PELICULAS))
+            )
+
+    def _cachear_peliculas(self, catalogo: CatalogoPeliculas):
+        catalogo.encabezados = list(CAMPOS_PELICULAS)
+        self.cache.escribir("peliculas", [self.ruta_peliculas], catalogo)
+
+    # ------------------- Funciones -------------------
+
+    @instrumentar("leer_csv_funciones")
+    def _cargar_funciones(self) -> list:
+        if not os.path.exists(self.ruta_funciones):
+            return []
+        with open(self.ruta_funciones, newline="", encoding="utf-8") as f:
+            return list(csv.DictReader(f))
+
+    def leer_funciones(self) -> list:
+        filas = self.cache.leer(
+            "funciones", [self.ruta_funciones], self._cargar_funciones
+        )
+        return [dict(fila) for fila in filas]
+
+    def obtener_funcion(self, id_funcion: str):
+        filas = self.cache.leer(
+            "funciones", [self.ruta_funciones], self._cargar_funciones
+        )
+        for fila in filas:
+            if str(fila.get("id_funcion", "")).strip() == id_funcion:
+                return dict(fila)  # solo se copia la encontrada
+        return None
+
+    def guardar_funciones(self, funciones: list, modificadas=None):
+        """
+        Guarda las funciones. Si se indican las modificadas, se releen las
+        del archivo bajo el bloqueo y solo se reemplazan o agregan esas (por
+        id_funcion), para no pisar lo que otra terminal guardó mientras
+        tanto; si no, se reescribe `funciones` completa.
+        """
+        if modificadas is None:
+            self.reemplazar_funciones(funciones)
+            return
+        with bloquear(self.ruta_funciones):
+            cambios = {str(fn.get("id_funcion", "")).strip(): fn for fn in modificadas}
+            filas = [
+                cambios.pop(str(fila.get("id_funcion", "")).strip(), fila)
+                for fila in self.leer_funciones()
+            ]
+            filas.extend(cambios.values())
+            self.reemplazar_funciones(filas)
+
+    def reemplazar_funciones(self, funciones: list):
+        with bloquear(self.ruta_funciones):
+            filas = [fila_funcion(fn) for fn in funciones]
+            self.secuencias["funciones"].asegurar(
+                mayor_id(fn["id_funcion"] for fn in filas)
+            )
+            safe_write_csv(self.ruta_funciones, CAMPOS_FUNCIONES, filas)
+            self.cache.escribir("funciones", [self.ruta_funciones], filas)
+
+    # ------------------- Reservas -------------------
+
+    @instrumentar("leer_reservas")
+    def _cargar_reservas(self) -> list:
+        if self.diario:
+            return self.diario.leer()
+        if not os.path.exists(self.ruta_reservas):
+            return []
+        with open(self.ruta_reservas, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def leer_reservas(self) -> list:
+        reservas = self.cache.leer(
+            "reservas", self.rutas_reservas, self._cargar_reservas
+        )
+        return [dict(reserva) for reserva in reservas]
+
+    def iterar_reservas(self):
+        """
+        Recorre las reservas de a una. reservas.json es un único documento
+        JSON, así que se carga (o se toma de la caché) entero; lo que se
+        evita es copiar y dibujar todas las filas de una vez.
+        """
+        reservas = self.cache.leer(
+            "reservas", self.rutas_reservas, self._cargar_reservas
+        )
+        return (dict(reserva) for reserva in reservas)
+
+    def ocupados_de(self, id_funcion: str) -> set:
+        return self.indice.ocupados_de(id_funcion)
+
+    def ocupados_por_funcion(self, ids_funcion) -> dict:
+        return {
+            id_funcion: self.indice.ocupados_de(id_funcion)
+            for id_funcion in ids_funcion
+        }
+
+    def insertar_reserva(
+        self, nombre_cliente: str, id_funcion: str, asientos: list
+    ) -> dict:
+        """
+        Guarda la reserva si ninguno de sus asientos se vendió mientras
+        tanto (compare-and-set bajo el bloqueo de reservas); si no, lanza
+        AsientosOcupados sin escribir nada.
+        """
+        with bloquear(self.ruta_reservas):
+            firma_previa = self.indice.firma_reservas() if self.indice.cargado else None
+            if self.diario:
+                conflictos = self.indice.ocupados_de(id_funcion) & set(asientos)
+                if conflictos:
+                    raise AsientosOcupados(conflictos)
+                previas = self.cache.vigente("reservas", self.rutas_reservas)
+                nueva_reserva = self.diario.agregar(
+                    nombre_cliente,
+                    id_funcion,
+                    asientos,
+                    self.siguiente_id("reservas"),
+                )
+                if previas is not None:
+                    previas.append(dict(nueva_reserva))
+                    self.cache.escribir("reservas", self.rutas_reservas, previas)
+            else:
+                reservas = self.leer_reservas()
+                conflictos = set(asientos).intersection(
+                    asiento
+                    for r in reservas
+                    if str(r.get("id_funcion")) == str(id_funcion)
+                    for asiento in r.get("asientos", [])
+                )
+                if conflictos:
+                    raise AsientosOcupados(conflictos)
+                nueva_reserva = {
+                    "id_reserva": self.siguiente_id("reservas"),
+                    "nombre_cliente": nombre_cliente,
+                    "id_funcion": id_funcion,
+                    "asientos": asientos,
+                    "cantidad_boletos": len(asientos),
+                }
+                reservas.append(nueva_reserva)
+                self.reemplazar_reservas(reservas)
+            self.indice.registrar(id_funcion, asientos, firma_previa)
+            return nueva_reserva
+
+    def reemplazar_reservas(self, reservas: list):
+        with bloquear(self.ruta_reservas):
+            self.secuencias["reservas"].asegurar(DiarioReservas._max_id(reservas))
+            if self.diario:
+                self.diario.reemplazar(reservas)
+            else:
+                escribir_json(self.ruta_reservas, reservas)
+            self.cache.escribir(
+                "reservas", self.rutas_reservas, [dict(r) for r in reservas]
+            )
+
+    # ------------------- Carga masiva -------------------
+
+    def importar_lote(self, peliculas=(), funciones=(), reservas=()) -> list:
+        """
+        Agrega en bloque filas ya validadas: cada archivo se reescribe una
+        sola vez y todo se confirma en un único commit agrupado, o nada si
+        alguna reserva choca con un asiento vendido. `reservas` son tuplas
+        (nombre_cliente, id_funcion, asientos); devuelve las creadas.
+        """
+        nuevas = []
+        try:
+            with agrupar_escrituras():
+                if peliculas:
+                    with bloquear(self.ruta_peliculas):
+                        self.reemplazar_peliculas(
+                            self.catalogo().filas() + list(peliculas)
+                        )
+                if funciones:
+                    with bloquear(self.ruta_funciones):
+                        self.reemplazar_funciones(
+                            self.leer_funciones() + list(funciones)
+                        )
+                if reservas:
+                    with bloquear(self.ruta_reservas):
+                        actuales = self.leer_reservas()
+                        reservas = list(reservas)
+                        nuevas = numerar_reservas(
+                            actuales,
+                            reservas,
+                            self.reservar_ids("reservas", len(reservas)),
+                        )
+                        self.reemplazar_reservas(actuales + nuevas)
+        except BaseException:
+            # La caché quedó con el contenido de los .tmp descartados
+            self.cache.invalidar()
+            raise
+        return nuevas
+
+
+ESQUEMA_SQLITE = """
+CREATE TABLE IF NOT EXISTS peliculas (
+    id INTEGER PRIMARY KEY,
+    titulo TEXT NOT NULL,
+    genero TEXT NOT NULL,
+    duracion_min TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS funciones (
+    id_funcion TEXT PRIMARY KEY,
+    id_pelicula TEXT NOT NULL,
+    sala TEXT NOT NULL,
+    hora TEXT NOT NULL,
+    asientos_disponibles TEXT NOT NULL,
+    asientos TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS reservas (
+    id_reserva INTEGER PRIMARY KEY,
+    nombre_cliente TEXT NOT NULL,
+    id_funcion TEXT NOT NULL,
+    asientos TEXT NOT NULL,
+    cantidad_boletos INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_reservas_funcion ON reservas (id_funcion);
+CREATE TABLE IF NOT EXISTS asientos_ocupados (
+    id_funcion TEXT NOT NULL,
+    asiento TEXT NOT NULL,
+    id_reserva INTEGER NOT NULL,
+    PRIMARY KEY (id_funcion, asiento)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS secuencias (
+    nombre TEXT PRIMARY KEY,
+    ultimo INTEGER NOT NULL
+);
+"""
+
+# Mayor id existente de cada entidad, para crear su fila en `secuencias`
+MAYOR_ID_SQLITE = {
+    "peliculas": "SELECT MAX(id) FROM peliculas",
+    "funciones": (
+        "SELECT MAX(CAST(id_funcion AS INTEGER)) FROM funciones "
+        "WHERE id_funcion != '' AND id_funcion NOT GLOB '*[^0-9]*'"
+    ),
+    "reservas": "SELECT MAX(id_reserva) FROM reservas",
+}
+
+
+class AlmacenamientoSQLite:
+    """
+    Motor SQLite: una fila por película, función y reserva.
+    Las altas y cambios son operaciones de una sola fila sobre índices.
+    Los ids salen de la tabla `secuencias`, que se avanza en la misma
+    transacción que el alta.
+    """
+
+    nombre = "sqlite"
+
+    def __init__(self, ruta: str = ARCHIVO_BD):
+        import sqlite3  # solo si se usa este motor: acelera el arranque
+
+        self.ruta = ruta
+        self.conexion = sqlite3.connect(ruta, check_same_thread=False)
+        self.conexion.row_factory = sqlite3.Row
+        self.conexion.execute("PRAGMA journal_mode=WAL")
+        self.conexion.execute("PRAGMA synchronous=NORMAL")
+        self.conexion.executescript(ESQUEMA_SQLITE)
+        self._completar_indice_ocupados()
+        self._catalogo = None  # (firma de la base, CatalogoPeliculas)
+
+    def _completar_indice_ocupados(self):
+        """Llena asientos_ocupados en bases creadas antes de existir la tabla."""
+        if self.conexion.execute("SELECT 1 FROM asientos_ocupados LIMIT 1").fetchone():
+            return
+        if self.conexion.execute("SELECT 1 FROM reservas LIMIT 1").fetchone():
+            with self.conexion:
+                self._reconstruir_ocupados()
+
+    def _reconstruir_ocupados(self):
+        self.conexion.execute("DELETE FROM asientos_ocupados")
+        cursor = self.conexion.execute(
+            "SELECT id_reserva, id_funcion, asientos FROM reservas"
+        )
+        self.conexion.executemany(
+            "INSERT OR IGNORE INTO asientos_ocupados (id_funcion, asiento, "
+            "id_reserva) VALUES (?, ?, ?)",
+            (
+                (fila["id_funcion"], asiento, fila["id_reserva"])
+                for fila in cursor.fetchall()
+                for asiento in json.loads(fila["asientos"])
+            ),
+        )
+
+    def cerrar(self):
+        self.conexion.close()
+
+    @contextmanager
+    def _transaccion_inmediata(self):
+        """
+        BEGIN IMMEDIATE toma el bloqueo de escritura al empezar, así que
+        nadie puede cambiar lo consultado antes de escribir.
+        """
+        self.conexion.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self.conexion.rollback()
+            raise
+        self.conexion.commit()
+
+    # ------------------- Ids -------------------
+
+    def siguiente_id(self, entidad: str) -> int:
+        return self.reservar_ids(entidad, 1)[0]
+
+    def reservar_ids(self, entidad: str, cantidad: int) -> range:
+        with self._transaccion_inmediata():
+            return self._reservar_ids(entidad, cantidad)
+
+    def _reservar_ids(self, entidad: str, cantidad: int) -> range:
+        """Avanza la secuencia dentro de una transacción ya abierta."""
+        fila = self.conexion.execute(
+            "SELECT ultimo FROM secuencias WHERE nombre = ?", (entidad,)
+        ).fetchone()
+        if fila is None:
+            (ultimo,) = self.conexion.execute(MAYOR_ID_SQLITE[entidad]).fetchone()
+            ultimo = ultimo or 0
+            self.conexion.execute(
+                "INSERT INTO secuencias (nombre, ultimo) VALUES (?, ?)",
+                (entidad, ultimo + cantidad),
+            )
+        else:
+            ultimo = fila[0]
+            self.conexion.execute(
+                "UPDATE secuencias SET ultimo = ? WHERE nombre = ?",
+                (ultimo + cantidad, entidad),
+            )
+        return range(ultimo + 1, ultimo + 1 + cantidad)
+
+    def _asegurar_id(self, entidad: str, maximo: int):
+        """Evita que la secuencia entregue ids <= maximo (ya usados)."""
+        if maximo:
+            self.conexion.execute(
+                "UPDATE secuencias SET ultimo = MAX(ultimo, ?) WHERE nombre = ?",
+                (maximo, entidad),
+            )
+
+    # ------------------- Películas -------------------
+
+    @staticmethod
+    def _pelicula(fila) -> dict:
+        return {
+            "ID": str(fila["id"]),
+            "Titulo": fila["titulo"],
+            "Genero": fila["genero"],
+            "Duracion_min": fila["duracion_min"],
+        }
+
+    def leer_peliculas(self, estricto: bool = False) -> list:
+        cursor = self.conexion.execute(
+            "SELECT id, titulo, genero, duracion_min FROM peliculas ORDER BY id"
+        )
+        return [self._pelicula(fila) for fila in cursor]
+
+    def catalogo(self) -> CatalogoPeliculas:
+        """
+        Catálogo en memoria con sus índices de búsqueda. Se rearma solo si la
+        base cambió: data_version detecta commits de otras conexiones y
+        total_changes los de esta.
+        """
+        (version,) = self.conexion.execute("PRAGMA data_version").fetchone()
+        firma = (version, self.conexion.total_changes)
+        if self._catalogo is None or self._catalogo[0] != firma:
+            catalogo = CatalogoPeliculas(self.leer_peliculas(), list(CAMPOS_PELICULAS))
+            self._catalogo = (firma, catalogo)
+        return self._catalogo[1]
+
+    def buscar_peliculas(
+        self,
+        consulta: str,
+        campo: str = "Genero",
+        modo: str = "exacto",
+        estricto: bool = False,
+    ) -> list:
+        catalogo = self.catalogo()
+        if campo == "Titulo":
+            filas = catalogo.buscar_titulo(consulta, modo)
+        else:
+            filas = catalogo.buscar_genero(consulta, modo)
+        return [dict(fila) for fila in filas]
+
+    def iterar_peliculas(self, estricto: bool = False):
+        cursor = self.conexion.execute(
+            "SELECT id, titulo, genero, duracion_min FROM peliculas ORDER BY id"
+        )
+        return (self._pelicula(fila) for fila in cursor)
+
+    def obtener_pelicula(self, id_pelicula: str):
+        if not str(id_pelicula).isdigit():
+            return None
+        fila = self.conexion.execute(
+            "SELECT id, titulo, genero, duracion_min FROM peliculas WHERE id = ?",
+            (int(id_pelicula),),
+        ).fetchone()
+        return self._pelicula(fila) if fila else None
+
+    def siguiente_id_pelicula(self) -> str:
+        return str(self.siguiente_id("peliculas"))
+
+    def insertar_pelicula(self, fila: dict):
+        with self.conexion:
+            self._asegurar_id("peliculas", int(fila["ID"]))
+            self.conexion.execute(
+                "INSERT INTO peliculas (id, titulo, genero, duracion_min) "
+                "VALUES (?, ?, ?, ?)",
+                (int(fila["ID"]), fila["Titulo"], fila["Genero"], fila["Duracion_min"]),
+            )
+
+    def actualizar_pelicula(self, fila: dict) -> bool:
+        with self.conexion:
+            cursor = self.conexion.execute(
+                "UPDATE peliculas SET titulo = ?, genero = ?, duracion_min = ? "
+                "WHERE id = ?",
+                (fila["Titulo"], fila["Genero"], fila["Duracion_min"], int(fila["ID"])),
+            )
+        return cursor.rowcount > 0
+
+    def eliminar_pelicula(self, id_pelicula: str) -> bool:
+        with self.conexion:
+            cursor = self.conexion.execute(
+                "DELETE FROM peliculas WHERE id = ?", (int(id_pelicula),)
+            )
+        return cursor.rowcount > 0
+
+    def reemplazar_peliculas(self, filas: list):
+        with self.conexion:
+            self._asegurar_id("peliculas", mayor_id(f.get("ID") for f in filas))
+            self.conexion.execute("DELETE FROM peliculas")
+            self.conexion.executemany(
+                "INSERT INTO peliculas (id, titulo, genero, duracion_min) "
+                "VALUES (?, ?, ?, ?)",
+                (
+                    (int(f["ID"]), f["Titulo"], f["Genero"], f["Duracion_min"])
+                    for f in filas
+                    if (f.get("ID") or "").strip().isdigit()
+                ),
+            )
+
+    # ------------------- Funciones -------------------
+
+    def leer_funciones(self) -> list:
+        cursor = self.conexion.execute(
+            "SELECT id_funcion, id_pelicula, sala, hora, asientos_disponibles, "
+            "asientos FROM funciones ORDER BY rowid"
+        )
+        return [dict(fila) for fila in cursor]
+
+    def obtener_funcion(self, id_funcion: str):
+        fila = self.conexion.execute(
+            "SELECT id_funcion, id_pelicula, sala, hora, asientos_disponibles, "
+            "asientos FROM funciones WHERE id_funcion = ?",
+            (id_funcion,),
+        ).fetchone()
+        return dict(fila) if fila else None
+
+    def guardar_funciones(self, funciones: list, modificadas=None):
+        """
+        Guarda las funciones. Si se indican las modificadas solo se
+        escriben esas filas; si no, se reemplaza la tabla completa.
+        """
+        if modificadas is None:
+            self.reemplazar_funciones(funciones)
+            return
+        with self.conexion:
+            self._insertar_funciones(modificadas)
+
+    def reemplazar_funciones(self, funciones: list):
+        with self.conexion:
+            self.conexion.execute("DELETE FROM funciones")
+            self._insertar_funciones(funciones)
+
+    def _insertar_funciones(self, funciones: list):
+        self._asegurar_id(
+            "funciones", mayor_id(fn.get("id_funcion") for fn in funciones)
+        )
+        self.conexion.executemany(
+            "INSERT OR REPLACE INTO funciones (id_funcion, id_pelicula, sala, hora, "
+            "asientos_disponibles, asientos) VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                tuple(fila[c] for c in CAMPOS_FUNCIONES)
+                for fila in map(fila_funcion, funciones)
+            ),
+        )
+
+    # ------------------- Reservas -------------------
+
+    @staticmethod
+    def _reserva(fila) -> dict:
+        return {
+            "id_reserva": fila["id_reserva"],
+            "nombre_cliente": fila["nombre_cliente"],
+            "id_funcion": fila["id_funcion"],
+            "asientos": json.loads(fila["asientos"]),
+            "cantidad_boletos": fila["cantidad_boletos"],
+        }
+
+    def leer_reservas(self) -> list:
+        cursor = self.conexion.execute(
+            "SELECT id_reserva, nombre_cliente, id_funcion, asientos, "
+            "cantidad_boletos FROM reservas ORDER BY id_reserva"
+        )
+        return [self._reserva(fila) for fila in cursor]
+
+    def iterar_reservas(self):
+        cursor = self.conexion.execute(
+            "SELECT id_reserva, nombre_cliente, id_funcion, asientos, "
+            "cantidad_boletos FROM reservas ORDER BY id_reserva"
+        )
+        return (self._reserva(fila) for fila in cursor)
+
+    def ocupados_de(self, id_funcion: str) -> set:
+        cursor = self.conexion.execute(
+            "SELECT asiento FROM asientos_ocupados WHERE id_funcion = ?",
+            (id_funcion,),
+        )
+        return {asiento for (asiento,) in cursor}
+
+    def ocupados_por_funcion(self, ids_funcion) -> dict:
+        return {id_funcion: self.ocupados_de(id_funcion) for id_funcion in ids_funcion}
+
+    def insertar_reserva(
+        self, nombre_cliente: str, id_funcion: str, asientos: list
+    ) -> dict:
+        # Nadie puede vender los asientos entre la consulta y el INSERT
+        with self._transaccion_inmediata():
+            return self._agregar_reserva(nombre_cliente, id_funcion, asientos)
+
+    def _agregar_reserva(
+        self, nombre_cliente: str, id_funcion: str, asientos: list
+    ) -> dict:
+        """INSERT de la reserva dentro de una transacción ya abierta (con CAS)."""
+        marcas = ",".join("?" * len(asientos))
+        conflictos = [
+            fila[0]
+            for fila in self.conexion.execute(
+                "SELECT asiento FROM asientos_ocupados WHERE id_funcion = ? "
+                f"AND asiento IN ({marcas})",
+                (id_funcion, *asientos),
+            )
+        ]
+        if conflictos:
+            raise AsientosOcupados(conflictos)
+        (id_reserva,) = self._reservar_ids("reservas", 1)
+        self.conexion.execute(
+            "INSERT INTO reservas (id_reserva, nombre_cliente, id_funcion, "
+            "asientos, cantidad_boletos) VALUES (?, ?, ?, ?, ?)",
+            (
+                id_reserva,
+                nombre_cliente,
+                id_funcion,
+                json.dumps(asientos, ensure_ascii=False),
+                len(asientos),
+            ),
+        )
+        self.conexion.executemany(
+            "INSERT INTO asientos_ocupados (id_funcion, asiento, "
+            "id_reserva) VALUES (?, ?, ?)",
+            ((id_funcion, asiento, id_reserva) for asiento in asientos),
+        )
+        return {
+            "id_reserva": id_reserva,
+            "nombre_cliente": nombre_cliente,
+            "id_funcion": id_funcion,
+            "asientos": asientos,
+            "cantidad_boletos": len(asientos),
+        }
+
+    def reemplazar_reservas(self, reservas: list):
+        with self.conexion:
+            self._asegurar_id("reservas", DiarioReservas._max_id(reservas))
+            self.conexion.execute("DELETE FROM reservas")
+            self.conexion.executemany(
+                "INSERT INTO reservas (id_reserva, nombre_cliente, id_funcion, "
+                "asientos, cantidad_boletos) VALUES (?, ?, ?, ?, ?)",
+                (
+                    (
+                        r.get("id_reserva"),
+                        r.get("nombre_cliente", ""),
+                        str(r.get("id_funcion", "")),
+                        json.dumps(r.get("asientos", []), ensure_ascii=False),
+                        r.get("cantidad_boletos", len(r.get("asientos", []))),
+                    )
+                    for r in reservas
+                ),
+            )
+            self._reconstruir_ocupados()
+
+    # ------------------- Carga masiva -------------------
+
+    def importar_lote(self, peliculas=(), funciones=(), reservas=()) -> list:
+        """Agrega todo el lote en una sola transacción (ver AlmacenamientoArchivos)."""
+        nuevas = []
+        peliculas = list(peliculas)
+        with self._transaccion_inmediata():
+            self._asegurar_id("peliculas", mayor_id(f["ID"] for f in peliculas))
+            self.conexion.executemany(
+                "INSERT INTO peliculas (id, titulo, genero, duracion_min) "
+                "VALUES (?, ?, ?, ?)",
+                (
+                    (int(f["ID"]), f["Titulo"], f["Genero"], f["Duracion_min"])
+                    for f in peliculas
+                ),
+            )
+            self._insertar_funciones(list(funciones))
+            for nombre_cliente, id_funcion, asientos in reservas:
+                nuevas.append(
+                    self._agregar_reserva(nombre_cliente, id_funcion, list(asientos))
+                )
+        return nuevas
+
+
+def copiar_datos(origen, destino):
+    """Copia películas, funciones y reservas de un motor a otro."""
+    with agrupar_escrituras():
+        destino.reemplazar_peliculas(origen.leer_peliculas())
+        destino.reemplazar_funciones(origen.leer_funciones())
+        destino.reemplazar_reservas(origen.leer_reservas())
+
+
+_almacen = None
+# Motor propio de un hilo (por ejemplo, el de la API); tiene prioridad
+_hilo = threading.local()
+
+
+def crear_almacenamiento():
+    """Crea un motor nuevo según CINE_ALMACENAMIENTO."""
+    motor = os.environ.get("CINE_ALMACENAMIENTO", "archivos").strip().lower()
+    if motor == "archivos":
+        return AlmacenamientoArchivos(
+            modo_reservas=os.environ.get("CINE_RESERVAS", "json").strip().lower(),
+            dir_secuencias=os.environ.get("CINE_SECUENCIAS") or None,
+            bloque_ids=int(os.environ.get("CINE_BLOQUE_IDS", "1")),
+        )
+    if motor == "sqlite":
+        ruta = os.environ.get("CINE_BD", ARCHIVO_BD)
+        nueva = not os.path.exists(ruta)
+        almacen = AlmacenamientoSQLite(ruta)
+        if nueva:
+            # Primera vez: se parte de los CSV/JSON existentes
+            copiar_datos(AlmacenamientoArchivos(), almacen)
+        return almacen
+    raise ValueError(f"Motor de almacenamiento desconocido: {motor}")
+
+
+def obtener_almacenamiento():
+    """Devuelve el motor activo, creándolo según CINE_ALMACENAMIENTO."""
+    global _almacen
+    propio = getattr(_hilo, "almacen", None)
+    if propio is not None:
+        return propio
+    if _almacen is None:
+        _almacen = crear_almacenamiento()
+    return _almacen
+
+
+def configurar_almacenamiento(almacen):
+    """Fija el motor activo (útil para pruebas y herramientas)."""
+    global _almacen
+    _almacen = almacen
+
+
+def usar_en_este_hilo(almacen):
+    """
+    Fija un motor solo para el hilo actual (None vuelve al compartido).
+    Sirve para que un hilo de fondo no comparta cachés ni conexión SQLite
+    con el menú.
+    """
+    _hilo.almacen = almacen
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        prog="python -m almacenamiento",
+        description=(
+            "Importa o exporta los CSV/JSON desde/hacia la base SQLite, "
+            "o compacta el diario de reservas en reservas.json."
+        ),
+    )
+    parser.add_argument("accion", choices=["importar", "exportar", "compactar"])
+    parser.add_argument("--bd", default=os.environ.get("CINE_BD", ARCHIVO_BD))
+    args = parser.parse_args(argv)
+
+    if args.accion == "compactar":
+        with bloquear(ARCHIVO_RESERVAS):
+            total = DiarioReservas().compactar()
+        print(f"Diario compactado: {total} reservas en {ARCHIVO_RESERVAS}.")
+        return
+
+    archivos = AlmacenamientoArchivos()
+    bd = AlmacenamientoSQLite(args.bd)
+    try:
+        if args.accion == "importar":
+            copiar_datos(archivos, bd)
+            print(f"Datos importados en {args.bd}.")
+        else:
+            copiar_datos(bd, archivos)
+            print(f"Datos exportados desde {args.bd}.")
+    finally:
+        bd.cerrar()
+
+
+if __name__ == "__main__":
+    main()
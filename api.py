@@ -0,0 +1,348 @@
+"""
+API HTTP/JSON local para vender desde un kiosco web o hacer pruebas de carga.
+
+    python -m api [--host 127.0.0.1] [--puerto 8080]
+
+o, junto al menú, con CINE_API=<puerto> al iniciar main.py.
+
+Rutas:
+    GET  /peliculas                   catálogo
+    GET  /funciones                   funciones con asientos libres
+    GET  /funciones/<id>/asientos     mapa de asientos de una función
+    POST /reservas                    {"nombre_cliente", "id_funcion", "asientos"}
+                                      o "cantidad" en lugar de "asientos" para
+                                      recibir los mejores N asientos juntos
+
+El servidor es asyncio puro (sin dependencias). Todo acceso a los datos
+corre en un único hilo de trabajo con su propio motor de almacenamiento,
+así que el bucle nunca se bloquea leyendo archivos; las reservas pasan
+además por una cola con una sola tarea escritora que las aplica de a una.
+"""
+
+import argparse
+import asyncio
+import json
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import unquote, urlsplit
+
+import almacenamiento
+from almacenamiento import AsientosOcupados
+from asientos import mejores_asientos
+from funciones import cargar_funcion, cargar_funciones
+from Peliculas import cargar_peliculas_dict
+from reservas import guardar_reserva
+from retenciones import obtener_retenciones
+from validacion import NOMBRE_CLIENTE
+
+HOST = "127.0.0.1"
+PUERTO = 8080
+MAX_CUERPO = 64 * 1024
+MAX_ASIENTOS = 20
+_RUTA_ASIENTOS = re.compile(r"^/funciones/([^/]+)/asientos$")
+
+ESTADOS = {
+    200: "OK",
+    201: "Created",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    409: "Conflict",
+    413: "Payload Too Large",
+    500: "Internal Server Error",
+}
+
+
+class ErrorAPI(Exception):
+    def __init__(self, estado: int, mensaje: str, **extra):
+        super().__init__(mensaje)
+        self.estado = estado
+        self.cuerpo = {"error": mensaje, **extra}
+
+
+# ------------------- Operaciones (corren en el hilo de datos) -------------------
+
+
+def listar_peliculas() -> list:
+    return [
+        {
+            "id": fila["ID"],
+            "titulo": fila["Titulo"],
+            "genero": fila["Genero"],
+            "duracion_min": fila["Duracion_min"],
+        }
+        for fila in almacenamiento.obtener_almacenamiento().leer_peliculas()
+    ]
+
+
+def listar_funciones() -> list:
+    titulos = cargar_peliculas_dict()
+    resultado = []
+    for fn in cargar_funciones():
+        mapa = fn["asientos"]
+        resultado.append(
+            {
+                "id_funcion": fn["id_funcion"],
+                "id_pelicula": fn["id_pelicula"],
+                "titulo": titulos.get(fn["id_pelicula"], ""),
+                "sala": fn["sala"],
+                "hora": fn["hora"],
+                "asientos_totales": len(mapa),
+                # Del mapa: asientos_ocupados puede traer etiquetas que ya
+                # no existen en la sala
+                "asientos_libres": mapa.libres(),
+            }
+        )
+    return resultado
+
+
+def mapa_de_funcion(id_funcion: str) -> dict:
+    fn = cargar_funcion(id_funcion)
+    if fn is None:
+        raise ErrorAPI(404, f"La función '{id_funcion}' no existe.")
+    mapa = fn["asientos"]
+    return {
+        "id_funcion": fn["id_funcion"],
+        "filas": getattr(mapa, "filas", None),
+        "columnas": list(getattr(mapa, "columnas", ())),
+        "asientos": list(mapa),
+        "ocupados": [a for a in fn["asientos_ocupados"] if a in mapa],
+        "retenidos": sorted(obtener_retenciones().retenidos(id_funcion)),
+    }
+
+
+def crear_reserva(datos) -> dict:
+    if not isinstance(datos, dict):
+        raise ErrorAPI(400, "Se esperaba un objeto JSON.")
+    nombre = str(datos.get("nombre_cliente", "")).strip()
+    id_funcion = str(datos.get("id_funcion", "")).strip()
+    asientos = datos.get("asientos")
+    cantidad = datos.get("cantidad")
+    if not nombre or not NOMBRE_CLIENTE.fullmatch(nombre):
+        raise ErrorAPI(400, "nombre_cliente solo puede contener letras y espacios.")
+    if asientos is None and cantidad is not None:
+        return _reservar_mejores(nombre, id_funcion, cantidad)
+    if (
+        not isinstance(asientos, list)
+        or not asientos
+        or not all(isinstance(a, str) for a in asientos)
+    ):
+        raise ErrorAPI(400, "asientos debe ser una lista de etiquetas, p. ej. ['A1'].")
+    if len(set(asientos)) != len(asientos) or len(asientos) > MAX_ASIENTOS:
+        raise ErrorAPI(400, f"Asientos repetidos o más de {MAX_ASIENTOS}.")
+
+    fn = cargar_funcion(id_funcion)
+    if fn is None:
+        raise ErrorAPI(404, f"La función '{id_funcion}' no existe.")
+    mapa = fn["asientos"]
+    invalidos = [a for a in asientos if a not in mapa]
+    if invalidos:
+        raise ErrorAPI(400, "Asientos inexistentes.", asientos=invalidos)
+    tomados = [a for a in asientos if mapa[a] != "libre"]
+    tomados += [a for a in asientos if a in obtener_retenciones().retenidos(id_funcion)]
+    if tomados:
+        raise ErrorAPI(409, "Asientos no disponibles.", asientos=sorted(set(tomados)))
+
+    try:
+        return guardar_reserva(nombre, id_funcion, asientos)
+    except AsientosOcupados as e:
+        raise ErrorAPI(409, "Asientos no disponibles.", asientos=e.asientos)
+
+
+def _reservar_mejores(nombre: str, id_funcion: str, cantidad) -> dict:
+    if (
+        not isinstance(cantidad, int)
+        or isinstance(cantidad, bool)
+        or not 1 <= cantidad <= MAX_ASIENTOS
+    ):
+        raise ErrorAPI(400, f"cantidad debe ser un entero entre 1 y {MAX_ASIENTOS}.")
+    fn = cargar_funcion(id_funcion)
+    if fn is None:
+        raise ErrorAPI(404, f"La función '{id_funcion}' no existe.")
+    asientos = mejores_asientos(
+        fn["asientos"], cantidad, obtener_retenciones().retenidos(id_funcion)
+    )
+    if not asientos:
+        raise ErrorAPI(409, f"No hay {cantidad} asientos juntos disponibles.")
+    try:
+        return guardar_reserva(nombre, id_funcion, asientos)
+    except AsientosOcupados as e:
+        raise ErrorAPI(409, "Asientos no disponibles.", asientos=e.asientos)
+
+
+# ------------------- Servidor -------------------
+
+
+class ServidorAPI:
+    def __init__(self, host: str = HOST, puerto: int = PUERTO, crear_almacen=None):
+        self.host = host
+        self.puerto = puerto
+        self.crear_almacen = crear_almacen or almacenamiento.crear_almacenamiento
+        self._datos = None
+        self._cola = None
+        self._escritor = None
+        self._servidor = None
+
+    def _iniciar_hilo_datos(self):
+        almacenamiento.usar_en_este_hilo(self.crear_almacen())
+
+    async def iniciar(self):
+        """Abre el puerto; devuelve (host, puerto) reales."""
+        self._datos = ThreadPoolExecutor(
+            max_workers=1,
+            thread_name_prefix="cine-datos",
+            initializer=self._iniciar_hilo_datos,
+        )
+        self._cola = asyncio.Queue()
+        self._escritor = asyncio.create_task(self._escribir_en_orden())
+        self._servidor = await asyncio.start_server(
+            self._atender, self.host, self.puerto
+        )
+        return self._servidor.sockets[0].getsockname()[:2]
+
+    async def cerrar(self):
+        self._servidor.close()
+        await self._servidor.wait_closed()
+        self._escritor.cancel()
+        self._datos.shutdown(wait=True)
+
+    async def servir(self):
+        await self.iniciar()
+        async with self._servidor:
+            await self._servidor.serve_forever()
+
+    async def _en_hilo_datos(self, funcion, *args):
+        return await asyncio.get_running_loop().run_in_executor(
+            self._datos, funcion, *args
+        )
+
+    async def _escribir_en_orden(self):
+        """Única tarea que aplica cambios: uno a la vez, en orden de llegada."""
+        while True:
+            funcion, args, futuro = await self._cola.get()
+            try:
+                resultado = await self._en_hilo_datos(funcion, *args)
+            except Exception as e:
+                if not futuro.done():
+                    futuro.set_exception(e)
+            else:
+                if not futuro.done():
+                    futuro.set_result(resultado)
+
+    async def _escribir(self, funcion, *args):
+        futuro = asyncio.get_running_loop().create_future()
+        await self._cola.put((funcion, args, futuro))
+        return await futuro
+
+    async def _despachar(self, metodo: str, ruta: str, cuerpo: bytes):
+        if ruta == "/peliculas":
+            if metodo != "GET":
+                raise ErrorAPI(405, "Método no permitido.")
+            return 200, await self._en_hilo_datos(listar_peliculas)
+        if ruta == "/funciones":
+            if metodo != "GET":
+                raise ErrorAPI(405, "Método no permitido.")
+            return 200, await self._en_hilo_datos(listar_funciones)
+        coincidencia = _RUTA_ASIENTOS.match(ruta)
+        if coincidencia:
+            if metodo != "GET":
+                raise ErrorAPI(405, "Método no permitido.")
+            id_funcion = unquote(coincidencia.group(1))
+            return 200, await self._en_hilo_datos(mapa_de_funcion, id_funcion)
+        if ruta == "/reservas":
+            if metodo != "POST":
+                raise ErrorAPI(405, "Método no permitido.")
+            try:
+                datos = json.loads(cuerpo or b"null")
+            except ValueError:
+                raise ErrorAPI(400, "El cuerpo no es JSON válido.")
+            return 201, await self._escribir(crear_reserva, datos)
+        raise ErrorAPI(404, "Ruta desconocida.")
+
+    async def _atender(self, reader, writer):
+        try:
+            while True:
+                linea = await reader.readline()
+                if not linea:
+                    break
+                try:
+                    metodo, destino, version = linea.decode("latin-1").split()
+                except ValueError:
+                    await self._responder(writer, 400, {"error": "Petición inválida."})
+                    break
+                cabeceras = {}
+                while True:
+                    cabecera = await reader.readline()
+                    if cabecera in (b"\r\n", b"\n", b""):
+                        break
+                    nombre, _, valor = cabecera.decode("latin-1").partition(":")
+                    cabeceras[nombre.strip().lower()] = valor.strip()
+
+                largo = int(cabeceras.get("content-length") or 0)
+                if largo > MAX_CUERPO:
+                    await self._responder(writer, 413, {"error": "Cuerpo muy grande."})
+                    break
+                cuerpo = await reader.readexactly(largo) if largo else b""
+
+                try:
+                    estado, datos = await self._despachar(
+                        metodo.upper(),
+                        urlsplit(destino).path.rstrip("/") or "/",
+                        cuerpo,
+                    )
+                except ErrorAPI as e:
+                    estado, datos = e.estado, e.cuerpo
+                except Exception as e:
+                    estado, datos = 500, {"error": str(e)}
+
+                seguir = (
+                    cabeceras.get("connection", "").lower() != "close"
+                    and version.upper() == "HTTP/1.1"
+                )
+                await self._responder(writer, estado, datos, seguir)
+                if not seguir:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _responder(writer, estado: int, datos, seguir: bool = False):
+        cuerpo = json.dumps(datos, ensure_ascii=False).encode("utf-8")
+        cabecera = (
+            f"HTTP/1.1 {estado} {ESTADOS.get(estado, '')}\r\n"
+            "Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(cuerpo)}\r\n"
+            f"Connection: {'keep-alive' if seguir else 'close'}\r\n\r\n"
+        )
+        writer.write(cabecera.encode("latin-1") + cuerpo)
+        await writer.drain()
+
+
+def iniciar_en_segundo_plano(host: str = HOST, puerto: int = PUERTO):
+    """Levanta la API en un hilo aparte (para usarla junto al menú)."""
+    hilo = threading.Thread(
+        target=lambda: asyncio.run(ServidorAPI(host, puerto).servir()),
+        name="cine-api",
+        daemon=True,
+    )
+    hilo.start()
+    return hilo
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="API HTTP/JSON de reservas.")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--puerto", type=int, default=PUERTO)
+    args = parser.parse_args(argv)
+    print(f"API escuchando en http://{args.host}:{args.puerto}")
+    try:
+        asyncio.run(ServidorAPI(args.host, args.puerto).servir())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -1,68 +1,307 @@
+import base64
 import json
 import math
+from collections.abc import MutableMapping
+from functools import lru_cache
 
+PREFIJO_BITS = "bits:"
 
-def serializar_asientos(mapa: dict) -> str:
-    """Convierte el mapa de asientos en un string JSON para guardar en CSV."""
+
+def serializar_asientos(mapa) -> str:
+    """
+    Convierte el mapa de asientos en un string para guardar en CSV.
+    Un MapaAsientos se guarda compacto ("bits:<total>:<base64>"); un dict, como JSON.
+    """
+    if isinstance(mapa, MapaAsientos):
+        return mapa.serializar()
     return json.dumps(mapa, ensure_ascii=False)
 
 
-def deserializar_asientos(s: str) -> dict:
-    """Convierte el string JSON de vuelta a dict. Devuelve {} si hay error."""
+def deserializar_asientos(s: str):
+    """
+    Convierte el string de vuelta a mapa (MapaAsientos o dict según el formato).
+    Devuelve {} si hay error.
+    """
     try:
+        if s and s.startswith(PREFIJO_BITS):
+            return MapaAsientos.deserializar(s)
         return json.loads(s) if s else {}
     except Exception:
         return {}
 
 
-def crear_mapa_asientos(total_asientos):
-    """
-    Crea un mapa de asientos lo más cuadrado posible.
-    Busca la combinación de filas y columnas que se acerque a un cuadrado.
+# Tabla compartida de etiquetas de columna (A, B, ..., Z, AA, AB, ...)
+_ETIQUETAS_COLUMNAS = []
+
+
+def etiquetas_columnas(n: int) -> tuple:
+    """Primeras n etiquetas de columna; la tabla se amplía solo cuando hace falta."""
+    tabla = _ETIQUETAS_COLUMNAS
+    while len(tabla) < n:
+        i = len(tabla)
+        if i < 26:
+            tabla.append(chr(ord("A") + i))
+        else:
+            tabla.append(tabla[i // 26 - 1] + chr(ord("A") + i % 26))
+    return tuple(tabla[:n])
+
+
+@lru_cache(maxsize=1024)
+def calcular_distribucion(total_asientos):
     """
+    Combinación de filas y columnas más cuadrada posible para el total dado.
+    Devuelve (filas, etiquetas de columnas); se memoriza por total.
 
-    mejor_cols = 1
-    mejor_filas = total_asientos
-    mejor_diff = total_asientos
+    filas - columnas decrece al aumentar las columnas, así que el mínimo de
+    |filas - columnas| está en isqrt(total) o isqrt(total) + 1 (ante empate,
+    las menos columnas).
+    """
+    if total_asientos <= 0:
+        return total_asientos, etiquetas_columnas(1)
 
-    # Probar columnas desde 1 hasta total_asientos
-    for cols in range(1, total_asientos + 1):
-        filas = math.ceil(total_asientos / cols)
-        if filas * cols < total_asientos:
-            continue
+    mejor_cols = mejor_filas = mejor_diff = None
+    raiz = math.isqrt(total_asientos)
+    for cols in (raiz, raiz + 1):
+        filas = -(-total_asientos // cols)
         diff = abs(filas - cols)
-        # Elegir la combinación más cuadrada
-        if diff < mejor_diff:
+        if mejor_diff is None or diff < mejor_diff:
             mejor_diff = diff
             mejor_cols = cols
             mejor_filas = filas
 
-    # Generar etiquetas de columnas (A, B, ..., Z, AA, AB, ...)
-    def generar_columnas(n):
-        cols = []
-        i = 0
-        while len(cols) < n:
-            col = ""
-            j = i
-            while True:
-                col = chr(ord("A") + (j % 26)) + col
-                j = j // 26 - 1
-                if j < 0:
-                    break
-            cols.append(col)
-            i += 1
-        return cols
-
-    columnas = generar_columnas(mejor_cols)
-
-    # Construir mapa
-    mapa = {}
-    asiento_num = 0
-    for fila in range(1, mejor_filas + 1):
-        for col in columnas:
-            asiento_num += 1
-            if asiento_num > total_asientos:
-                break
-            mapa[f"{col}{fila}"] = "libre"
-
-    return mapa
+    return mejor_filas, etiquetas_columnas(mejor_cols)
+
+
+@lru_cache(maxsize=1024)
+def indice_columnas(columnas: tuple) -> dict:
+    """Etiqueta de columna -> posición (compartido entre mapas iguales)."""
+    return {c: i for i, c in enumerate(columnas)}
+
+
+class MapaAsientos(MutableMapping):
+    """
+    Mapa de asientos compacto: filas/columnas más un bit de ocupación por asiento.
+    Se usa igual que el dict {"A1": "libre", ...} de antes (mismas claves,
+    mismo orden y valores "libre"/"ocupado"), pero sin guardar un string por
+    asiento. Permite consultar por coordenadas y contar ocupados con popcount.
+    """
+
+    __slots__ = ("total", "filas", "columnas", "_indice_columna", "_bits")
+
+    def __init__(self, total: int, bits=None):
+        self.total = max(0, int(total))
+        self.filas, self.columnas = calcular_distribucion(self.total)
+        self._indice_columna = indice_columnas(self.columnas)
+        tamano = (self.total + 7) // 8
+        self._bits = bytearray(tamano) if bits is None else bytearray(bits)
+        if len(self._bits) != tamano:
+            raise ValueError("El tamaño del bitmap no coincide con el total.")
+
+    # ------------------- Coordenadas -------------------
+
+    def posicion(self, fila: int, columna: int) -> int:
+        """Índice del asiento en (fila, columna), ambos desde 0."""
+        pos = fila * len(self.columnas) + columna
+        if not (0 <= columna < len(self.columnas)) or not (0 <= pos < self.total):
+            raise IndexError(f"Asiento fuera del mapa: ({fila}, {columna})")
+        return pos
+
+    def etiqueta(self, fila: int, columna: int) -> str:
+        self.posicion(fila, columna)
+        return f"{self.columnas[columna]}{fila + 1}"
+
+    def esta_ocupado(self, fila: int, columna: int) -> bool:
+        pos = self.posicion(fila, columna)
+        return bool(self._bits[pos >> 3] & (1 << (pos & 7)))
+
+    def _posicion_etiqueta(self, asiento) -> int:
+        if not isinstance(asiento, str):
+            raise KeyError(asiento)
+        letras = asiento.rstrip("0123456789")
+        numero = asiento[len(letras) :]
+        columna = self._indice_columna.get(letras)
+        if columna is None or not numero or numero[0] == "0":
+            raise KeyError(asiento)
+        pos = (int(numero) - 1) * len(self.columnas) + columna
+        if pos >= self.total:
+            raise KeyError(asiento)
+        return pos
+
+    # ------------------- Interfaz de dict -------------------
+
+    def __getitem__(self, asiento) -> str:
+        pos = self._posicion_etiqueta(asiento)
+        return "ocupado" if self._bits[pos >> 3] & (1 << (pos & 7)) else "libre"
+
+    def __setitem__(self, asiento, estado):
+        pos = self._posicion_etiqueta(asiento)
+        if estado == "ocupado":
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+        elif estado == "libre":
+            self._bits[pos >> 3] &= ~(1 << (pos & 7)) & 0xFF
+        else:
+            raise ValueError(f"Estado de asiento inválido: {estado}")
+
+    def __delitem__(self, asiento):
+        raise TypeError("No se pueden quitar asientos del mapa.")
+
+    def __contains__(self, asiento) -> bool:
+        try:
+            self._posicion_etiqueta(asiento)
+        except KeyError:
+            return False
+        return True
+
+    def __iter__(self):
+        n = len(self.columnas)
+        for pos in range(self.total):
+            yield f"{self.columnas[pos % n]}{pos // n + 1}"
+
+    def __len__(self) -> int:
+        return self.total
+
+    def __repr__(self) -> str:
+        return (
+            f"MapaAsientos(total={self.total}, filas={self.filas}, "
+            f"columnas={len(self.columnas)}, ocupados={self.ocupados()})"
+        )
+
+    # ------------------- Conteos -------------------
+
+    def ocupados(self) -> int:
+        return int.from_bytes(self._bits, "little").bit_count()
+
+    def libres(self) -> int:
+        return self.total - self.ocupados()
+
+    # ------------------- Serialización -------------------
+
+    def serializar(self) -> str:
+        datos = base64.b64encode(bytes(self._bits)).decode("ascii")
+        return f"{PREFIJO_BITS}{self.total}:{datos}"
+
+    @classmethod
+    def deserializar(cls, texto: str) -> "MapaAsientos":
+        if not texto.startswith(PREFIJO_BITS):
+            raise ValueError("Formato de mapa de asientos desconocido.")
+        total, datos = texto[len(PREFIJO_BITS) :].split(":", 1)
+        return cls(int(total), base64.b64decode(datos))
+
+
+def crear_mapa_asientos(total_asientos):
+    """
+    Crea un mapa de asientos lo más cuadrado posible, con todos los asientos libres.
+    """
+    return MapaAsientos(total_asientos)
+
+
+# ------------------- Asignación automática -------------------
+
+# Fila preferida como fracción de la profundidad de la sala (0 es la fila 1,
+# junto a la pantalla): algo detrás de la mitad
+FILA_IDEAL = 0.6
+# Cuánto pesa alejarse una fila de la ideal frente a correrse un asiento
+PESO_FILA = 1.0
+
+
+class TramosLibres:
+    """
+    Tramos de asientos libres consecutivos por fila, para asignar los
+    mejores N juntos sin probar combinaciones.
+
+    Cada fila guarda sus tramos (inicio, largo) y el largo máximo. Pedir N
+    asientos descarta en O(1) las filas donde no entran y, en las demás,
+    evalúa solo la mejor posición de cada tramo (la más cercana al centro):
+    O(filas) más los tramos de las filas candidatas. El puntaje suma la
+    distancia del grupo al centro de la fila y la de la fila a FILA_IDEAL.
+    Ocupar asientos recalcula solo sus filas.
+    """
+
+    def __init__(self, mapa, excluidos=()):
+        if not isinstance(mapa, MapaAsientos):
+            mapa = _mapa_de_dict(mapa)
+        self.mapa = mapa
+        self._ancho = len(mapa.columnas)
+        self._ocupados = int.from_bytes(mapa._bits, "little")
+        self._tramos = []
+        self._maximo = []
+        for asiento in excluidos:
+            if asiento in mapa:
+                self._ocupados |= 1 << mapa._posicion_etiqueta(asiento)
+        for fila in range(mapa.filas):
+            self._tramos.append([])
+            self._maximo.append(0)
+            self._recalcular(fila)
+
+    def _largo_fila(self, fila: int) -> int:
+        return max(0, min(self._ancho, self.mapa.total - fila * self._ancho))
+
+    def _recalcular(self, fila: int):
+        largo = self._largo_fila(fila)
+        bits = (self._ocupados >> (fila * self._ancho)) & ((1 << largo) - 1)
+        tramos = []
+        inicio = None
+        for columna in range(largo + 1):
+            libre = columna < largo and not bits >> columna & 1
+            if libre and inicio is None:
+                inicio = columna
+            elif not libre and inicio is not None:
+                tramos.append((inicio, columna - inicio))
+                inicio = None
+        self._tramos[fila] = tramos
+        self._maximo[fila] = max((n for _, n in tramos), default=0)
+
+    def mejores(self, cantidad: int) -> list:
+        """Etiquetas de los mejores `cantidad` asientos juntos, o [] si no hay."""
+        if cantidad <= 0:
+            return []
+        centro = (self._ancho - 1) / 2
+        ideal = (self.mapa.filas - 1) * FILA_IDEAL
+        mejor = None
+        for fila, maximo in enumerate(self._maximo):
+            if maximo < cantidad:
+                continue
+            for inicio, largo in self._tramos[fila]:
+                if largo < cantidad:
+                    continue
+                columna = min(
+                    max(round(centro - (cantidad - 1) / 2), inicio),
+                    inicio + largo - cantidad,
+                )
+                puntaje = abs(columna + (cantidad - 1) / 2 - centro) + PESO_FILA * abs(
+                    fila - ideal
+                )
+                if mejor is None or puntaje < mejor[0]:
+                    mejor = (puntaje, fila, columna)
+        if mejor is None:
+            return []
+        _, fila, columna = mejor
+        return [self.mapa.etiqueta(fila, c) for c in range(columna, columna + cantidad)]
+
+    def ocupar(self, asientos):
+        """Marca asientos como no disponibles (solo aquí, no en el mapa)."""
+        filas = set()
+        for asiento in asientos:
+            posicion = self.mapa._posicion_etiqueta(asiento)
+            self._ocupados |= 1 << posicion
+            filas.add(posicion // self._ancho)
+        for fila in filas:
+            self._recalcular(fila)
+
+
+def _mapa_de_dict(mapa) -> MapaAsientos:
+    """MapaAsientos equivalente a un mapa dict {"A1": "libre", ...}."""
+    bits = MapaAsientos(len(mapa))
+    for asiento, estado in mapa.items():
+        if estado != "libre" and asiento in bits:
+            bits[asiento] = "ocupado"
+    return bits
+
+
+def mejores_asientos(mapa, cantidad: int, excluidos=()) -> list:
+    """
+    Los mejores `cantidad` asientos libres juntos en una misma fila, sin
+    contar los `excluidos` (por ejemplo, retenidos por otra caja); [] si no
+    hay un tramo donde entren.
+    """
+    return TramosLibres(mapa, excluidos).mejores(cantidad)
@@ -0,0 +1,8 @@
+"""
+Mediciones de los caminos calientes con datos sintéticos.
+
+    python -m benchmarks [--escala mini|chica|media|grande] [--solo NOMBRE ...]
+                         [--tiempo SEG] [--guardar-base] [--tolerancia 0.25]
+
+Ver benchmarks/ejecutar.py.
+"""
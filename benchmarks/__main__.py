@@ -0,0 +1,5 @@
+import sys
+
+from benchmarks.ejecutar import main
+
+sys.exit(main())
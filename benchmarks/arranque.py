@@ -0,0 +1,112 @@
+"""
+Tiempo hasta el primer menú (reinicios de las cajas).
+
+    python -m benchmarks.arranque [--veces 10] [--objetivo 100] [--top 15]
+
+Corre `--veces` procesos nuevos que importan main y dibujan el menú
+principal (con la salida a /dev/null) y toma la mediana del tiempo de
+reloj; antes hace una corrida de calentamiento para que los .pyc ya estén
+escritos. Después corre una vez más con `python -X importtime` y lista los
+módulos que más tardan en importarse (tiempo acumulado, con lo que
+importan). Termina con código 1 si la mediana supera --objetivo ms.
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CODIGO = "import main; main.mostrar_menu()"
+
+
+def _entorno() -> dict:
+    entorno = dict(os.environ)
+    # Sin .pyc cada arranque vuelve a compilar todo y la medición no sirve
+    entorno.pop("PYTHONDONTWRITEBYTECODE", None)
+    entorno.pop("CINE_METRICAS", None)
+    entorno.pop("CINE_PERFIL", None)
+    return entorno
+
+
+def medir_arranque(veces: int) -> list:
+    """Segundos de cada una de `veces` corridas, después de calentar."""
+    comando = [sys.executable, "-c", CODIGO]
+    tiempos = []
+    for i in range(veces + 1):
+        inicio = time.perf_counter()
+        subprocess.run(
+            comando,
+            cwd=RAIZ,
+            env=_entorno(),
+            stdout=subprocess.DEVNULL,
+            check=True,
+        )
+        if i:  # la primera es de calentamiento
+            tiempos.append(time.perf_counter() - inicio)
+    return tiempos
+
+
+def leer_importtime(texto: str) -> list:
+    """
+    [(módulo, acumulado en µs, propio en µs)] de la salida de -X importtime,
+    del más lento al más rápido. Los módulos anidados conservan su nombre.
+    """
+    modulos = []
+    for linea in texto.splitlines():
+        if not linea.startswith("import time:"):
+            continue
+        partes = linea[len("import time:") :].split("|")
+        if len(partes) != 3 or not partes[0].strip().isdigit():
+            continue  # encabezado
+        propio, acumulado, nombre = partes
+        modulos.append((nombre.strip(), int(acumulado), int(propio)))
+    modulos.sort(key=lambda modulo: -modulo[1])
+    return modulos
+
+
+def importaciones() -> list:
+    resultado = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", CODIGO],
+        cwd=RAIZ,
+        env=_entorno(),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+        check=True,
+    )
+    return leer_importtime(resultado.stderr)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.arranque",
+        description="Mide cuánto tarda el programa en mostrar el menú.",
+    )
+    parser.add_argument("--veces", type=int, default=10)
+    parser.add_argument(
+        "--objetivo", type=float, default=100.0, help="ms hasta el primer menú"
+    )
+    parser.add_argument("--top", type=int, default=15, help="módulos a listar")
+    args = parser.parse_args(argv)
+
+    tiempos = medir_arranque(max(args.veces, 1))
+    mediana = statistics.median(tiempos) * 1000
+    print(
+        f"Primer menú: mediana {mediana:.1f} ms "
+        f"(mín. {min(tiempos) * 1000:.1f}, máx. {max(tiempos) * 1000:.1f}, "
+        f"{len(tiempos)} corridas)"
+    )
+    print(f"\n{'módulo':<40} {'acum. ms':>9} {'propio ms':>10}")
+    for nombre, acumulado, propio in importaciones()[: args.top]:
+        print(f"{nombre:<40} {acumulado / 1000:>9.1f} {propio / 1000:>10.1f}")
+    if mediana > args.objetivo:
+        print(f"\nSupera el objetivo de {args.objetivo:.0f} ms.")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
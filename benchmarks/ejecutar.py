@@ -0,0 +1,288 @@
+"""
+Mediciones de carga, listado, reserva y búsqueda a escala.
+
+    python -m benchmarks [--escala mini|chica|media|grande] [--solo NOMBRE ...]
+                         [--tiempo SEG] [--guardar-base] [--tolerancia 0.25]
+                         [--datos DIR] [--regenerar] [--fsync] [--base ARCHIVO]
+
+Los datos sintéticos (generador.py) se generan una vez por escala en
+--datos y cada corrida trabaja sobre una copia. Cada medición repite la
+operación durante --tiempo segundos (al menos una vez) y la corre una vez
+más bajo tracemalloc para el pico de memoria.
+
+Con --guardar-base el resultado queda en benchmarks/base_<escala>.json (o
+en --base); las
+corridas siguientes se comparan contra ese archivo y terminan con código 1
+si alguna operación es más lenta o usa más memoria que la base más la
+tolerancia. La base depende de la máquina: conviene guardarla en la misma
+donde se va a comparar.
+"""
+
+import argparse
+import io
+import json
+import os
+import shutil
+import tempfile
+import time
+import tracemalloc
+
+from rich.console import Console
+
+import almacenamiento
+import funciones
+import reservas
+from asientos import crear_mapa_asientos
+from escritura import SINCRONIZAR, configurar_escritura
+from generador import etiqueta_asiento, generar
+
+# (películas, funciones, reservas)
+ESCALAS = {
+    "mini": (200, 1_000, 5_000),
+    "chica": (1_000, 10_000, 100_000),
+    "media": (10_000, 100_000, 300_000),
+    "grande": (10_000, 100_000, 1_000_000),
+}
+DIRECTORIO = os.path.dirname(os.path.abspath(__file__))
+DATOS = os.path.join(DIRECTORIO, ".datos")
+LIMITE_TABLA = 1_000  # filas de ver_funciones (una tabla de 100k no se mira)
+HOLGURA_MEMORIA_KIB = 64  # diferencias de memoria menores no cuentan
+
+MEDICIONES = {}  # nombre -> preparar(contexto) -> operación sin argumentos
+
+
+def medicion(nombre: str):
+    def registrar(preparar):
+        MEDICIONES[nombre] = preparar
+        return preparar
+
+    return registrar
+
+
+class Contexto:
+    """Directorio de trabajo con una copia de los datos de la escala."""
+
+    def __init__(self, directorio: str):
+        self.directorio = directorio
+
+    def ruta(self, nombre: str) -> str:
+        return os.path.join(self.directorio, nombre)
+
+    def almacen(self, modo_reservas: str = "json"):
+        """Motor de archivos nuevo (sin cachés) sobre los datos de la corrida."""
+        return almacenamiento.AlmacenamientoArchivos(
+            self.ruta(almacenamiento.ARCHIVO_PELICULAS),
+            self.ruta(almacenamiento.ARCHIVO_FUNCIONES),
+            self.ruta(almacenamiento.ARCHIVO_RESERVAS),
+            modo_reservas=modo_reservas,
+            ruta_diario=self.ruta(almacenamiento.ARCHIVO_DIARIO),
+            dir_indice=self.ruta("ocupados.idx"),
+        )
+
+    def activar(self, almacen):
+        almacenamiento.configurar_almacenamiento(almacen)
+        return almacen
+
+
+# ------------------- Mediciones -------------------
+
+
+@medicion("crear_mapa_asientos")
+def _crear_mapa(contexto):
+    return lambda: crear_mapa_asientos(500)
+
+
+@medicion("cargar_peliculas")
+def _cargar_peliculas(contexto):
+    return lambda: contexto.almacen().leer_peliculas()
+
+
+@medicion("buscar_peliculas_por_genero")
+def _buscar_genero(contexto):
+    almacen = contexto.almacen()
+    almacen.catalogo()  # el índice ya armado, como en el menú
+    return lambda: almacen.buscar_peliculas("drama", "Genero", "exacto")
+
+
+@medicion("cargar_funciones")
+def _cargar_funciones(contexto):
+    def cargar():
+        contexto.activar(contexto.almacen())
+        return funciones.cargar_funciones()
+
+    return cargar
+
+
+@medicion("cargar_funciones_cache")
+def _cargar_funciones_cache(contexto):
+    contexto.activar(contexto.almacen())
+    funciones.cargar_funciones()
+    return funciones.cargar_funciones
+
+
+@medicion("ver_funciones")
+def _ver_funciones(contexto):
+    contexto.activar(contexto.almacen())
+    lista = funciones.cargar_funciones()[:LIMITE_TABLA]
+    titulos = {
+        f["ID"]: f["Titulo"]
+        for f in almacenamiento.obtener_almacenamiento().leer_peliculas()
+    }
+
+    def ver():
+        anterior = funciones.console
+        funciones.console = Console(file=io.StringIO(), width=120)
+        try:
+            funciones.ver_funciones(lista, titulos)
+        finally:
+            funciones.console = anterior
+
+    return ver
+
+
+def _preparar_reservas(contexto, modo: str):
+    almacen = contexto.activar(contexto.almacen(modo))
+    capacidades = [
+        (f["id_funcion"], int(f["asientos_disponibles"]))
+        for f in almacen.leer_funciones()
+    ]
+    almacen.ocupados_de(capacidades[0][0])  # índice de ocupados ya cargado
+    # La segunda mitad de cada sala está libre: se vende el último asiento
+    # de una función distinta en cada llamada
+    pendientes = iter(capacidades[::-1] if modo == "diario" else capacidades)
+
+    def reservar():
+        id_funcion, capacidad = next(pendientes)
+        reservas.guardar_reserva(
+            "Cliente Medicion", id_funcion, [etiqueta_asiento(capacidad, capacidad - 1)]
+        )
+
+    return reservar
+
+
+@medicion("guardar_reserva")
+def _guardar_reserva(contexto):
+    return _preparar_reservas(contexto, "json")
+
+
+@medicion("guardar_reserva_diario")
+def _guardar_reserva_diario(contexto):
+    return _preparar_reservas(contexto, "diario")
+
+
+# ------------------- Ejecución -------------------
+
+
+def medir(operacion, tiempo: float) -> dict:
+    veces = 0
+    inicio = time.perf_counter()
+    while True:
+        operacion()
+        veces += 1
+        transcurrido = time.perf_counter() - inicio
+        if transcurrido >= tiempo:
+            break
+    tracemalloc.start()
+    try:
+        operacion()
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        "ops_s": veces / transcurrido,
+        "ms_op": transcurrido / veces * 1000,
+        "pico_kib": pico / 1024,
+    }
+
+
+def comparar(resultado: dict, base: dict, tolerancia: float) -> list:
+    """Motivos por los que `resultado` es peor que `base` (vacío si no lo es)."""
+    problemas = []
+    if resultado["ops_s"] < base["ops_s"] * (1 - tolerancia):
+        problemas.append(f"{resultado['ops_s'] / base['ops_s'] - 1:+.0%} ops/s")
+    limite = base["pico_kib"] * (1 + tolerancia) + HOLGURA_MEMORIA_KIB
+    if resultado["pico_kib"] > limite:
+        problemas.append(
+            f"{resultado['pico_kib'] / max(base['pico_kib'], 1) - 1:+.0%} memoria"
+        )
+    return problemas
+
+
+def preparar_datos(escala: str, datos: str, regenerar: bool) -> str:
+    destino = os.path.join(datos, escala)
+    listo = os.path.join(destino, ".completo")
+    if regenerar or not os.path.exists(listo):
+        shutil.rmtree(destino, ignore_errors=True)
+        inicio = time.perf_counter()
+        generar(destino, *ESCALAS[escala])
+        with open(listo, "w", encoding="utf-8"):
+            pass
+        print(f"Datos '{escala}' generados en {time.perf_counter() - inicio:.1f} s.")
+    return destino
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description="Mide las operaciones más usadas con datos sintéticos.",
+    )
+    parser.add_argument("--escala", choices=list(ESCALAS), default="chica")
+    parser.add_argument("--solo", nargs="+", choices=list(MEDICIONES), metavar="NOMBRE")
+    parser.add_argument(
+        "--tiempo", type=float, default=1.0, help="segundos por medición"
+    )
+    parser.add_argument(
+        "--base", help="archivo de la base (por defecto, según la escala)"
+    )
+    parser.add_argument("--guardar-base", action="store_true")
+    parser.add_argument("--tolerancia", type=float, default=0.25)
+    parser.add_argument(
+        "--datos", default=DATOS, help="dónde guardar los datos generados"
+    )
+    parser.add_argument("--regenerar", action="store_true")
+    parser.add_argument(
+        "--fsync", action="store_true", help="medir con fsync (por defecto se omite)"
+    )
+    args = parser.parse_args(argv)
+
+    origen = preparar_datos(args.escala, args.datos, args.regenerar)
+    ruta_base = args.base or os.path.join(DIRECTORIO, f"base_{args.escala}.json")
+    base = {}
+    if os.path.exists(ruta_base):
+        with open(ruta_base, encoding="utf-8") as f:
+            base = json.load(f)
+
+    sincronizar = SINCRONIZAR
+    anterior = almacenamiento._almacen
+    configurar_escritura(args.fsync)
+    resultados = {}
+    regresiones = 0
+    print(f"{'medición':<28} {'ops/s':>10} {'ms/op':>10} {'pico KiB':>10}  vs. base")
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            directorio = os.path.join(tmp, "datos")
+            shutil.copytree(origen, directorio)
+            contexto = Contexto(directorio)
+            for nombre in args.solo or MEDICIONES:
+                resultado = medir(MEDICIONES[nombre](contexto), args.tiempo)
+                resultados[nombre] = resultado
+                if nombre in base:
+                    problemas = comparar(resultado, base[nombre], args.tolerancia)
+                    regresiones += bool(problemas)
+                    estado = "REGRESIÓN " + ", ".join(problemas) if problemas else "ok"
+                else:
+                    estado = "-"
+                print(
+                    f"{nombre:<28} {resultado['ops_s']:>10.1f} {resultado['ms_op']:>10.3f}"
+                    f" {resultado['pico_kib']:>10.0f}  {estado}"
+                )
+    finally:
+        configurar_escritura(sincronizar)
+        almacenamiento.configurar_almacenamiento(anterior)
+
+    if args.guardar_base:
+        base.update(resultados)
+        with open(ruta_base, "w", encoding="utf-8") as f:
+            json.dump(base, f, indent=4, ensure_ascii=False)
+        print(f"Base guardada en {ruta_base}.")
+    return 1 if regresiones else 0
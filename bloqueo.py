@@ -0,0 +1,103 @@
+"""
+Bloqueos de archivo entre procesos (advisory locks).
+
+Los archivos de datos se reemplazan con os.replace, así que el bloqueo se
+toma sobre un archivo "<ruta>.lock" al lado, que no cambia de inodo. En
+Unix se usa fcntl.flock, en Windows msvcrt.locking; si no hay ninguno de
+los dos, el bloqueo no hace nada.
+
+Solo se bloquea mientras se lee-modifica-escribe un archivo; elegir
+asientos o cargar datos en una pantalla no toma ningún bloqueo.
+"""
+
+import os
+import threading
+from contextlib import contextmanager
+
+from escritura import al_confirmar
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+try:
+    import msvcrt
+except ImportError:
+    msvcrt = None
+
+
+def _tomar(fd: int):
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+    elif msvcrt is not None:
+        # LK_LOCK reintenta durante ~10 s; se repite hasta conseguirlo
+        while True:
+            try:
+                msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+                return
+            except OSError:
+                continue
+
+
+def _soltar(fd: int):
+    try:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        elif msvcrt is not None:
+            os.lseek(fd, 0, os.SEEK_SET)
+            msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+    finally:
+        os.close(fd)
+
+
+# ruta del .lock -> [fd, cantidad de usos] de los bloqueos que tiene este proceso
+_tomados = {}
+# Un RLock por ruta ordena a los hilos del proceso; flock ordena a los procesos
+_locales = {}
+_mutex = threading.Lock()
+
+
+def _local(ruta_bloqueo: str) -> threading.RLock:
+    with _mutex:
+        return _locales.setdefault(ruta_bloqueo, threading.RLock())
+
+
+@contextmanager
+def bloquear(ruta: str):
+    """
+    Bloqueo exclusivo de `ruta` entre procesos e hilos. Es reentrante en el
+    mismo hilo. Si se toma dentro de agrupar_escrituras(), se suelta
+    recién cuando el grupo confirma, para que nadie lea-modifique-escriba
+    el archivo antes de que los cambios estén en disco.
+    """
+    ruta_bloqueo = os.path.abspath(ruta) + ".lock"
+    local = _local(ruta_bloqueo)
+    local.acquire()
+    try:
+        entrada = _tomados.get(ruta_bloqueo)
+        if entrada is None:
+            fd = os.open(ruta_bloqueo, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                _tomar(fd)
+            except BaseException:
+                os.close(fd)
+                raise
+            entrada = _tomados[ruta_bloqueo] = [fd, 0]
+        entrada[1] += 1
+    except BaseException:
+        local.release()
+        raise
+    try:
+        yield
+    finally:
+        al_confirmar(lambda: _liberar(ruta_bloqueo))
+
+
+def _liberar(ruta_bloqueo: str):
+    entrada = _tomados[ruta_bloqueo]
+    entrada[1] -= 1
+    if entrada[1] == 0:
+        del _tomados[ruta_bloqueo]
+        _soltar(entrada[0])
+    _local(ruta_bloqueo).release()
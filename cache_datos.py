@@ -0,0 +1,54 @@
+"""
+Caché en memoria de los archivos de datos ya leídos.
+
+Cada entrada guarda el contenido parseado junto con la firma (mtime, tamaño
+e inodo) de los archivos de los que salió. Mientras la firma no cambie se
+devuelve lo que está en memoria sin volver a abrir ni parsear nada; las
+funciones que guardan pueden además dejar el contenido nuevo en la caché
+(escritura directa) para no releer lo que acaban de escribir.
+"""
+
+import os
+
+
+def firma_archivo(ruta: str):
+    try:
+        st = os.stat(ruta)
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+class CacheArchivos:
+    def __init__(self):
+        self._entradas = {}  # clave -> (firma, valor)
+
+    def firma(self, rutas) -> tuple:
+        return tuple(firma_archivo(ruta) for ruta in rutas)
+
+    def vigente(self, clave, rutas):
+        """Devuelve el valor guardado si sigue al día con los archivos, o None."""
+        entrada = self._entradas.get(clave)
+        if entrada is not None and entrada[0] == self.firma(rutas):
+            return entrada[1]
+        return None
+
+    def leer(self, clave, rutas, cargar):
+        """Devuelve el valor en memoria o lo carga con `cargar()` si cambió."""
+        firma = self.firma(rutas)
+        entrada = self._entradas.get(clave)
+        if entrada is not None and entrada[0] == firma:
+            return entrada[1]
+        valor = cargar()
+        self._entradas[clave] = (firma, valor)
+        return valor
+
+    def escribir(self, clave, rutas, valor):
+        """Escritura directa: guarda `valor` como contenido actual de los archivos."""
+        self._entradas[clave] = (self.firma(rutas), valor)
+
+    def invalidar(self, clave=None):
+        if clave is None:
+            self._entradas.clear()
+        else:
+            self._entradas.pop(clave, None)
@@ -0,0 +1,172 @@
+import re
+import unicodedata
+from bisect import bisect_left
+from functools import lru_cache
+
+_PALABRA = re.compile(r"\w+")
+_DIACRITICOS = re.compile("[\u0300-\u036f]")
+
+MODOS_BUSQUEDA = ("exacto", "prefijo", "palabras")
+
+
+@lru_cache(maxsize=4096)
+def _normalizar(texto: str) -> tuple:
+    if not texto.isascii():
+        texto = _DIACRITICOS.sub("", unicodedata.normalize("NFKD", texto))
+    return tuple(_PALABRA.findall(texto.casefold()))
+
+
+def normalizar(texto: str) -> tuple:
+    """Palabras del texto en minúsculas y sin tildes ("Acción" -> ("accion",))."""
+    return _normalizar(texto or "")
+
+
+class IndiceTexto:
+    """
+    Índice invertido de un campo de texto (género o título).
+    Guarda el valor completo normalizado y cada una de sus palabras, con
+    listas ordenadas para resolver búsquedas por prefijo con bisect.
+    """
+
+    def __init__(self):
+        self.valores = {}  # valor normalizado -> claves
+        self.palabras = {}  # palabra -> claves
+        self._valores_ordenados = None
+        self._palabras_ordenadas = None
+
+    def agregar(self, clave, texto: str):
+        palabras = normalizar(texto)
+        valor = " ".join(palabras)
+        claves = self.valores.get(valor)
+        if claves is None:
+            claves = self.valores[valor] = set()
+        claves.add(clave)
+        for palabra in palabras:
+            claves = self.palabras.get(palabra)
+            if claves is None:
+                claves = self.palabras[palabra] = set()
+            claves.add(clave)
+        self._valores_ordenados = self._palabras_ordenadas = None
+
+    @staticmethod
+    def _con_prefijo(indice: dict, ordenadas: list, prefijo: str) -> set:
+        claves = set()
+        i = bisect_left(ordenadas, prefijo)
+        while i < len(ordenadas) and ordenadas[i].startswith(prefijo):
+            claves |= indice[ordenadas[i]]
+            i += 1
+        return claves
+
+    def buscar(self, consulta: str, modo: str = "exacto") -> set:
+        """
+        - exacto: el valor completo coincide.
+        - prefijo: el valor completo empieza por la consulta.
+        - palabras: cada palabra de la consulta es prefijo de alguna palabra.
+        """
+        palabras = normalizar(consulta)
+        if not palabras:
+            return set()
+        if modo == "exacto":
+            return set(self.valores.get(" ".join(palabras), ()))
+        if modo == "prefijo":
+            if self._valores_ordenados is None:
+                self._valores_ordenados = sorted(self.valores)
+            return self._con_prefijo(
+                self.valores, self._valores_ordenados, " ".join(palabras)
+            )
+        if modo == "palabras":
+            if self._palabras_ordenadas is None:
+                self._palabras_ordenadas = sorted(self.palabras)
+            resultado = None
+            for palabra in palabras:
+                claves = self._con_prefijo(
+                    self.palabras, self._palabras_ordenadas, palabra
+                )
+                resultado = claves if resultado is None else resultado & claves
+                if not resultado:
+                    break
+            return resultado
+        raise ValueError(f"Modo de búsqueda desconocido: {modo}")
+
+
+class CatalogoPeliculas:
+    """
+    Catálogo de películas en memoria, indexado por ID.
+    Conserva el orden del archivo y lleva el ID máximo, así que buscar,
+    actualizar, eliminar y asignar un ID nuevo no recorren las filas.
+    """
+
+    def __init__(self, filas=(), encabezados=None):
+        self.encabezados = encabezados
+        self._filas = {}  # clave interna -> fila, en el orden del archivo
+        self._por_id = {}  # ID -> clave interna de su fila
+        self._siguiente_clave = 0
+        self.max_id = 0
+        self._indices = None  # (género, título); se arman en la primera búsqueda
+        for fila in filas:
+            self.agregar(fila)
+
+    def __len__(self) -> int:
+        return len(self._filas)
+
+    def __contains__(self, id_pelicula) -> bool:
+        return id_pelicula in self._por_id
+
+    def filas(self) -> list:
+        return list(self._filas.values())
+
+    def obtener(self, id_pelicula: str):
+        clave = self._por_id.get(id_pelicula)
+        return None if clave is None else self._filas[clave]
+
+    def siguiente_id(self) -> str:
+        return str(self.max_id + 1)
+
+    def agregar(self, fila: dict):
+        clave = self._siguiente_clave
+        self._siguiente_clave += 1
+        self._filas[clave] = fila
+        self._indices = None
+        id_pelicula = fila.get("ID") or ""
+        # Con IDs repetidos manda la primera fila, como en la búsqueda lineal
+        self._por_id.setdefault(id_pelicula, clave)
+        if id_pelicula.isdigit():
+            self.max_id = max(self.max_id, int(id_pelicula))
+
+    def actualizar(self, fila: dict) -> bool:
+        clave = self._por_id.get(fila.get("ID"))
+        if clave is None:
+            return False
+        self._filas[clave] = fila
+        self._indices = None
+        return True
+
+    def eliminar(self, id_pelicula: str) -> bool:
+        clave = self._por_id.pop(id_pelicula, None)
+        if clave is None:
+            return False
+        del self._filas[clave]
+        self._indices = None
+        return True
+
+    # ------------------- Búsquedas -------------------
+
+    def _indices_busqueda(self):
+        if self._indices is None:
+            generos, titulos = IndiceTexto(), IndiceTexto()
+            for clave, fila in self._filas.items():
+                generos.agregar(clave, fila.get("Genero") or "")
+                titulos.agregar(clave, fila.get("Titulo") or "")
+            self._indices = (generos, titulos)
+        return self._indices
+
+    def _filas_de(self, claves: set) -> list:
+        return [self._filas[clave] for clave in sorted(claves)]
+
+    def buscar_genero(self, consulta: str, modo: str = "exacto") -> list:
+        """Películas por género (sin distinguir mayúsculas ni tildes)."""
+        return self._filas_de(self._indices_busqueda()[0].buscar(consulta, modo))
+
+    def buscar_titulo(self, consulta: str, modo: str = "palabras") -> list:
+        """Películas por título (sin distinguir mayúsculas ni tildes)."""
+        return self._filas_de(self._indices_busqueda()[1].buscar(consulta, modo))
@@ -0,0 +1,15 @@
+import pytest
+
+import almacenamiento
+
+
+@pytest.fixture(autouse=True)
+def almacenamiento_nuevo(monkeypatch, tmp_path):
+    """
+    Cada prueba arranca con un motor nuevo, sin cachés ni índices en memoria,
+    y con sus propias secuencias de ids (no quedan .seq en el repositorio).
+    """
+    monkeypatch.setenv("CINE_SECUENCIAS", str(tmp_path))
+    almacenamiento.configurar_almacenamiento(None)
+    yield
+    almacenamiento.configurar_almacenamiento(None)
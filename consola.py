@@ -0,0 +1,54 @@
+"""
+Consola compartida e importaciones diferidas para arrancar rápido.
+
+rich, readchar y curses tardan en importarse bastante más que el resto del
+programa (readchar carga importlib.metadata), y la mayoría de las pantallas
+no los necesita hasta que el usuario elige algo. Por eso:
+
+- importar_perezoso("readchar") devuelve un representante del módulo que
+  lo importa recién cuando se usa un atributo. Lo que se le asigna queda en
+  el representante, así que `reservas.curses.wrapper` y similares se pueden
+  seguir reemplazando en las pruebas;
+- cada módulo tiene su `console = Consola()`, un representante que crea
+  la consola de rich recién al primer uso y la comparte con los demás.
+  `modulo.console.print` se puede reemplazar sin afectar a otros módulos.
+
+Las clases de rich (Table, Panel, box) se importan dentro de las funciones
+que dibujan.
+"""
+
+import importlib
+import sys
+import types
+
+_consola = None
+
+
+class _ModuloPerezoso(types.ModuleType):
+    def __getattr__(self, atributo):
+        modulo = sys.modules.get(self.__name__)
+        if modulo is None:
+            modulo = importlib.import_module(self.__name__)
+        return getattr(modulo, atributo)
+
+
+def importar_perezoso(nombre: str):
+    """Módulo `nombre`, que se importa recién la primera vez que se usa."""
+    return sys.modules.get(nombre) or _ModuloPerezoso(nombre)
+
+
+def obtener_consola():
+    """La consola de rich compartida por todo el programa."""
+    global _consola
+    if _consola is None:
+        from rich.console import Console
+
+        _consola = Console()
+    return _consola
+
+
+class Consola:
+    """Representante de la consola compartida (ver el comentario del módulo)."""
+
+    def __getattr__(self, nombre):
+        return getattr(obtener_consola(), nombre)
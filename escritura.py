@@ -0,0 +1,272 @@
+"""
+Escritura atómica y durable de los archivos de datos.
+
+escribir_atomico() escribe en "<ruta>.tmp", hace fsync del archivo, lo
+renombra sobre el original con os.replace y hace fsync del directorio. Un
+corte en cualquier punto deja el archivo viejo o el nuevo completo, nunca
+uno a medias.
+
+Dentro de `with agrupar_escrituras():` los archivos se escriben igual en su
+.tmp, pero el fsync y el reemplazo se hacen todos juntos al salir del bloque
+(commit agrupado): varias escrituras del mismo archivo quedan en una sola, y
+cada directorio se sincroniza una vez. Si el bloque termina con una
+excepción, los .tmp pendientes se descartan y los archivos quedan como
+estaban.
+
+Commit agrupado por ventana (opcional): con CINE_FSYNC_VENTANA_MS=<ms>,
+lo que se guarda dentro de `with guardado_interactivo():` (el menú, donde
+cada tecla puede terminar en un guardado) se reemplaza en el momento pero
+su fsync queda pendiente. Un temporizador sincroniza todos los archivos
+pendientes, y cada directorio una sola vez, a los <ms> del primero; lo que
+quede se sincroniza al salir del proceso. Un corte de energía dentro de la
+ventana puede perder los últimos guardados. Fuera de guardado_interactivo()
+(la API, los comandos por lotes) todo sigue sincronizándose en el momento.
+
+Con CINE_FSYNC=0 se mantiene el reemplazo atómico pero se omiten los fsync
+(útil para pruebas y mediciones; no protege ante cortes de energía).
+"""
+
+import atexit
+import os
+import threading
+from contextlib import contextmanager
+
+SINCRONIZAR = os.environ.get("CINE_FSYNC", "1").strip().lower() not in (
+    "0",
+    "no",
+    "false",
+)
+VENTANA_S = float(os.environ.get("CINE_FSYNC_VENTANA_MS") or 0) / 1000
+
+
+class _Grupo:
+    def __init__(self):
+        self.pendientes = {}  # ruta -> ruta temporal
+        # Archivos modificados en el lugar (agregados al final) por sincronizar
+        self.por_sincronizar = []
+        # Acciones a correr cuando el grupo termina (por ejemplo, soltar bloqueos)
+        self.al_terminar = []
+        self.profundidad = 0
+
+
+# Cada hilo tiene su propio grupo abierto (o ninguno)
+_hilo = threading.local()
+
+
+def _grupo():
+    return getattr(_hilo, "grupo", None)
+
+
+def configurar_escritura(sincronizar: bool, ventana_ms: float = None):
+    """
+    Activa o desactiva los fsync (el reemplazo atómico se mantiene) y, si
+    se indica, fija la ventana del commit agrupado (0 la desactiva).
+    """
+    global SINCRONIZAR, VENTANA_S
+    SINCRONIZAR = sincronizar
+    if ventana_ms is not None:
+        vaciar_pendientes()
+        VENTANA_S = ventana_ms / 1000
+
+
+# ------------------- Commit agrupado por ventana -------------------
+
+_pendientes = {"archivos": [], "directorios": []}
+_mutex_pendientes = threading.Lock()
+_temporizador = None
+
+
+@contextmanager
+def guardado_interactivo():
+    """
+    Los guardados del bloque (en este hilo) difieren su fsync a la ventana
+    de CINE_FSYNC_VENTANA_MS. Sin ventana no cambia nada.
+    """
+    anterior = getattr(_hilo, "interactivo", False)
+    _hilo.interactivo = True
+    try:
+        yield
+    finally:
+        _hilo.interactivo = anterior
+
+
+def _diferir() -> bool:
+    return SINCRONIZAR and VENTANA_S > 0 and getattr(_hilo, "interactivo", False)
+
+
+def _encolar(archivos=(), directorios=()):
+    global _temporizador
+    with _mutex_pendientes:
+        for clave, rutas in (("archivos", archivos), ("directorios", directorios)):
+            for ruta in rutas:
+                if ruta not in _pendientes[clave]:
+                    _pendientes[clave].append(ruta)
+        if _temporizador is None:
+            _temporizador = threading.Timer(VENTANA_S, vaciar_pendientes)
+            _temporizador.daemon = True
+            _temporizador.start()
+
+
+def vaciar_pendientes():
+    """Sincroniza ya todo lo que espera la ventana del commit agrupado."""
+    global _temporizador
+    with _mutex_pendientes:
+        archivos = _pendientes["archivos"]
+        directorios = _pendientes["directorios"]
+        _pendientes["archivos"], _pendientes["directorios"] = [], []
+        if _temporizador is not None:
+            _temporizador.cancel()
+            _temporizador = None
+    for ruta in archivos:
+        if os.path.exists(ruta):
+            _fsync_ruta(ruta)
+    for directorio in directorios:
+        sincronizar_directorio(directorio)
+
+
+atexit.register(vaciar_pendientes)
+
+
+def sincronizar_directorio(directorio: str):
+    """fsync del directorio para que el rename quede en disco (no aplica en Windows)."""
+    if not SINCRONIZAR or os.name == "nt":
+        return
+    fd = os.open(directorio or ".", os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def sincronizar_archivo(f):
+    """
+    Vacía y sincroniza un archivo abierto que se modificó en el lugar
+    (por ejemplo, una línea agregada a un diario). Dentro de un grupo el
+    fsync se hace al confirmar.
+    """
+    f.flush()
+    sincronizar_descriptor(f.fileno(), f.name)
+
+
+def sincronizar_descriptor(fd: int, ruta: str):
+    """Como sincronizar_archivo, para un descriptor de os.open sobre `ruta`."""
+    if not SINCRONIZAR:
+        return
+    grupo = _grupo()
+    if grupo is not None:
+        if ruta not in grupo.por_sincronizar:
+            grupo.por_sincronizar.append(ruta)
+        return
+    if _diferir():
+        _encolar(archivos=[ruta])
+        return
+    os.fsync(fd)
+
+
+def al_confirmar(accion):
+    """
+    Corre `accion()` cuando el grupo abierto termina (confirmado o
+    descartado), o en el momento si no hay grupo.
+    """
+    grupo = _grupo()
+    if grupo is None:
+        accion()
+    else:
+        grupo.al_terminar.append(accion)
+
+
+def _fsync_ruta(ruta: str):
+    with open(ruta, "rb") as f:
+        os.fsync(f.fileno())
+
+
+def _confirmar(pendientes: dict, por_sincronizar: list):
+    diferir = _diferir()
+    sincronizar = SINCRONIZAR and not diferir
+    directorios = []
+    for ruta in por_sincronizar:
+        if sincronizar and ruta not in pendientes and os.path.exists(ruta):
+            _fsync_ruta(ruta)
+    for ruta, temp in pendientes.items():
+        if sincronizar:
+            _fsync_ruta(temp)
+        os.replace(temp, ruta)
+        directorio = os.path.dirname(ruta)
+        if directorio not in directorios:
+            directorios.append(directorio)
+    if diferir:
+        _encolar(list(por_sincronizar) + list(pendientes), directorios)
+        return
+    for directorio in directorios:
+        sincronizar_directorio(directorio)
+
+
+def _descartar(pendientes: dict):
+    for temp in pendientes.values():
+        if os.path.exists(temp):
+            os.remove(temp)
+
+
+def escribir_atomico(ruta: str, escribir, sincronizar: bool = True, **opciones_open):
+    """
+    Escribe `ruta` de forma atómica: `escribir(f)` recibe el archivo
+    temporal abierto con open(temp, "w", **opciones_open).
+
+    Con sincronizar=False se mantiene el reemplazo atómico pero no se hace
+    ningún fsync, ni se espera a un grupo abierto: para datos descartables
+    (como las retenciones de asientos) que no tienen que sobrevivir a un
+    corte de energía.
+    """
+    temp = ruta + ".tmp"
+    grupo = _grupo() if sincronizar else None
+    diferir = sincronizar and grupo is None and _diferir()
+    try:
+        with open(temp, "w", **opciones_open) as f:
+            escribir(f)
+            if SINCRONIZAR and sincronizar and grupo is None and not diferir:
+                f.flush()
+                os.fsync(f.fileno())
+        if grupo is not None:
+            # Se confirma al cerrar el grupo
+            grupo.pendientes[ruta] = temp
+            return
+        os.replace(temp, ruta)
+    except Exception:
+        if os.path.exists(temp):
+            os.remove(temp)
+        raise
+    if not sincronizar:
+        return
+    if diferir:
+        _encolar([ruta], [os.path.dirname(ruta)])
+        return
+    sincronizar_directorio(os.path.dirname(ruta))
+
+
+@contextmanager
+def agrupar_escrituras():
+    """
+    Agrupa las escrituras del bloque en un único commit al salir.
+    Los grupos anidados se suman al más externo, que es el que confirma.
+    Cada hilo tiene su propio grupo.
+    """
+    grupo = _grupo()
+    if grupo is None:
+        grupo = _hilo.grupo = _Grupo()
+    grupo.profundidad += 1
+    completo = False
+    try:
+        yield
+        completo = True
+    finally:
+        grupo.profundidad -= 1
+        if grupo.profundidad == 0:
+            _hilo.grupo = None
+            try:
+                if completo:
+                    _confirmar(grupo.pendientes, grupo.por_sincronizar)
+                else:
+                    _descartar(grupo.pendientes)
+            finally:
+                for accion in grupo.al_terminar:
+                    accion()
@@ -1,21 +1,21 @@
-import csv
-import curses
-import json
 import os
-import re
 
-import readchar
-from rich import box
-from rich.console import Console
-from rich.panel import Panel
-from rich.table import Table
+from almacenamiento import (
+    ARCHIVO_FUNCIONES,
+    ARCHIVO_PELICULAS,
+    ARCHIVO_RESERVAS,
+    CAMPOS_FUNCIONES,
+    obtener_almacenamiento,
+)
+from asientos import MapaAsientos, crear_mapa_asientos
+from consola import Consola, importar_perezoso
+from horarios import IndiceHorarios, duraciones_peliculas
+from metricas import instrumentar
+from perfilado import perfilar_accion, punto
+from validacion import HORA, TEXTO_FUNCION
 
-from asientos import crear_mapa_asientos, serializar_asientos
-
-console = Console()
-ARCHIVO_PELICULAS = "peliculas.csv"
-ARCHIVO_FUNCIONES = "funciones.csv"
-ARCHIVO_RESERVAS = "reservas.json"
+readchar = importar_perezoso("readchar")
+console = Consola()
 
 
 # Función para limpiar pantalla
@@ -23,114 +23,95 @@ def limpiar_pantalla():
     os.system("cls")
 
 
+def armar_funcion(row, ocupados):
+    """Normaliza una fila de funciones y arma su mapa con los asientos ocupados."""
+    row["id_funcion"] = str(row.get("id_funcion", "")).strip()
+    row["id_pelicula"] = str(row.get("id_pelicula", "")).strip()
+    row["sala"] = str(row.get("sala", "")).strip()
+    row["hora"] = str(row.get("hora", "")).strip()
+
+    try:
+        row["asientos_disponibles"] = int(row.get("asientos_disponibles", 0))
+    except Exception:
+        row["asientos_disponibles"] = 0
+    total = row["asientos_disponibles"]
+    mapa = crear_mapa_asientos(total)
+    # Marcar ocupados
+    for ocupado in ocupados:
+        if ocupado in mapa:
+            mapa[ocupado] = "ocupado"
+    row["asientos"] = mapa
+    row["asientos_ocupados"] = sorted(ocupados)
+    return row
+
+
+@instrumentar("cargar_funciones")
 def cargar_funciones():
     funciones = []
-    ocupados_por_funcion = {}
-
-    # Cargar reservas y agrupar asientos ocupados por función
-    if os.path.exists(ARCHIVO_RESERVAS):
-        with open(ARCHIVO_RESERVAS, "r", encoding="utf-8") as f:
-            try:
-                reservas = json.load(f)
-                for r in reservas:
-                    id_funcion = r.get("id_funcion")
-                    if not id_funcion:
-                        continue
-                    if id_funcion not in ocupados_por_funcion:
-                        ocupados_por_funcion[id_funcion] = []
-                    ocupados_por_funcion[id_funcion].extend(r.get("asientos", []))
-            except Exception as e:
-                console.print(f"[yellow]Error al leer {ARCHIVO_RESERVAS}: {e}[/yellow]")
-
-    # Cargar funciones desde CSV
-    if not os.path.exists(ARCHIVO_FUNCIONES):
-        return funciones
+    almacen = obtener_almacenamiento()
 
+    # Cargar funciones
     try:
-        with open(ARCHIVO_FUNCIONES, newline="", encoding="utf-8") as f:
-            reader = csv.DictReader(f)
-            expected = [
-                "id_funcion",
-                "id_pelicula",
-                "sala",
-                "hora",
-                "asientos_disponibles",
-                "asientos",
-            ]
-
-            if reader.fieldnames is None:
-                return funciones
-
-            # Normalizar encabezados
-            headers = [h.strip().lower().lstrip("\ufeff") for h in reader.fieldnames]
-
-            # Verificar que todos los esperados estén presentes
-            if not all(e in headers for e in expected):
-                console.print(
-                    f"[yellow]Encabezados inesperados en {ARCHIVO_FUNCIONES}. "
-                    f"Se esperaban al menos: {expected}[/yellow]"
-                )
-            for row in reader:
-                # Normalizar campos
-                row["id_funcion"] = str(row.get("id_funcion", "")).strip()
-                row["id_pelicula"] = str(row.get("id_pelicula", "")).strip()
-                row["sala"] = str(row.get("sala", "")).strip()
-                row["hora"] = str(row.get("hora", "")).strip()
-
-                try:
-                    row["asientos_disponibles"] = int(
-                        row.get("asientos_disponibles", 0)
-                    )
-                except Exception:
-                    row["asientos_disponibles"] = 0
-                total = row["asientos_disponibles"]
-                mapa = crear_mapa_asientos(total)
-                # Marcar ocupados
-                for ocupado in ocupados_por_funcion.get(row["id_funcion"], []):
-                    if ocupado in mapa:
-                        mapa[ocupado] = "ocupado"
-                row["asientos"] = mapa
-                row["asientos_ocupados"] = ocupados_por_funcion.get(
-                    row["id_funcion"], []
-                )
+        filas = almacen.leer_funciones()
+    except Exception as e:
+        console.print(f"[yellow]Error al leer {ARCHIVO_FUNCIONES}: {e}[/yellow]")
+        return funciones
+    if not filas:
+        return funciones
 
-                funciones.append(row)
+    # Normalizar encabezados y verificar que estén los esperados
+    headers = [h.strip().lower().lstrip("\ufeff") for h in filas[0] if h]
+    if not all(e in headers for e in CAMPOS_FUNCIONES):
+        console.print(
+            f"[yellow]Encabezados inesperados en {ARCHIVO_FUNCIONES}. "
+            f"Se esperaban al menos: {CAMPOS_FUNCIONES}[/yellow]"
+        )
 
+    # Asientos ocupados solo de las funciones listadas (índice por función)
+    ids = {str(row.get("id_funcion", "")).strip() for row in filas}
+    try:
+        ocupados_por_funcion = almacen.ocupados_por_funcion(ids)
     except Exception as e:
-        console.print(f"[yellow]Error al leer {ARCHIVO_FUNCIONES}: {e}[/yellow]")
+        console.print(f"[yellow]Error al leer {ARCHIVO_RESERVAS}: {e}[/yellow]")
+        ocupados_por_funcion = {}
 
+    for row in filas:
+        id_funcion = str(row.get("id_funcion", "")).strip()
+        funciones.append(armar_funcion(row, ocupados_por_funcion.get(id_funcion, ())))
+
+    punto("cargar_funciones")
     return funciones
 
 
-def guardar_funcion(funciones):
-    atributos = [
-        "id_funcion",
-        "id_pelicula",
-        "sala",
-        "hora",
-        "asientos_disponibles",
-        "asientos",
-    ]
-    temp = ARCHIVO_FUNCIONES + ".tmp"
+def cargar_funcion(id_funcion):
+    """Carga una sola función; solo consulta los asientos ocupados de esa función."""
+    almacen = obtener_almacenamiento()
+    try:
+        row = almacen.obtener_funcion(id_funcion)
+    except Exception as e:
+        console.print(f"[yellow]Error al leer {ARCHIVO_FUNCIONES}: {e}[/yellow]")
+        return None
+    if row is None:
+        return None
+    try:
+        ocupados = almacen.ocupados_de(id_funcion)
+    except Exception as e:
+        console.print(f"[yellow]Error al leer {ARCHIVO_RESERVAS}: {e}[/yellow]")
+        ocupados = set()
+    return armar_funcion(row, ocupados)
 
+
+@instrumentar("guardar_funcion")
+def guardar_funcion(funciones, modificadas=None):
+    """
+    Guarda la lista de funciones. Con `modificadas` solo se escriben esas
+    filas sobre lo que haya guardado en ese momento (el CSV se relee bajo
+    el bloqueo), así no se pierden funciones creadas en otra terminal.
+    """
     try:
-        with open(temp, "w", newline="", encoding="utf-8") as csvfile:
-            writer = csv.DictWriter(csvfile, fieldnames=atributos)
-            writer.writeheader()
-            for fn in funciones:
-                fila = {k: v for k, v in fn.items() if k in atributos}
-                fila["id_funcion"] = str(fila.get("id_funcion", ""))
-                fila["id_pelicula"] = str(fila.get("id_pelicula", ""))
-                fila["sala"] = str(fila.get("sala", ""))
-                fila["hora"] = str(fila.get("hora", ""))
-                fila["asientos_disponibles"] = str(fila.get("asientos_disponibles", 0))
-                fila["asientos"] = serializar_asientos(fila.get("asientos", {}))
-                writer.writerow(fila)
-        os.replace(temp, ARCHIVO_FUNCIONES)
+        obtener_almacenamiento().guardar_funciones(funciones, modificadas)
     except Exception as e:
         console.print(f"[yellow] Error guardando {ARCHIVO_FUNCIONES}: {e}[/yellow]")
-        if os.path.exists(temp):
-            os.remove(temp)
 
 
 def validar_texto(valor: str, campo: str, max_len: int = 64) -> str:
@@ -143,8 +124,7 @@ def validar_texto(valor: str, campo: str, max_len: int = 64) -> str:
         raise ValueError(f" {campo} no puede estar vacío.")
     if len(valor) > max_len:
         raise ValueError(f" {campo} demasiado largo (máx {max_len} caracteres).")
-    patron = r"^[A-Za-zÁÉÍÓÚáéíóú0-9\s\-:]+$"
-    if not re.match(patron, valor):
+    if not TEXTO_FUNCION.fullmatch(valor):
         raise ValueError(
             f" {campo} solo puede contener letras, números, espacios o guiones."
         )
@@ -167,32 +147,20 @@ def validar_entero(valor: str, campo: str, minimo: int = 0, maximo: int = 1000)
 def validar_hora(valor: str, campo: str) -> str:
     """Valida formato HH:MM y rango 00:00-23:59"""
     valor = valor.strip()
-    if not re.match(r"^\d{1,2}:\d{2}$", valor):
+    coincidencia = HORA.fullmatch(valor)
+    if not coincidencia:
         raise ValueError(f" {campo} debe tener formato HH:MM.")
-    horas, minutos = valor.split(":")
-    try:
-        h = int(horas)
-        m = int(minutos)
-    except ValueError:
-        raise ValueError(f" {campo} contiene valores no numéricos.")
+    h, m = int(coincidencia[1]), int(coincidencia[2])
     if not (0 <= h <= 23 and 0 <= m <= 59):
         raise ValueError(f" {campo} fuera de rango. Usa 00:00-23:59.")
     return f"{h:02d}:{m:02d}"
 
 
-def calcular_max_asientos(stdscr):
-    """
-    Calcula el máximo de asientos que se pueden mostrar en la consola actual.
-    - Cada asiento ocupa ~6 caracteres de ancho.
-    - Cada fila ocupa 2 líneas de alto.
-    """
-    alto, ancho = stdscr.getmaxyx()
-    max_columnas = ancho // 6
-    max_filas = (alto - 4) // 2
-    return max_columnas * max_filas
-
-
+@instrumentar("ver_funciones")
 def ver_funciones(funciones, peliculas):
+    from rich import box
+    from rich.table import Table
+
     if not funciones:
         console.print("[bold gold1] No hay funciones registradas.[/bold gold1]")
         return
@@ -219,8 +187,12 @@ def ver_funciones(funciones, peliculas):
         id_pelicula = fn.get("id_pelicula", "N/A")
         titulo = peliculas.get(id_pelicula, "N/A")
         mapa = fn.get("asientos", {})
-        ocupados = sum(1 for v in mapa.values() if v == "ocupado")
-        libres = sum(1 for v in mapa.values() if v == "libre")
+        if isinstance(mapa, MapaAsientos):
+            ocupados = mapa.ocupados()
+            libres = mapa.libres()
+        else:
+            ocupados = sum(1 for v in mapa.values() if v == "ocupado")
+            libres = sum(1 for v in mapa.values() if v == "libre")
 
         tabla.add_row(
             fn["id_funcion"],
@@ -232,82 +204,82 @@ def ver_funciones(funciones, peliculas):
             str(ocupados),
         )
 
+    punto("ver_funciones")
     console.print(tabla)
 
 
+@instrumentar("mostrar_tabla_peliculas")
 def mostrar_tabla_peliculas():
     """
     Muestra la tabla de películas disponibles usando rich.Table.
     Devuelve un dict {id: título} para validación.
     Detecta encabezados aunque estén en mayúsculas, acentuados o con paréntesis.
     """
+    from rich import box
+    from rich.table import Table
+
     peliculas = {}
-    ruta = "peliculas.csv"
-    if not os.path.exists(ruta):
-        console.print("[yellow]No se encontró el archivo peliculas.csv[/yellow]")
-        return peliculas
+    ruta = ARCHIVO_PELICULAS
 
     try:
-        with open(ruta, mode="r", encoding="utf-8") as archivo:
-            reader = csv.DictReader(archivo)
-            if not reader.fieldnames:
-                console.print(
-                    "[yellow]El archivo está vacío o sin encabezados.[/yellow]"
-                )
-                return peliculas
-
-            # Normalizar encabezados
-            encabezados = {
-                h.strip()
-                .lower()
-                .replace("í", "i")
-                .replace("ó", "o")
-                .replace("ú", "u")
-                .replace("é", "e")
-                .replace("á", "a")
-                .replace("(", "")
-                .replace(")", "")
-                .replace(" ", ""): h
-                for h in reader.fieldnames
-            }
-
-            id_field = encabezados.get("id") or encabezados.get("idpelicula")
-            title_field = encabezados.get("titulo")
-            genre_field = encabezados.get("genero")
-            dur_field = next((h for k, h in encabezados.items() if "dura" in k), None)
-
-            if not id_field:
-                console.print(
-                    "[yellow]No se encontró columna de ID en el archivo.[/yellow]"
-                )
-                return peliculas
-
-            tabla = Table(
-                title="[bold black on gold1]Listado de películas[/bold black on gold1]",
-                show_header=True,
-                header_style="bold bright_white",
-                box=box.ROUNDED,
-                border_style="bold dark_blue",
-                show_lines=True,
+        filas = obtener_almacenamiento().leer_peliculas()
+        if not filas:
+            console.print("[yellow]No hay películas registradas.[/yellow]")
+            return peliculas
+
+        # Normalizar encabezados
+        encabezados = {
+            h.strip()
+            .lower()
+            .replace("í", "i")
+            .replace("ó", "o")
+            .replace("ú", "u")
+            .replace("é", "e")
+            .replace("á", "a")
+            .replace("(", "")
+            .replace(")", "")
+            .replace(" ", ""): h
+            for h in filas[0]
+            if h
+        }
+
+        id_field = encabezados.get("id") or encabezados.get("idpelicula")
+        title_field = encabezados.get("titulo")
+        genre_field = encabezados.get("genero")
+        dur_field = next((h for k, h in encabezados.items() if "dura" in k), None)
+
+        if not id_field:
+            console.print(
+                "[yellow]No se encontró columna de ID en el archivo.[/yellow]"
             )
-            tabla.add_column("ID", style="orange3")
-            tabla.add_column("Título", style="bold grey70")
-            tabla.add_column("Género", style="bold grey70")
-            tabla.add_column("Duración", justify="right", style="bold grey70")
-
-            for fila in reader:
-                pid = str(fila.get(id_field, "")).strip()
-                titulo = str(fila.get(title_field, "")).strip() if title_field else "-"
-                genero = str(fila.get(genre_field, "")).strip() if genre_field else "-"
-                duracion = str(fila.get(dur_field, "")).strip() if dur_field else "-"
-                if pid:
-                    peliculas[pid] = titulo or "-"
-                    tabla.add_row(pid, titulo or "-", genero or "-", duracion or "-")
-
-            if peliculas:
-                console.print(tabla)
-            else:
-                console.print("[yellow]No hay películas registradas.[/yellow]")
+            return peliculas
+
+        tabla = Table(
+            title="[bold black on gold1]Listado de películas[/bold black on gold1]",
+            show_header=True,
+            header_style="bold bright_white",
+            box=box.ROUNDED,
+            border_style="bold dark_blue",
+            show_lines=True,
+        )
+        tabla.add_column("ID", style="orange3")
+        tabla.add_column("Título", style="bold grey70")
+        tabla.add_column("Género", style="bold grey70")
+        tabla.add_column("Duración", justify="right", style="bold grey70")
+
+        for fila in filas:
+            pid = str(fila.get(id_field, "")).strip()
+            titulo = str(fila.get(title_field, "")).strip() if title_field else "-"
+            genero = str(fila.get(genre_field, "")).strip() if genre_field else "-"
+            duracion = str(fila.get(dur_field, "")).strip() if dur_field else "-"
+            if pid:
+                peliculas[pid] = titulo or "-"
+                tabla.add_row(pid, titulo or "-", genero or "-", duracion or "-")
+
+        if peliculas:
+            console.print(tabla)
+        else:
+            console.print("[yellow]No hay películas registradas.[/yellow]")
 
     except Exception as e:
         console.print(f"[yellow]Error leyendo {ruta}: {e}[/yellow]")
@@ -322,11 +294,8 @@ def crear_funcion():
     )
 
     try:
-        # Generar ID de función automáticamente (incremental)
-        if funciones:
-            id_funcion = str(len(funciones) + 1)
-        else:
-            id_funcion = "1"
+        # ID de la secuencia persistente: no se repite aunque se borren funciones
+        id_funcion = str(obtener_almacenamiento().siguiente_id("funciones"))
         console.print(
             f"[cyan]ID de función asignado automáticamente: {id_funcion}[/cyan]"
         )
@@ -350,6 +319,10 @@ def crear_funcion():
                 continue
             break
 
+        # Horarios ocupados de cada sala según la duración de las películas
+        duraciones = duraciones_peliculas(obtener_almacenamiento().leer_peliculas())
+        horarios = IndiceHorarios.desde_funciones(funciones, duraciones)
+
         # Validar sala
         while True:
             sala = input("Escribe el numero de la sala (o '-' para salir): ").strip()
@@ -367,25 +340,26 @@ def crear_funcion():
                 return
             try:
                 hora = validar_hora(hora_input, "Hora")
-                # Validar que no haya otra función en la misma sala y hora
-                conflicto = any(
-                    f["sala"] == sala and f["hora"] == hora for f in funciones
+                # Validar que la sala esté libre durante toda la película
+                conflictos = horarios.conflictos(
+                    sala, hora, duraciones.get(id_pelicula, 0)
                 )
-                if conflicto:
+                if conflictos:
                     console.print(
-                        f"[yellow]Ya existe una función en la sala {sala} a las {hora}. Elige otro horario o sala.[/yellow]"
+                        f"[yellow]La sala {sala} está ocupada a esa hora por la función {', '.join(conflictos)} "
+                        f"(duración + {horarios.limpieza} min de limpieza). Elige otro horario o sala.[/yellow]"
                     )
                     continue  # vuelve a pedir hora
                 break
             except ValueError as e:
                 console.print(f"[red]{e}[/red]")
 
-        # Valida asientos disponibles
-        max_asientos = curses.wrapper(calcular_max_asientos)
+        # Valida asientos disponibles (la pantalla de selección se desplaza,
+        # así que la sala no tiene que entrar en la consola)
         while True:
             try:
                 asientos_input = input(
-                    f"Asientos disponibles (máx {max_asientos}) (o '-' para salir): "
+                    "Asientos disponibles (máx 1000) (o '-' para salir): "
                 )
                 if asientos_input == "-":
                     return
@@ -393,11 +367,6 @@ def crear_funcion():
                     asientos_input,
                     "Asientos disponibles",
                 )
-                if asientos_disponibles > max_asientos:
-                    console.print(
-                        f"[yellow]El máximo permitido en esta consola es {max_asientos} asientos.[/yellow]"
-                    )
-                    continue
                 if asientos_disponibles <= 0:
                     console.print("[yellow]Debes ingresar al menos 1 asiento.[/yellow]")
                     continue
@@ -418,7 +387,7 @@ def crear_funcion():
         }
 
         funciones.append(nueva_funcion)
-        guardar_funcion(funciones)
+        guardar_funcion(funciones, modificadas=[nueva_funcion])
         console.print("[bold yellow]Función creada exitosamente.[/bold yellow]")
 
     except Exception as e:
@@ -429,6 +398,8 @@ def editar_funcion():
     funciones = cargar_funciones()
     peliculas = mostrar_tabla_peliculas()
     ver_funciones(funciones, peliculas)
+    duraciones = duraciones_peliculas(obtener_almacenamiento().leer_peliculas())
+    horarios = IndiceHorarios.desde_funciones(funciones, duraciones)
 
     id_funcion = input("\n Ingrese el ID de la función a editar: ").strip()
     encontrada = False
@@ -442,20 +413,34 @@ def editar_funcion():
                 console.print(
                     f"ID de película (actual: {funcion['id_pelicula']}) - No editable"
                 )
-                funcion["sala"] = validar_texto(
+                sala = validar_texto(
                     input(f"Nueva sala (actual: {funcion['sala']}): ")
                     or funcion["sala"],
                     "Sala",
                 )
-                funcion["hora"] = validar_texto(
+                hora = validar_hora(
                     input(f"Nuevo horario (actual: {funcion['hora']}): ")
                     or funcion["hora"],
                     "Hora",
                 )
+                conflictos = horarios.conflictos(
+                    sala,
+                    hora,
+                    duraciones.get(funcion["id_pelicula"], 0),
+                    excepto=id_funcion,
+                )
+                if conflictos:
+                    console.print(
+                        f"[yellow]La sala {sala} está ocupada a esa hora por la función {', '.join(conflictos)}. "
+                        "No se guardaron cambios.[/yellow]"
+                    )
+                    break
+                funcion["sala"] = sala
+                funcion["hora"] = hora
                 console.print(
                     f"Asientos disponibles (actual: {funcion['asientos_disponibles']}) - No editable"
                 )
-                guardar_funcion(funciones)
+                guardar_funcion(funciones, modificadas=[funcion])
                 console.print(
                     "[bold yellow] Función actualizada correctamente.[/bold yellow]"
                 )
@@ -475,6 +460,8 @@ def pausar_pantalla():
 
 
 def mostrar_titulo(titulo: str):
+    from rich.panel import Panel
+
     console.print(
         Panel(
             f"[bold black on yellow]{titulo.upper()}[/bold  black on yellow]",
@@ -485,6 +472,9 @@ def mostrar_titulo(titulo: str):
 
 
 def menu_funciones() -> None:
+    from rich import box
+    from rich.table import Table
+
     opciones = ["VER FUNCIONES", "CREAR FUNCIÓN", "EDITAR FUNCIÓN", "VOLVER"]
     seleccionado = 0
 
@@ -523,14 +513,17 @@ def menu_funciones() -> None:
         elif tecla == readchar.key.ENTER:
             if opciones[seleccionado] == "VER FUNCIONES":
                 limpiar_pantalla()
-                peliculas = mostrar_tabla_peliculas()
-                ver_funciones(cargar_funciones(), peliculas)
+                with perfilar_accion("ver_funciones"):
+                    peliculas = mostrar_tabla_peliculas()
+                    ver_funciones(cargar_funciones(), peliculas)
                 pausar_pantalla()
             elif opciones[seleccionado] == "CREAR FUNCIÓN":
-                crear_funcion()
+                with perfilar_accion("crear_funcion"):
+                    crear_funcion()
                 pausar_pantalla()
             elif opciones[seleccionado] == "EDITAR FUNCIÓN":
-                editar_funcion()
+                with perfilar_accion("editar_funcion"):
+                    editar_funcion()
                 pausar_pantalla()
             elif opciones[seleccionado] == "VOLVER":
                 break
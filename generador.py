@@ -0,0 +1,284 @@
+"""
+Generador de datos sintéticos con los formatos reales.
+
+    python -m generador --destino DIR [--peliculas 1000] [--funciones 10000]
+                        [--reservas 100000] [--semilla 1] [--ocupacion 0.5]
+                        [--forzar]
+
+Escribe peliculas.csv, funciones.csv y reservas.json en DIR con los mismos
+encabezados que leen cargar_peliculas y cargar_funciones, y asientos con
+las etiquetas de crear_mapa_asientos. Con la misma semilla los archivos
+salen idénticos byte a byte.
+
+Los datos son coherentes entre sí:
+- cada función usa una película existente, y las funciones de una sala se
+  encadenan entre la apertura y el cierre dejando la duración de la
+  película más la limpieza (el mismo criterio que IndiceHorarios), así que
+  nunca se superponen;
+- las reservas de cada función ocupan asientos libres y consecutivos desde
+  el primero, hasta `ocupacion` de la sala (el resto queda libre para
+  reservas nuevas), y se reparten en proporción entre las funciones.
+
+Todo se escribe fila a fila: en memoria solo queda la duración de cada
+película (2 bytes por película), así que sirve para millones de filas.
+Los tres archivos se escriben con escribir_atomico dentro de un mismo
+agrupar_escrituras(): se reemplazan juntos al final, así que un error (por
+ejemplo, reservas que no entran) o un corte no deja archivos a medias ni
+películas nuevas con funciones y reservas viejas.
+"""
+
+import argparse
+import csv
+import json
+import os
+import random
+import sys
+import time
+from array import array
+
+from almacenamiento import (
+    ARCHIVO_FUNCIONES,
+    ARCHIVO_PELICULAS,
+    ARCHIVO_RESERVAS,
+    CAMPOS_FUNCIONES,
+    CAMPOS_PELICULAS,
+)
+from asientos import calcular_distribucion, crear_mapa_asientos, serializar_asientos
+from escritura import agrupar_escrituras, escribir_atomico
+from horarios import LIMPIEZA_MIN, minutos
+from programador import PASO_MIN
+
+GENEROS = [
+    "Acción",
+    "Animación",
+    "Ciencia ficción",
+    "Comedia",
+    "Documental",
+    "Drama",
+    "Romance",
+    "Terror",
+]
+PALABRAS = [
+    "Noche",
+    "Ciudad",
+    "Regreso",
+    "Sombra",
+    "Viaje",
+    "Último",
+    "Río",
+    "Fuego",
+    "Silencio",
+    "Mar",
+    "Guardián",
+    "Estrella",
+]
+CAPACIDADES = [60, 80, 100, 120, 150, 200]
+DURACION_MIN, DURACION_MAX = 80, 170
+APERTURA, CIERRE = "10:00", "23:30"
+MAX_BOLETOS = 4  # asientos por reserva
+
+
+def etiqueta_asiento(total: int, posicion: int) -> str:
+    """Etiqueta del asiento en `posicion` de un mapa de `total` asientos."""
+    _, columnas = calcular_distribucion(total)
+    return f"{columnas[posicion % len(columnas)]}{posicion // len(columnas) + 1}"
+
+
+def _hora(minuto: int) -> str:
+    return f"{minuto // 60:02d}:{minuto % 60:02d}"
+
+
+def _escribir_peliculas(f, azar, peliculas: int, duraciones: array):
+    escritor = csv.writer(f)
+    escritor.writerow(CAMPOS_PELICULAS)
+    for id_ in range(1, peliculas + 1):
+        titulo = " ".join(azar.sample(PALABRAS, azar.randint(1, 3)))
+        duracion = azar.randint(DURACION_MIN, DURACION_MAX)
+        duraciones.append(duracion)
+        escritor.writerow([id_, f"{titulo} {id_}", azar.choice(GENEROS), duracion])
+
+
+def _funciones(azar, cantidad: int, duraciones: array):
+    """
+    Recorre (id_pelicula, sala, hora, capacidad) encadenando funciones en
+    cada sala; cuando la película sorteada no termina antes del cierre se
+    pasa a una sala nueva.
+    """
+    apertura, cierre = minutos(APERTURA), minutos(CIERRE)
+    sala, libre, capacidad = 0, cierre, 0
+    for _ in range(cantidad):
+        id_pelicula = azar.randint(1, len(duraciones))
+        duracion = duraciones[id_pelicula - 1]
+        if libre + duracion > cierre:
+            sala, libre = sala + 1, apertura
+            capacidad = azar.choice(CAPACIDADES)
+        yield id_pelicula, sala, _hora(libre), capacidad
+        libre = -(-(libre + duracion + LIMPIEZA_MIN) // PASO_MIN) * PASO_MIN
+
+
+def generar(
+    directorio: str,
+    peliculas: int,
+    funciones: int,
+    reservas: int,
+    semilla: int = 1,
+    ocupacion: float = 0.5,
+) -> dict:
+    """
+    Escribe los tres archivos en `directorio` y devuelve cuántas filas de
+    cada uno se generaron (más la cantidad de salas usadas). ValueError si
+    las reservas no entran en `ocupacion` de las salas.
+    """
+    if peliculas < 1 and funciones:
+        raise ValueError("Hacen falta películas para generar funciones.")
+    if funciones < 1 and reservas:
+        raise ValueError("Hacen falta funciones para generar reservas.")
+    if not 0 < ocupacion <= 1:
+        raise ValueError("La ocupación debe estar entre 0 y 1.")
+    azar = random.Random(semilla)
+    os.makedirs(directorio, exist_ok=True)
+    duraciones = array("H")
+
+    mapas = {c: serializar_asientos(crear_mapa_asientos(c)) for c in CAPACIDADES}
+    resumen = {
+        "peliculas": peliculas,
+        "funciones": funciones,
+        "salas": 0,
+        "reservas": 0,
+    }
+
+    def escribir_funciones(archivo_funciones):
+        escritor = csv.writer(archivo_funciones)
+        escritor.writerow(CAMPOS_FUNCIONES)
+
+        def escribir_reservas(archivo_reservas):
+            archivo_reservas.write("[")
+            emitidas = 0
+            filas = _funciones(azar, funciones, duraciones)
+            for n, (id_pelicula, sala, hora, capacidad) in enumerate(filas):
+                id_funcion = n + 1
+                resumen["salas"] = sala
+                escritor.writerow(
+                    [id_funcion, id_pelicula, sala, hora, capacidad, mapas[capacidad]]
+                )
+                # Reparto proporcional: lo que no entró en funciones
+                # anteriores se arrastra a las siguientes
+                limite = int(capacidad * ocupacion)
+                cantidad = min(reservas * id_funcion // funciones - emitidas, limite)
+                vendidos = 0
+                for k in range(cantidad):
+                    # Cada reserva deja al menos un asiento a las que faltan
+                    boletos = min(
+                        azar.randint(1, MAX_BOLETOS),
+                        limite - vendidos - (cantidad - k - 1),
+                    )
+                    emitidas += 1
+                    reserva = {
+                        "id_reserva": emitidas,
+                        "nombre_cliente": f"Cliente {azar.choice(PALABRAS)}",
+                        "id_funcion": str(id_funcion),
+                        "asientos": [
+                            etiqueta_asiento(capacidad, p)
+                            for p in range(vendidos, vendidos + boletos)
+                        ],
+                        "cantidad_boletos": boletos,
+                    }
+                    vendidos += boletos
+                    archivo_reservas.write(",\n" if emitidas > 1 else "\n")
+                    archivo_reservas.write(json.dumps(reserva, ensure_ascii=False))
+            if emitidas < reservas:
+                raise ValueError(
+                    f"Solo entran {emitidas} de {reservas} reservas con una "
+                    f"ocupación de {ocupacion:.0%}: genera más funciones."
+                )
+            archivo_reservas.write("\n]\n")
+            resumen["reservas"] = emitidas
+
+        escribir_atomico(
+            os.path.join(directorio, ARCHIVO_RESERVAS),
+            escribir_reservas,
+            encoding="utf-8",
+        )
+
+    with agrupar_escrituras():
+        escribir_atomico(
+            os.path.join(directorio, ARCHIVO_PELICULAS),
+            lambda f: _escribir_peliculas(f, azar, peliculas, duraciones),
+            newline="",
+            encoding="utf-8",
+        )
+        escribir_atomico(
+            os.path.join(directorio, ARCHIVO_FUNCIONES),
+            escribir_funciones,
+            newline="",
+            encoding="utf-8",
+        )
+    # Secuencias de ids de datos anteriores: se recalculan desde los nuevos
+    for nombre in (ARCHIVO_PELICULAS, ARCHIVO_FUNCIONES, ARCHIVO_RESERVAS):
+        ruta = os.path.join(directorio, nombre + ".seq")
+        if os.path.exists(ruta):
+            os.remove(ruta)
+    return resumen
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m generador",
+        description="Genera películas, funciones y reservas sintéticas coherentes.",
+    )
+    parser.add_argument("--destino", required=True, metavar="DIR")
+    parser.add_argument("--peliculas", type=int, default=1_000)
+    parser.add_argument("--funciones", type=int, default=10_000)
+    parser.add_argument("--reservas", type=int, default=100_000)
+    parser.add_argument("--semilla", type=int, default=1)
+    parser.add_argument(
+        "--ocupacion",
+        type=float,
+        default=0.5,
+        help="fracción máxima de cada sala que se vende (por defecto 0.5)",
+    )
+    parser.add_argument(
+        "--forzar", action="store_true", help="reemplazar archivos existentes"
+    )
+    args = parser.parse_args(argv)
+    if min(args.peliculas, args.funciones, args.reservas) < 0:
+        parser.error("las cantidades no pueden ser negativas")
+    existentes = [
+        nombre
+        for nombre in (ARCHIVO_PELICULAS, ARCHIVO_FUNCIONES, ARCHIVO_RESERVAS)
+        if os.path.exists(os.path.join(args.destino, nombre))
+    ]
+    if existentes and not args.forzar:
+        parser.error(f"{args.destino} ya tiene {', '.join(existentes)} (usa --forzar)")
+
+    inicio = time.perf_counter()
+    try:
+        resumen = generar(
+            args.destino,
+            args.peliculas,
+            args.funciones,
+            args.reservas,
+            args.semilla,
+            args.ocupacion,
+        )
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 1
+    except OSError as e:
+        print(f"No se pudo escribir: {e}", file=sys.stderr)
+        return 1
+    segundos = time.perf_counter() - inicio
+    total = resumen["peliculas"] + resumen["funciones"] + resumen["reservas"]
+    print(
+        f"{resumen['peliculas']} películas, {resumen['funciones']} funciones en "
+        f"{resumen['salas']} salas y {resumen['reservas']} reservas en "
+        f"{args.destino}"
+    )
+    print(
+        f"{total} filas en {segundos:.2f} s ({total / max(segundos, 1e-9):,.0f} filas/s)"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
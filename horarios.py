@@ -0,0 +1,129 @@
+"""
+Índice de horarios por sala para detectar funciones que se superponen.
+
+Una función ocupa su sala desde su hora de inicio hasta el fin de la
+película más LIMPIEZA_MIN minutos de limpieza (CINE_LIMPIEZA_MIN). Como no
+hay fechas, la cartelera se repite cada día: una función que termina
+después de medianoche ocupa también el comienzo del día.
+
+Por sala se guardan los tramos ordenados por inicio junto con el tramo más
+largo. Un tramo que se superpone con [inicio, fin) tiene que empezar entre
+inicio - largo_max y fin, así que una consulta son dos búsquedas binarias
+más los pocos tramos de esa ventana: O(log n) por sala.
+"""
+
+import os
+from bisect import bisect_left, bisect_right
+
+LIMPIEZA_MIN = int(os.environ.get("CINE_LIMPIEZA_MIN", "15"))
+MINUTOS_DIA = 24 * 60
+
+
+def minutos(hora: str):
+    """'HH:MM' -> minutos desde medianoche, o None si no es una hora válida."""
+    horas, _, mins = str(hora or "").strip().partition(":")
+    if not (horas.isdigit() and mins.isdigit()):
+        return None
+    h, m = int(horas), int(mins)
+    if h > 23 or m > 59:
+        return None
+    return h * 60 + m
+
+
+def duraciones_peliculas(filas) -> dict:
+    """{ID: duración en minutos} de las filas de películas (0 si no es válida)."""
+    duraciones = {}
+    for fila in filas:
+        valor = str(fila.get("Duracion_min", "")).strip()
+        duraciones[str(fila.get("ID", "")).strip()] = (
+            int(valor) if valor.isdigit() else 0
+        )
+    return duraciones
+
+
+class _Sala:
+    __slots__ = ("inicios", "tramos", "largo_max")
+
+    def __init__(self):
+        self.inicios = []
+        self.tramos = []  # (inicio, fin, id_funcion), en el orden de inicios
+        self.largo_max = 0
+
+
+class IndiceHorarios:
+    def __init__(self, limpieza: int = LIMPIEZA_MIN):
+        self.limpieza = limpieza
+        self._salas = {}  # sala -> _Sala
+        self._funciones = {}  # id_funcion -> (sala, tramos)
+
+    @classmethod
+    def desde_funciones(cls, funciones, duraciones: dict, limpieza=LIMPIEZA_MIN):
+        """Arma el índice; ignora las funciones sin sala o con hora inválida."""
+        indice = cls(limpieza)
+        for fn in funciones:
+            sala = str(fn.get("sala", "")).strip()
+            hora = str(fn.get("hora", "")).strip()
+            if sala and minutos(hora) is not None:
+                indice.agregar(
+                    str(fn.get("id_funcion", "")).strip(),
+                    sala,
+                    hora,
+                    duraciones.get(str(fn.get("id_pelicula", "")).strip(), 0),
+                )
+        return indice
+
+    def _tramos(self, hora: str, duracion: int) -> list:
+        """Tramos [inicio, fin) del día que ocupa la función (dos si cruza medianoche)."""
+        inicio = minutos(hora)
+        if inicio is None:
+            raise ValueError(f"Hora inválida: {hora}")
+        fin = inicio + max(0, duracion) + self.limpieza
+        if fin <= inicio:
+            fin = inicio + 1
+        if fin <= MINUTOS_DIA:
+            return [(inicio, fin)]
+        return [(inicio, MINUTOS_DIA), (0, min(fin - MINUTOS_DIA, inicio))]
+
+    def conflictos(self, sala: str, hora: str, duracion: int, excepto=None) -> list:
+        """IDs de las funciones de la sala que se superponen (sin `excepto`)."""
+        datos = self._salas.get(str(sala))
+        if datos is None:
+            return []
+        encontrados = []
+        for inicio, fin in self._tramos(hora, duracion):
+            desde = bisect_right(datos.inicios, inicio - datos.largo_max)
+            hasta = bisect_left(datos.inicios, fin)
+            for otro_inicio, otro_fin, id_funcion in datos.tramos[desde:hasta]:
+                if (
+                    otro_fin > inicio
+                    and id_funcion != excepto
+                    and id_funcion not in encontrados
+                ):
+                    encontrados.append(id_funcion)
+        return encontrados
+
+    def agregar(self, id_funcion: str, sala: str, hora: str, duracion: int):
+        """Registra la función (sin comprobar superposiciones; ver conflictos)."""
+        self.quitar(id_funcion)
+        sala = str(sala)
+        datos = self._salas.setdefault(sala, _Sala())
+        tramos = self._tramos(hora, duracion)
+        for inicio, fin in tramos:
+            posicion = bisect_right(datos.inicios, inicio)
+            datos.inicios.insert(posicion, inicio)
+            datos.tramos.insert(posicion, (inicio, fin, id_funcion))
+            datos.largo_max = max(datos.largo_max, fin - inicio)
+        self._funciones[id_funcion] = (sala, tramos)
+
+    def quitar(self, id_funcion: str):
+        registrada = self._funciones.pop(id_funcion, None)
+        if registrada is None:
+            return
+        sala, tramos = registrada
+        datos = self._salas[sala]
+        for inicio, fin in tramos:
+            posicion = bisect_left(datos.inicios, inicio)
+            while datos.tramos[posicion] != (inicio, fin, id_funcion):
+                posicion += 1
+            del datos.inicios[posicion]
+            del datos.tramos[posicion]
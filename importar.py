@@ -0,0 +1,415 @@
+"""
+Importación masiva de películas, funciones y reservas, sin menú.
+
+    python -m importar [--peliculas ARCHIVO] [--funciones ARCHIVO]
+                       [--reservas ARCHIVO] [--lote N] [--estricto]
+
+Cada archivo puede ser CSV con encabezados o JSON Lines (.jsonl, un objeto
+por línea) con las columnas de siempre:
+
+    películas   ID (opcional), Titulo, Genero, Duracion_min
+    funciones   id_funcion (opcional), id_pelicula, sala, hora, asientos_disponibles
+    reservas    nombre_cliente, id_funcion, asientos
+
+En CSV los asientos de una reserva van separados por espacios, comas o
+punto y coma ("A1 A2"); en JSON Lines también pueden ser una lista. Las
+filas se validan con las mismas reglas que los formularios del menú y las
+inválidas se informan con su número de línea y se omiten. Con --estricto
+cualquier error cancela la importación completa.
+
+Las filas válidas se escriben por lotes de hasta N filas, cada lote en una
+sola transacción del motor activo (ver importar_lote en almacenamiento).
+"""
+
+import argparse
+import csv
+import json
+import re
+import sys
+import time
+
+from almacenamiento import AsientosOcupados, obtener_almacenamiento
+from asientos import crear_mapa_asientos
+from funciones import armar_funcion, validar_entero, validar_hora
+from funciones import validar_texto as validar_texto_funcion
+from horarios import IndiceHorarios, duraciones_peliculas
+from Peliculas import validar_duracion, validar_texto
+from validacion import (
+    TEXTO_PELICULA,
+    validar_columna,
+    validar_filas,
+    validar_nombre,
+    validar_textos,
+)
+
+TAMANO_LOTE = 1000
+_SEPARADOR_ASIENTOS = re.compile(r"[\s,;]+")
+
+
+def leer_filas(ruta: str):
+    """
+    Recorre (número de línea, fila) de un CSV o JSON Lines. Las claves
+    quedan en minúsculas y los valores como texto sin espacios alrededor
+    (salvo las listas); la fila es None si la línea no es un objeto JSON.
+    """
+    if ruta.lower().endswith((".jsonl", ".ndjson")):
+        with open(ruta, "r", encoding="utf-8") as f:
+            for numero, linea in enumerate(f, 1):
+                if not linea.strip():
+                    continue
+                try:
+                    fila = json.loads(linea)
+                except ValueError:
+                    fila = None
+                if not isinstance(fila, dict):
+                    yield numero, None
+                    continue
+                yield numero, _normalizar_fila(fila)
+        return
+    with open(ruta, "r", newline="", encoding="utf-8-sig") as f:
+        reader = csv.DictReader(f)
+        for fila in reader:
+            yield reader.line_num, _normalizar_fila(fila)
+
+
+def _normalizar_fila(fila: dict) -> dict:
+    return {
+        str(k).strip().lower(): v
+        if isinstance(v, list)
+        else ("" if v is None else str(v).strip())
+        for k, v in fila.items()
+        if k
+    }
+
+
+# ------------------- Reglas por columna -------------------
+
+
+def _numero(valor: str, campo: str) -> str:
+    if not valor.isdigit():
+        raise ValueError(f"{campo} debe ser un número entero positivo.")
+    return valor
+
+
+def _opcional(valor: str, validar, campo: str) -> str:
+    return validar(valor, campo) if valor else ""
+
+
+def _columna(validar, *args):
+    return lambda valores: validar_columna(valores, validar, *args)
+
+
+def _textos(campo: str, max_len: int):
+    return lambda valores: validar_textos(
+        valores, validar_texto, TEXTO_PELICULA, campo, max_len
+    )
+
+
+def _columna_asientos(valores: list):
+    resultados = []
+    errores = {}
+    for indice, valor in enumerate(valores):
+        if isinstance(valor, list):
+            asientos = [str(a).strip().upper() for a in valor if str(a).strip()]
+        else:
+            asientos = [a.upper() for a in _SEPARADOR_ASIENTOS.split(valor) if a]
+        if not asientos:
+            errores[indice] = "La reserva no tiene asientos."
+        elif len(set(asientos)) != len(asientos):
+            errores[indice] = "La reserva repite asientos."
+        resultados.append(None if indice in errores else asientos)
+    return resultados, errores
+
+
+# columna limpia -> (columna del archivo, validación de la columna completa)
+REGLAS = {
+    "peliculas": {
+        "ID": ("id", _columna(_opcional, _numero, "ID")),
+        "Titulo": ("titulo", _textos("Título", 120)),
+        "Genero": ("genero", _textos("Género", 60)),
+        "Duracion_min": (
+            "duracion_min",
+            _columna(validar_duracion, "Duración", 1, 600),
+        ),
+    },
+    "funciones": {
+        "id_funcion": (
+            "id_funcion",
+            _columna(_opcional, validar_texto_funcion, "ID de función"),
+        ),
+        "id_pelicula": ("id_pelicula", _columna(_numero, "ID de película")),
+        "sala": ("sala", _columna(_numero, "La sala")),
+        "hora": ("hora", _columna(validar_hora, "Hora")),
+        "asientos_disponibles": (
+            "asientos_disponibles",
+            _columna(validar_entero, "Asientos disponibles", 1, 1000),
+        ),
+    },
+    "reservas": {
+        "nombre_cliente": ("nombre_cliente", _columna(validar_nombre, "El nombre")),
+        "id_funcion": (
+            "id_funcion",
+            _columna(validar_texto_funcion, "ID de función"),
+        ),
+        "asientos": ("asientos", _columna_asientos),
+    },
+}
+
+
+class Importador:
+    """
+    Valida cada tramo de filas columna por columna (REGLAS), luego contra
+    lo que ya hay en el motor y lo importado antes en la misma corrida, y
+    escribe por lotes con importar_lote().
+    """
+
+    def __init__(self, almacen, tamano_lote: int = TAMANO_LOTE, estricto=False):
+        self.almacen = almacen
+        self.tamano_lote = max(1, tamano_lote)
+        self.estricto = estricto
+        self.errores = []  # (archivo, línea, mensaje)
+        self.importadas = {"peliculas": 0, "funciones": 0, "reservas": 0}
+        self.rechazadas = {"peliculas": 0, "funciones": 0, "reservas": 0}
+        self._pendientes = {"peliculas": [], "funciones": [], "reservas": []}
+
+        self._duraciones = duraciones_peliculas(almacen.leer_peliculas())
+        funciones = almacen.leer_funciones()
+        # id_funcion -> fila (el mapa se arma al reservar)
+        self._funciones = {
+            str(fila.get("id_funcion", "")).strip(): fila for fila in funciones
+        }
+        self._horarios = IndiceHorarios.desde_funciones(funciones, self._duraciones)
+        self._ids = iter(())  # ids reservados de la secuencia para el tramo actual
+        self._entidad_ids = None
+        self._mapas = {}  # id_funcion -> MapaAsientos con los ocupados marcados
+
+    # ------------------- Ids nuevos -------------------
+
+    def _reservar_ids(self, tipo: str, limpias: list):
+        """Reserva de una vez los ids de las filas del tramo que no traen uno."""
+        clave = {"peliculas": "ID", "funciones": "id_funcion"}.get(tipo)
+        if clave is None:
+            return
+        faltan = sum(1 for fila in limpias if fila is not None and not fila[clave])
+        if faltan:
+            self._ids = iter(self.almacen.reservar_ids(tipo, faltan))
+            self._entidad_ids = tipo
+
+    def _nuevo_id(self, tipo: str, usados) -> str:
+        """Próximo id reservado que no haya llegado explícito en esta corrida."""
+        while True:
+            id_ = next(self._ids, None) if self._entidad_ids == tipo else None
+            if id_ is None:
+                self._ids, self._entidad_ids = (
+                    iter(self.almacen.reservar_ids(tipo, 1)),
+                    tipo,
+                )
+                continue
+            if str(id_) not in usados:
+                return str(id_)
+
+    # ------------------- Validación contra lo existente -------------------
+
+    def _pelicula(self, fila: dict) -> dict:
+        id_ = fila["ID"]
+        if id_ in self._duraciones:
+            raise ValueError(f"Ya existe una película con ID {id_}.")
+        if not id_:
+            id_ = fila["ID"] = self._nuevo_id("peliculas", self._duraciones)
+        self._duraciones[id_] = fila["Duracion_min"]
+        fila["Duracion_min"] = str(fila["Duracion_min"])
+        return fila
+
+    def _funcion(self, fila: dict) -> dict:
+        id_funcion = fila["id_funcion"]
+        if id_funcion in self._funciones:
+            raise ValueError(f"Ya existe una función con ID {id_funcion}.")
+        duracion = self._duraciones.get(fila["id_pelicula"])
+        if duracion is None:
+            raise ValueError(f"No existe una película con ID {fila['id_pelicula']}.")
+        sala, hora = fila["sala"], fila["hora"]
+        conflictos = self._horarios.conflictos(sala, hora, duracion)
+        if conflictos:
+            raise ValueError(
+                f"La sala {sala} está ocupada a las {hora} por la función "
+                f"{', '.join(conflictos)}."
+            )
+        if not id_funcion:
+            id_funcion = fila["id_funcion"] = self._nuevo_id(
+                "funciones", self._funciones
+            )
+        total = fila["asientos_disponibles"]
+        fila["asientos_disponibles"] = str(total)
+        fila["asientos"] = crear_mapa_asientos(total)
+        self._funciones[id_funcion] = fila
+        self._horarios.agregar(id_funcion, sala, hora, duracion)
+        return fila
+
+    def _mapa(self, id_funcion: str):
+        mapa = self._mapas.get(id_funcion)
+        if mapa is None:
+            fila = dict(self._funciones[id_funcion])
+            ocupados = self.almacen.ocupados_de(id_funcion)
+            mapa = self._mapas[id_funcion] = armar_funcion(fila, ocupados)["asientos"]
+        return mapa
+
+    def _reserva(self, fila: dict) -> tuple:
+        id_funcion, asientos = fila["id_funcion"], fila["asientos"]
+        if id_funcion not in self._funciones:
+            raise ValueError(f"No existe una función con ID {id_funcion}.")
+        mapa = self._mapa(id_funcion)
+        inexistentes = [a for a in asientos if a not in mapa]
+        if inexistentes:
+            raise ValueError(f"Asientos inexistentes: {', '.join(inexistentes)}.")
+        tomados = [a for a in asientos if mapa[a] != "libre"]
+        if tomados:
+            raise ValueError(f"Asientos ya ocupados: {', '.join(tomados)}.")
+        for asiento in asientos:
+            mapa[asiento] = "ocupado"
+        return fila["nombre_cliente"], id_funcion, asientos
+
+    # ------------------- Carga -------------------
+
+    def importar(self, tipo: str, ruta: str):
+        """Valida y encola las filas de `ruta` (tipo: peliculas|funciones|reservas)."""
+        errores = []
+        lineas, filas = [], []
+        for numero, fila in leer_filas(ruta):
+            if fila is None:
+                errores.append((numero, "La línea no es un objeto JSON válido."))
+                self.rechazadas[tipo] += 1
+                continue
+            lineas.append(numero)
+            filas.append(fila)
+            if len(filas) >= self.tamano_lote:
+                self._procesar(tipo, lineas, filas, errores)
+                lineas, filas = [], []
+        if filas:
+            self._procesar(tipo, lineas, filas, errores)
+        self.errores.extend(
+            (ruta, numero, mensaje) for numero, mensaje in sorted(errores)
+        )
+
+    def _procesar(self, tipo: str, lineas: list, filas: list, errores: list):
+        completar = {
+            "peliculas": self._pelicula,
+            "funciones": self._funcion,
+            "reservas": self._reserva,
+        }[tipo]
+        limpias, fallidas = validar_filas(filas, REGLAS[tipo])
+        self._reservar_ids(tipo, limpias)
+        for indice, (numero, limpia) in enumerate(zip(lineas, limpias)):
+            try:
+                if limpia is None:
+                    raise ValueError(" ".join(fallidas[indice]))
+                self._pendientes[tipo].append(completar(limpia))
+            except ValueError as e:
+                errores.append((numero, str(e).strip()))
+                self.rechazadas[tipo] += 1
+                continue
+            if not self.estricto and self._cantidad_pendiente() >= self.tamano_lote:
+                self.escribir()
+
+    def _cantidad_pendiente(self) -> int:
+        return sum(len(filas) for filas in self._pendientes.values())
+
+    def escribir(self):
+        """Escribe lo pendiente en una sola transacción."""
+        pendientes = self._pendientes
+        self._pendientes = {tipo: [] for tipo in pendientes}
+        if not any(pendientes.values()):
+            return
+        try:
+            self.almacen.importar_lote(**pendientes)
+        except AsientosOcupados as e:
+            # Otra caja vendió mientras tanto: el lote entero queda sin escribir
+            self.errores.append(
+                (
+                    "",
+                    0,
+                    f"Lote descartado, asientos ya vendidos: {', '.join(e.asientos)}.",
+                )
+            )
+            for tipo, filas in pendientes.items():
+                self.rechazadas[tipo] += len(filas)
+            return
+        for tipo, filas in pendientes.items():
+            self.importadas[tipo] += len(filas)
+
+    def terminar(self) -> bool:
+        """
+        Escribe el último lote. En modo estricto no escribe nada si hubo
+        errores. Devuelve True si no hubo errores.
+        """
+        if self.estricto and self.errores:
+            for tipo, filas in self._pendientes.items():
+                self.rechazadas[tipo] += len(filas)
+            self._pendientes = {tipo: [] for tipo in self._pendientes}
+            return False
+        self.escribir()
+        return not self.errores
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m importar",
+        description="Importa películas, funciones y reservas desde CSV o JSON Lines.",
+    )
+    parser.add_argument("--peliculas", metavar="ARCHIVO")
+    parser.add_argument("--funciones", metavar="ARCHIVO")
+    parser.add_argument("--reservas", metavar="ARCHIVO")
+    parser.add_argument(
+        "--lote",
+        type=int,
+        default=TAMANO_LOTE,
+        help=f"filas por transacción (por defecto {TAMANO_LOTE})",
+    )
+    parser.add_argument(
+        "--estricto",
+        action="store_true",
+        help="no escribir nada si alguna fila es inválida",
+    )
+    args = parser.parse_args(argv)
+    archivos = [
+        (tipo, ruta)
+        for tipo, ruta in (
+            ("peliculas", args.peliculas),
+            ("funciones", args.funciones),
+            ("reservas", args.reservas),
+        )
+        if ruta
+    ]
+    if not archivos:
+        parser.error("indica al menos uno de --peliculas, --funciones o --reservas")
+
+    inicio = time.perf_counter()
+    importador = Importador(obtener_almacenamiento(), args.lote, args.estricto)
+    try:
+        for tipo, ruta in archivos:
+            importador.importar(tipo, ruta)
+    except OSError as e:
+        print(f"No se pudo leer el archivo: {e}", file=sys.stderr)
+        return 1
+    correcto = importador.terminar()
+    segundos = time.perf_counter() - inicio
+
+    for ruta, numero, mensaje in importador.errores[:20]:
+        print(f"{ruta}:{numero}: {mensaje}" if ruta else mensaje, file=sys.stderr)
+    if len(importador.errores) > 20:
+        print(f"... y {len(importador.errores) - 20} errores más.", file=sys.stderr)
+    for tipo, _ in archivos:
+        print(
+            f"{tipo}: {importador.importadas[tipo]} importadas, "
+            f"{importador.rechazadas[tipo]} rechazadas"
+        )
+    total = sum(importador.importadas.values())
+    print(
+        f"{total} filas en {segundos:.2f} s ({total / max(segundos, 1e-9):,.0f} filas/s)"
+    )
+    if args.estricto and not correcto:
+        print("Modo estricto: no se importó nada.", file=sys.stderr)
+    return 0 if correcto else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
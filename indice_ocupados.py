@@ -0,0 +1,158 @@
+"""
+Índice persistente de asientos ocupados por función para el motor de archivos.
+
+Cada función tiene su propio archivo dentro del directorio del índice, con
+un asiento por línea. Guardar una reserva solo agrega sus asientos al archivo
+de esa función, y consultar una función lee únicamente ese archivo.
+
+El índice guarda la firma (mtime/tamaño) de los archivos de reservas con la
+que quedó al día; si las reservas cambian por otra vía se reconstruye. La
+reconstrucción toma el bloqueo de las reservas, escribe cada archivo de
+forma atómica y deja la firma para el final: un índice a medias nunca queda
+con una firma que coincida.
+"""
+
+import json
+import os
+
+from bloqueo import bloquear
+from escritura import agrupar_escrituras, escribir_atomico
+
+DIR_INDICE_OCUPADOS = "ocupados.idx"
+
+
+class IndiceOcupados:
+    """Índice id_funcion -> conjunto de asientos ocupados."""
+
+    def __init__(self, directorio: str, rutas_reservas: list, leer_reservas):
+        self.directorio = directorio
+        # La primera ruta es la que se bloquea al guardar reservas
+        self.rutas_reservas = rutas_reservas
+        self.leer_reservas = leer_reservas
+        self._memoria = {}
+        self._firma_memoria = None
+
+    @property
+    def cargado(self) -> bool:
+        return self._firma_memoria is not None
+
+    def firma_reservas(self) -> list:
+        firma = []
+        for ruta in self.rutas_reservas:
+            try:
+                st = os.stat(ruta)
+                firma.append([st.st_mtime_ns, st.st_size])
+            except FileNotFoundError:
+                firma.append(None)
+        return firma
+
+    def _ruta_funcion(self, id_funcion) -> str:
+        from urllib.parse import quote
+
+        return os.path.join(self.directorio, quote(str(id_funcion), safe="") + ".txt")
+
+    def _ruta_firma(self) -> str:
+        return os.path.join(self.directorio, "_firma.json")
+
+    def _leer_firma(self):
+        try:
+            with open(self._ruta_firma(), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _guardar_firma(self, firma: list):
+        escribir_atomico(
+            self._ruta_firma(), lambda f: json.dump(firma, f), encoding="utf-8"
+        )
+
+    def _escribir_funcion(self, id_funcion: str, asientos):
+        escribir_atomico(
+            self._ruta_funcion(id_funcion),
+            lambda f: f.writelines(f"{a}\n" for a in asientos),
+            encoding="utf-8",
+        )
+
+    def _asegurar_vigente(self):
+        firma = self.firma_reservas()
+        if firma == self._firma_memoria:
+            return
+        self._memoria = {}
+        if self._leer_firma() == firma:
+            self._firma_memoria = firma
+            return
+        with bloquear(self.rutas_reservas[0]):
+            # Otra terminal pudo haberlo reconstruido mientras esperábamos
+            firma = self.firma_reservas()
+            if self._leer_firma() == firma:
+                self._firma_memoria = firma
+            else:
+                self.reconstruir()
+
+    def reconstruir(self):
+        """Rehace el índice completo a partir de todas las reservas."""
+        with bloquear(self.rutas_reservas[0]):
+            # La firma se toma antes de leer: si las reservas cambian por
+            # otra vía mientras tanto, no va a coincidir y se reconstruye
+            firma = self.firma_reservas()
+            ocupados = {}
+            for reserva in self.leer_reservas():
+                id_funcion = reserva.get("id_funcion")
+                if not id_funcion:
+                    continue
+                ocupados.setdefault(str(id_funcion), set()).update(
+                    reserva.get("asientos", [])
+                )
+
+            os.makedirs(self.directorio, exist_ok=True)
+            try:
+                os.remove(self._ruta_firma())
+            except FileNotFoundError:
+                pass
+            vigentes = set()
+            with agrupar_escrituras():
+                for id_funcion, asientos in ocupados.items():
+                    self._escribir_funcion(id_funcion, sorted(asientos))
+                    vigentes.add(os.path.basename(self._ruta_funcion(id_funcion)))
+            for nombre in os.listdir(self.directorio):
+                if nombre.endswith(".txt") and nombre not in vigentes:
+                    os.remove(os.path.join(self.directorio, nombre))
+            self._guardar_firma(firma)
+            self._memoria = ocupados
+            self._firma_memoria = firma
+
+    def ocupados_de(self, id_funcion) -> set:
+        """Asientos ocupados de una función: solo lee el archivo de esa función."""
+        self._asegurar_vigente()
+        return set(self._leer_funcion(str(id_funcion)))
+
+    def _leer_funcion(self, id_funcion: str) -> set:
+        if id_funcion not in self._memoria:
+            try:
+                with open(self._ruta_funcion(id_funcion), "r", encoding="utf-8") as f:
+                    self._memoria[id_funcion] = {
+                        linea.strip() for linea in f if linea.strip()
+                    }
+            except FileNotFoundError:
+                self._memoria[id_funcion] = set()
+        return self._memoria[id_funcion]
+
+    def registrar(self, id_funcion, asientos: list, firma_previa):
+        """
+        Agrega los asientos de una reserva recién guardada.
+        `firma_previa` es la firma de las reservas justo antes de guardarla;
+        si el índice no estaba al día con ella, se invalida y se
+        reconstruirá en la próxima consulta.
+        """
+        if firma_previa is None or firma_previa != self._firma_memoria:
+            self._firma_memoria = None
+            self._memoria = {}
+            return
+        id_funcion = str(id_funcion)
+        os.makedirs(self.directorio, exist_ok=True)
+        ocupados = self._leer_funcion(id_funcion)
+        ocupados.update(asientos)
+        self._escribir_funcion(id_funcion, sorted(ocupados))
+        firma = self.firma_reservas()
+        self._guardar_firma(firma)
+        self._firma_memoria = firma
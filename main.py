@@ -1,16 +1,11 @@
 import os
 
-import readchar
-from rich import box
-from rich.console import Console
-from rich.panel import Panel
-from rich.table import Table
+from consola import Consola, importar_perezoso
+from escritura import guardado_interactivo
+from perfilado import configurar_perfilado, perfilar_accion
 
-from funciones import menu_funciones
-from Peliculas import menu_peliculas
-from reservas import crear_reserva, ver_reservas
-
-console = Console()
+readchar = importar_perezoso("readchar")
+console = Consola()
 
 
 # Función para limpiar pantalla
@@ -20,6 +15,8 @@ def limpiar_pantalla():
 
 # Función para mostrar el título
 def mostrar_titulo(titulo: str):
+    from rich.panel import Panel
+
     console.print(
         Panel(
             f"[bold black on yellow]{titulo.upper()}[/bold  black on yellow]",
@@ -35,51 +32,60 @@ def pausar_pantalla():
     input()
 
 
+OPCIONES_MENU = [
+    "GESTIÓN DE PELÍCULAS",
+    "GESTIÓN DE FUNCIONES",
+    "CREAR RESERVA",
+    "VER RESERVAS POR FUNCIÓN",
+    "SALIR",
+]
+
+
+def mostrar_menu(seleccionado: int = 0) -> None:
+    """Dibuja el menú principal marcando la opción `seleccionado`."""
+    from rich import box
+    from rich.table import Table
+
+    # Creamos la tabla para mostrar el menú
+    opciones = Table(
+        title="[bold black on gold1]MENÚ PRINCIPAL[/bold black on gold1]",
+        box=box.ROUNDED,
+        border_style="bold dark_blue",
+        title_style="bold bright_red",
+        header_style="bold bright_white",
+        show_lines=True,
+    )
+    opciones.add_column("N°", justify="center", style="orange3", no_wrap=True)
+    opciones.add_column("OPCIÓN", justify="left", style="bold grey70")
+
+    # llenamos las filas y marcamos la seleccionada
+    for i, texto in enumerate(OPCIONES_MENU):
+        numero = str(i + 1)
+        if i == seleccionado:
+            # Calcula el ancho total
+            ancho_total = 50
+            texto_formateado = texto.center(ancho_total)
+            opciones.add_row(
+                numero,
+                f"[gold1 on dark_red]{texto_formateado}[/gold1 on dark_red]",
+            )
+        else:
+            opciones.add_row(numero, texto)
+
+    console.print(opciones)
+    console.print(
+        "\n[bold bright_white]Usa ↑ ↓ para navegar. Enter para seleccionar.[/bold bright_white]"
+    )
+
+
 def menu_principal() -> None:
     """Muestra el menú principal con navegación por teclas Up/Down y Enter."""
-    opciones_texto = [
-        "GESTIÓN DE PELÍCULAS",
-        "GESTIÓN DE FUNCIONES",
-        "CREAR RESERVA",
-        "VER RESERVAS POR FUNCIÓN",
-        "SALIR",
-    ]
-
+    opciones_texto = OPCIONES_MENU
     seleccionado = 0  # índice de la opción actualmente seleccionada
 
     while True:
         limpiar_pantalla()
-
-        # Creamos la tabla para mostrar el menú
-        opciones = Table(
-            title="[bold black on gold1]MENÚ PRINCIPAL[/bold black on gold1]",
-            box=box.ROUNDED,
-            border_style="bold dark_blue",
-            title_style="bold bright_red",
-            header_style="bold bright_white",
-            show_lines=True,
-        )
-        opciones.add_column("N°", justify="center", style="orange3", no_wrap=True)
-        opciones.add_column("OPCIÓN", justify="left", style="bold grey70")
-
-        # llenamos las filas y marcamos la seleccionada
-        for i, texto in enumerate(opciones_texto):
-            numero = str(i + 1)
-            if i == seleccionado:
-                # Calcula el ancho total
-                ancho_total = 50
-                texto_formateado = texto.center(ancho_total)
-                opciones.add_row(
-                    numero,
-                    f"[gold1 on dark_red]{texto_formateado}[/gold1 on dark_red]",
-                )
-            else:
-                opciones.add_row(numero, texto)
-
-        console.print(opciones)
-        console.print(
-            "\n[bold bright_white]Usa ↑ ↓ para navegar. Enter para seleccionar.[/bold bright_white]"
-        )
+        mostrar_menu(seleccionado)
 
         # Leer una tecla
         try:
@@ -94,14 +100,26 @@ def menu_principal() -> None:
         elif tecla == readchar.key.DOWN:
             seleccionado = (seleccionado + 1) % len(opciones_texto)
         elif tecla == readchar.key.ENTER or tecla == readchar.key.CR:
+            # Los submenús (y el almacenamiento) se importan recién al
+            # elegirlos: el primer menú aparece sin esperarlos
             if seleccionado == 0:
+                from Peliculas import menu_peliculas
+
                 menu_peliculas()
             elif seleccionado == 1:
+                from funciones import menu_funciones
+
                 menu_funciones()
             elif seleccionado == 2:
-                crear_reserva()
+                from reservas import crear_reserva
+
+                with perfilar_accion("crear_reserva"):
+                    crear_reserva()
             elif seleccionado == 3:
-                ver_reservas()
+                from reservas import ver_reservas
+
+                with perfilar_accion("ver_reservas"):
+                    ver_reservas()
             elif seleccionado == 4:
                 break
         else:
@@ -114,4 +132,23 @@ def menu_principal() -> None:
 
 
 if __name__ == "__main__":
-    menu_principal()
+    import argparse
+
+    parser = argparse.ArgumentParser(prog="python main.py")
+    parser.add_argument(
+        "--perfil",
+        metavar="DIR",
+        help="perfilar cada acción del menú y guardar los volcados en DIR",
+    )
+    args = parser.parse_args()
+    if args.perfil:
+        configurar_perfilado(args.perfil)
+    if os.environ.get("CINE_API"):
+        # API HTTP en segundo plano mientras se usa el menú
+        from api import iniciar_en_segundo_plano
+
+        iniciar_en_segundo_plano(puerto=int(os.environ["CINE_API"]))
+    # Los guardados del menú usan el commit agrupado de CINE_FSYNC_VENTANA_MS
+    # (la API, en su propio hilo, sigue sincronizando cada respuesta)
+    with guardado_interactivo():
+        menu_principal()
@@ -0,0 +1,237 @@
+"""
+Métricas de tiempo de las operaciones calientes.
+
+Con CINE_METRICAS=<archivo> cada operación instrumentada (carga y guardado
+de funciones, reservas, lectura de los CSV, tablas de rich) suma una
+cuenta, su duración a un histograma y, si terminó con una excepción, un
+error. Al salir del proceso se exporta todo a <archivo>: en formato JSON
+si termina en .json y si no en el formato de texto de Prometheus. Si
+varias cajas comparten la configuración, "{pid}" en la ruta se reemplaza
+por el número de proceso para que no se pisen.
+
+    @instrumentar("guardar_reserva")
+    def guardar_reserva(...): ...
+
+    with tramo("dibujar_tabla"):
+        console.print(tabla)
+
+Sin CINE_METRICAS el decorador solo consulta una variable antes de llamar
+a la función y tramo() devuelve siempre el mismo contexto vacío: no se
+toma la hora ni se guarda nada.
+"""
+
+import atexit
+import functools
+import json
+import os
+import threading
+import time
+
+from escritura import escribir_atomico
+
+# Límites superiores de las cubetas del histograma, en segundos
+CUBETAS_S = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+PREFIJO = "cine_operacion"
+
+_activas = False
+_ruta = None
+_registradas = {}  # nombre -> Histograma
+_mutex = threading.Lock()
+_salida_registrada = False
+
+
+class Histograma:
+    __slots__ = ("cuenta", "suma", "maximo", "errores", "cubetas")
+
+    def __init__(self):
+        self.cuenta = 0
+        self.suma = 0.0
+        self.maximo = 0.0
+        self.errores = 0
+        self.cubetas = [0] * (len(CUBETAS_S) + 1)  # la última es +Inf
+
+    def registrar(self, segundos: float, error: bool = False):
+        self.cuenta += 1
+        self.suma += segundos
+        self.maximo = max(self.maximo, segundos)
+        self.errores += error
+        for i, limite in enumerate(CUBETAS_S):
+            if segundos <= limite:
+                self.cubetas[i] += 1
+                return
+        self.cubetas[-1] += 1
+
+    def percentil(self, fraccion: float) -> float:
+        """Límite superior de la cubeta donde cae el percentil (el máximo si es +Inf)."""
+        objetivo = fraccion * self.cuenta
+        acumulado = 0
+        for limite, cantidad in zip(CUBETAS_S, self.cubetas):
+            acumulado += cantidad
+            if acumulado >= objetivo:
+                return min(limite, self.maximo)
+        return self.maximo
+
+
+def activas() -> bool:
+    return _activas
+
+
+def configurar_metricas(ruta):
+    """
+    Activa las métricas y fija el archivo al que se exportan al salir, o
+    las desactiva con ruta=None. Lo ya registrado se conserva.
+    """
+    global _activas, _ruta, _salida_registrada
+    _ruta = ruta.replace("{pid}", str(os.getpid())) if ruta else None
+    _activas = bool(ruta)
+    if _activas and not _salida_registrada:
+        atexit.register(_exportar_al_salir)
+        _salida_registrada = True
+
+
+def reiniciar():
+    with _mutex:
+        _registradas.clear()
+
+
+def registrar(nombre: str, segundos: float, error: bool = False):
+    with _mutex:
+        histograma = _registradas.get(nombre)
+        if histograma is None:
+            histograma = _registradas[nombre] = Histograma()
+        histograma.registrar(segundos, error)
+
+
+def instrumentar(nombre: str):
+    """Decorador que mide cada llamada a la función como `nombre`."""
+
+    def decorar(funcion):
+        @functools.wraps(funcion)
+        def medida(*args, **kwargs):
+            if not _activas:
+                return funcion(*args, **kwargs)
+            inicio = time.perf_counter()
+            error = True
+            try:
+                resultado = funcion(*args, **kwargs)
+                error = False
+                return resultado
+            finally:
+                registrar(nombre, time.perf_counter() - inicio, error)
+
+        return medida
+
+    return decorar
+
+
+class _Tramo:
+    __slots__ = ("nombre", "inicio")
+
+    def __init__(self, nombre: str):
+        self.nombre = nombre
+
+    def __enter__(self):
+        self.inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, tipo, valor, traza):
+        registrar(self.nombre, time.perf_counter() - self.inicio, tipo is not None)
+        return False
+
+
+class _TramoVacio:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, tipo, valor, traza):
+        return False
+
+
+_VACIO = _TramoVacio()
+
+
+def tramo(nombre: str):
+    """Contexto que mide el bloque como `nombre` (vacío si no hay métricas)."""
+    return _Tramo(nombre) if _activas else _VACIO
+
+
+def _copia() -> dict:
+    with _mutex:
+        copia = {}
+        for nombre, h in _registradas.items():
+            nuevo = Histograma()
+            nuevo.cuenta, nuevo.suma, nuevo.maximo = h.cuenta, h.suma, h.maximo
+            nuevo.errores, nuevo.cubetas = h.errores, list(h.cubetas)
+            copia[nombre] = nuevo
+        return copia
+
+
+def como_json() -> dict:
+    """Resumen por operación, de la que más tiempo total lleva a la que menos."""
+    resumen = {}
+    for nombre, h in sorted(_copia().items(), key=lambda par: -par[1].suma):
+        resumen[nombre] = {
+            "cuenta": h.cuenta,
+            "errores": h.errores,
+            "total_s": round(h.suma, 6),
+            "promedio_ms": round(h.suma / h.cuenta * 1000, 3),
+            "p50_ms": round(h.percentil(0.5) * 1000, 3),
+            "p95_ms": round(h.percentil(0.95) * 1000, 3),
+            "p99_ms": round(h.percentil(0.99) * 1000, 3),
+            "max_ms": round(h.maximo * 1000, 3),
+            "cubetas": {
+                str(limite): cantidad
+                for limite, cantidad in zip(CUBETAS_S + ("+Inf",), h.cubetas)
+            },
+        }
+    return resumen
+
+
+def texto_prometheus() -> str:
+    lineas = [
+        f"# HELP {PREFIJO}_segundos Duración de las operaciones del cine.",
+        f"# TYPE {PREFIJO}_segundos histogram",
+    ]
+    copia = sorted(_copia().items())
+    for nombre, h in copia:
+        etiqueta = f'operacion="{nombre}"'
+        acumulado = 0
+        for limite, cantidad in zip(CUBETAS_S + ("+Inf",), h.cubetas):
+            acumulado += cantidad
+            lineas.append(
+                f'{PREFIJO}_segundos_bucket{{{etiqueta},le="{limite}"}} {acumulado}'
+            )
+        lineas.append(f"{PREFIJO}_segundos_sum{{{etiqueta}}} {h.suma:.6f}")
+        lineas.append(f"{PREFIJO}_segundos_count{{{etiqueta}}} {h.cuenta}")
+    lineas.append(
+        f"# HELP {PREFIJO}_errores_total Operaciones que terminaron con una excepción."
+    )
+    lineas.append(f"# TYPE {PREFIJO}_errores_total counter")
+    for nombre, h in copia:
+        lineas.append(f'{PREFIJO}_errores_total{{operacion="{nombre}"}} {h.errores}')
+    return "\n".join(lineas) + "\n"
+
+
+def exportar(ruta: str = None):
+    """Escribe las métricas en `ruta` (por defecto la de CINE_METRICAS)."""
+    ruta = ruta or _ruta
+    if not ruta:
+        return
+    if ruta.lower().endswith(".json"):
+        contenido = json.dumps(como_json(), ensure_ascii=False, indent=2) + "\n"
+    else:
+        contenido = texto_prometheus()
+    escribir_atomico(ruta, lambda f: f.write(contenido), encoding="utf-8")
+
+
+def _exportar_al_salir():
+    if _activas and _registradas:
+        try:
+            exportar()
+        except OSError:
+            pass
+
+
+configurar_metricas(os.environ.get("CINE_METRICAS") or None)
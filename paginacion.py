@@ -0,0 +1,97 @@
+"""
+Listados paginados que leen las filas por páginas.
+
+Las filas llegan de un iterador (un archivo leído línea a línea o un cursor
+de la base) y solo se consumen las que hacen falta para la página pedida,
+así que mostrar la primera página cuesta lo mismo con cien filas que con un
+millón. Las páginas ya vistas quedan en memoria para poder volver atrás.
+"""
+
+from itertools import islice
+
+from consola import importar_perezoso
+from metricas import tramo
+
+readchar = importar_perezoso("readchar")
+
+FILAS_POR_PAGINA = 20
+
+
+class Paginador:
+    """Parte un iterador en páginas que se van leyendo a medida que se piden."""
+
+    def __init__(self, filas, tamano: int = FILAS_POR_PAGINA):
+        self.tamano = max(1, tamano)
+        self._filas = iter(filas)
+        self._paginas = []
+        self.completo = False
+
+    def pagina(self, numero: int) -> list:
+        """Filas de la página `numero` (desde 0); lista vacía si no existe."""
+        while len(self._paginas) <= numero and not self.completo:
+            filas = list(islice(self._filas, self.tamano))
+            if len(filas) < self.tamano:
+                self.completo = True
+                self.cerrar()
+            if filas:
+                self._paginas.append(filas)
+        return self._paginas[numero] if numero < len(self._paginas) else []
+
+    @property
+    def leidas(self) -> int:
+        return len(self._paginas)
+
+    def hay_siguiente(self, numero: int) -> bool:
+        return bool(self.pagina(numero + 1))
+
+    def cerrar(self):
+        """Libera el archivo o cursor de origen si era un generador."""
+        cerrar = getattr(self._filas, "close", None)
+        if cerrar is not None:
+            cerrar()
+
+
+def mostrar_paginado(console, filas, armar_tabla, tamano: int = FILAS_POR_PAGINA):
+    """
+    Muestra `filas` de a una página con la tabla que devuelve
+    `armar_tabla(pagina)`. Si todo entra en una página se imprime y vuelve
+    enseguida; si no, se navega con ← → (o n/p) y se sale con q o Esc.
+    Devuelve False si no había ninguna fila.
+    """
+    paginador = Paginador(filas, tamano)
+    try:
+        numero = 0
+        if not paginador.pagina(0):
+            return False
+        # Métrica por tabla: _tabla_reservas -> dibujar_tabla_reservas
+        nombre = "dibujar_" + armar_tabla.__name__.lstrip("_")
+        if not paginador.hay_siguiente(0):
+            with tramo(nombre):
+                console.print(armar_tabla(paginador.pagina(0)))
+            return True
+
+        while True:
+            console.clear()
+            with tramo(nombre):
+                console.print(armar_tabla(paginador.pagina(numero)))
+            siguiente = paginador.hay_siguiente(numero)
+            total = f" de {paginador.leidas}" if paginador.completo else ""
+            console.print(
+                f"[dim]Página {numero + 1}{total} · ← anterior · → siguiente"
+                " · q para salir[/dim]"
+            )
+            tecla = readchar.readkey()
+            if tecla in (readchar.key.RIGHT, "n", " ") and siguiente:
+                numero += 1
+            elif tecla in (readchar.key.LEFT, "p") and numero > 0:
+                numero -= 1
+            elif tecla in (
+                "q",
+                "Q",
+                readchar.key.ESC,
+                readchar.key.ENTER,
+                readchar.key.CR,
+            ):
+                return True
+    finally:
+        paginador.cerrar()
@@ -0,0 +1,244 @@
+"""
+Perfilado opcional del menú con cProfile y tracemalloc.
+
+Con CINE_PERFIL=<directorio> (o `python main.py --perfil DIR`) cada acción
+del menú (listar películas, ver funciones, crear una reserva...) corre bajo
+cProfile y deja en el directorio dos archivos por acción:
+
+- <marca>-<accion>.prof: las estadísticas de cProfile (se abren con pstats
+  o snakeviz);
+- <marca>-<accion>.json: duración, pico de memoria de la acción, los
+  lugares del código que más memoria retuvieron al terminar y, por cada
+  punto() que se alcanzó, los que más memoria tenían en ese momento.
+
+Los puntos marcan dónde están vivas las estructuras grandes que después se
+liberan (los mapas de asientos de cargar_funciones, la tabla armada en
+ver_funciones): en cada punto se toma una instantánea de tracemalloc, solo
+si hay más memoria en uso que la vez anterior en ese mismo punto.
+
+    python -m perfilado DIR [--accion NOMBRE] [--top 20]
+
+junta todos los volcados del directorio: cuántas veces corrió cada acción,
+las funciones con más tiempo acumulado y los lugares que más memoria
+asignaron. Sin CINE_PERFIL no se perfila nada y punto() solo consulta una
+variable.
+"""
+
+import io
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+from consola import importar_perezoso
+
+cProfile = importar_perezoso("cProfile")
+tracemalloc = importar_perezoso("tracemalloc")
+
+TOP_LUGARES = 15
+RAIZ = os.path.dirname(os.path.abspath(__file__))
+# Lugares que no interesan (filtrar las estadísticas ya agrupadas es mucho
+# más barato que filter_traces sobre cada bloque)
+_IGNORADOS = {
+    "tracemalloc.py",
+    "cProfile.py",
+    "<frozen importlib._bootstrap>",
+    "<frozen importlib._bootstrap_external>",
+    "<unknown>",
+}
+
+_directorio = None
+_tracemalloc_propio = False  # lo arrancó configurar_perfilado
+_accion = None  # acción en curso
+_volcados = 0
+
+
+class _Accion:
+    def __init__(self, nombre: str, base):
+        self.nombre = nombre
+        self.base = base  # instantánea al empezar
+        self.puntos = {}  # nombre -> (memoria en uso, lugares)
+
+
+def activo() -> bool:
+    return _directorio is not None
+
+
+def configurar_perfilado(directorio):
+    """Activa el perfilado volcando en `directorio`, o lo desactiva con None."""
+    global _directorio, _tracemalloc_propio
+    if directorio:
+        os.makedirs(directorio, exist_ok=True)
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _tracemalloc_propio = True
+    elif _tracemalloc_propio:
+        tracemalloc.stop()
+        _tracemalloc_propio = False
+    _directorio = directorio or None
+
+
+def _instantanea():
+    return tracemalloc.take_snapshot()
+
+
+def _lugar(traza) -> str:
+    marco = traza[0]
+    nombre = marco.filename
+    if nombre.startswith(RAIZ + os.sep):
+        nombre = os.path.relpath(nombre, RAIZ)
+    return f"{nombre}:{marco.lineno}"
+
+
+def _lugares(instantanea, base) -> list:
+    """Lugares que más memoria sumaron respecto de `base`."""
+    diferencias = [
+        d
+        for d in instantanea.compare_to(base, "lineno")
+        if d.size_diff > 0
+        and os.path.basename(d.traceback[0].filename) not in _IGNORADOS
+    ]
+    diferencias.sort(key=lambda d: d.size_diff, reverse=True)
+    return [
+        {
+            "lugar": _lugar(d.traceback),
+            "kib": round(d.size_diff / 1024, 1),
+            "bloques": d.count_diff,
+        }
+        for d in diferencias[:TOP_LUGARES]
+    ]
+
+
+def punto(nombre: str):
+    """Registra qué hay en memoria en este momento de la acción en curso."""
+    accion = _accion
+    if accion is None:
+        return
+    en_uso = tracemalloc.get_traced_memory()[0]
+    anterior = accion.puntos.get(nombre)
+    if anterior is not None and anterior[0] >= en_uso:
+        return
+    accion.puntos[nombre] = (en_uso, _lugares(_instantanea(), accion.base))
+
+
+@contextmanager
+def perfilar_accion(nombre: str):
+    """
+    Perfila el bloque como una acción del menú. Si no hay perfilado, o si
+    ya hay una acción en curso (un submenú dentro de otro), no hace nada.
+    """
+    global _accion
+    if _directorio is None or _accion is not None:
+        yield
+        return
+    tracemalloc.reset_peak()
+    accion = _Accion(nombre, _instantanea())
+    perfil = cProfile.Profile()
+    _accion = accion
+    inicio = time.perf_counter()
+    perfil.enable()
+    try:
+        yield
+    finally:
+        perfil.disable()
+        segundos = time.perf_counter() - inicio
+        _accion = None
+        _volcar(accion, perfil, segundos)
+
+
+def _volcar(accion: _Accion, perfil, segundos: float):
+    import json
+
+    global _volcados
+    _volcados += 1
+    marca = f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{_volcados:03d}"
+    ruta = os.path.join(_directorio, f"{marca}-{accion.nombre}")
+    perfil.dump_stats(ruta + ".prof")
+    final = _instantanea()
+    datos = {
+        "accion": accion.nombre,
+        "segundos": round(segundos, 6),
+        "pico_kib": round(tracemalloc.get_traced_memory()[1] / 1024, 1),
+        "retenido": _lugares(final, accion.base),
+        "puntos": {nombre: lugares for nombre, (_, lugares) in accion.puntos.items()},
+    }
+    with open(ruta + ".json", "w", encoding="utf-8") as f:
+        json.dump(datos, f, ensure_ascii=False, indent=2)
+
+
+# ------------------- Informe -------------------
+
+
+def informe(directorio: str, accion: str = None, top: int = 20) -> str:
+    """Resumen de los volcados de `directorio` (solo de `accion` si se indica)."""
+    import glob
+    import json
+    import pstats
+
+    volcados = []
+    for ruta in sorted(glob.glob(os.path.join(directorio, "*.json"))):
+        with open(ruta, encoding="utf-8") as f:
+            datos = json.load(f)
+        if accion is None or datos.get("accion") == accion:
+            volcados.append((ruta, datos))
+    if not volcados:
+        return "No hay perfiles en el directorio."
+
+    salida = io.StringIO()
+    acciones = {}
+    for _, datos in volcados:
+        resumen = acciones.setdefault(datos["accion"], [0, 0.0, 0.0])
+        resumen[0] += 1
+        resumen[1] += datos["segundos"]
+        resumen[2] = max(resumen[2], datos["pico_kib"])
+    salida.write(f"{'acción':<28} {'veces':>6} {'total s':>9} {'pico KiB':>10}\n")
+    for nombre, (veces, total, pico) in sorted(
+        acciones.items(), key=lambda par: -par[1][1]
+    ):
+        salida.write(f"{nombre:<28} {veces:>6} {total:>9.2f} {pico:>10.0f}\n")
+
+    # Memoria: lo que cada lugar sumó, en el momento de más uso de cada
+    # punto o retenido al terminar
+    lugares = {}
+    for _, datos in volcados:
+        for lista in [datos["retenido"], *datos["puntos"].values()]:
+            for lugar in lista:
+                lugares[lugar["lugar"]] = lugares.get(lugar["lugar"], 0) + lugar["kib"]
+    salida.write("\nLugares con más memoria (KiB sumados entre volcados)\n")
+    for lugar, kib in sorted(lugares.items(), key=lambda par: -par[1])[:top]:
+        salida.write(f"{kib:>10.1f}  {lugar}\n")
+
+    perfiles = [
+        ruta[: -len(".json")] + ".prof"
+        for ruta, _ in volcados
+        if os.path.exists(ruta[: -len(".json")] + ".prof")
+    ]
+    if perfiles:
+        salida.write("\nFunciones con más tiempo acumulado\n")
+        estadisticas = pstats.Stats(*perfiles, stream=salida)
+        estadisticas.strip_dirs().sort_stats("cumulative").print_stats(top)
+    return salida.getvalue()
+
+
+def main(argv=None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        prog="python -m perfilado",
+        description="Junta los perfiles de las acciones del menú.",
+    )
+    parser.add_argument("directorio")
+    parser.add_argument("--accion", help="solo los volcados de esta acción")
+    parser.add_argument("--top", type=int, default=20)
+    args = parser.parse_args(argv)
+    if not os.path.isdir(args.directorio):
+        print(f"No existe el directorio {args.directorio}.", file=sys.stderr)
+        return 1
+    print(informe(args.directorio, args.accion, args.top), end="")
+    return 0
+
+
+configurar_perfilado(os.environ.get("CINE_PERFIL") or None)
+
+if __name__ == "__main__":
+    sys.exit(main())
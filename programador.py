@@ -0,0 +1,207 @@
+"""
+Generador automático de cartelera.
+
+    python -m programador --salas 1:120,2:80 [--objetivos 8525:3,5025:2]
+                          [--por-titulo 2] [--apertura 10:00] [--cierre 23:30]
+                          [--simular]
+
+Reparte las funciones pedidas por título (--objetivos ID:cantidad, o
+--por-titulo para todo el catálogo) en las salas indicadas (sala:capacidad)
+dentro del horario de apertura, sin superponerlas entre sí ni con las
+funciones que ya existen (mismo criterio que crear_funcion: duración de la
+película más la limpieza). Las funciones no tienen fecha, así que la
+cartelera de un día es la de toda la semana.
+
+El reparto es voraz: las funciones se toman por rondas (primero una de
+cada título, de la más larga a la más corta, luego la segunda de cada uno,
+etc.) y cada una va a la sala que se libera antes, que es un min-heap por
+hora libre. Así cada función cuesta O(log salas) más la consulta al índice
+de horarios. Solo las funciones nuevas se guardan, en un solo lote y sobre
+lo que haya en ese momento (bajo el bloqueo de funciones), con ids
+reservados de una vez en la secuencia de funciones. Si no se pueden
+guardar, el comando termina con código 1.
+"""
+
+import argparse
+import heapq
+import sqlite3
+import sys
+import time
+
+from almacenamiento import obtener_almacenamiento
+from asientos import crear_mapa_asientos
+from funciones import validar_entero, validar_hora
+from horarios import LIMPIEZA_MIN, IndiceHorarios, duraciones_peliculas, minutos
+
+PASO_MIN = 5  # las funciones empiezan en múltiplos de 5 minutos
+
+
+def _hora(minuto: int) -> str:
+    return f"{minuto // 60:02d}:{minuto % 60:02d}"
+
+
+def _redondear(minuto: int, paso: int) -> int:
+    return -(-minuto // paso) * paso
+
+
+def programar(
+    duraciones: dict,
+    salas: dict,
+    objetivos: dict,
+    apertura: str = "10:00",
+    cierre: str = "23:30",
+    limpieza: int = LIMPIEZA_MIN,
+    paso: int = PASO_MIN,
+    horarios: IndiceHorarios = None,
+):
+    """
+    Arma la cartelera de un día.
+
+    duraciones: {id_pelicula: minutos}; salas: {sala: capacidad};
+    objetivos: {id_pelicula: funciones por día}. Las funciones deben
+    terminar antes del cierre (la limpieza puede quedar después). Si se
+    pasa `horarios`, se respetan las funciones que ya tiene (y su limpieza)
+    y se le agregan las nuevas. Devuelve (funciones nuevas sin id_funcion, {id_pelicula:
+    cuántas no entraron}).
+    """
+    inicio, fin = minutos(apertura), minutos(cierre)
+    if inicio is None or fin is None or fin <= inicio:
+        raise ValueError("El horario de apertura debe ser anterior al de cierre.")
+    if horarios is None:
+        horarios = IndiceHorarios(limpieza)
+    limpieza = horarios.limpieza
+
+    # Rondas: la k-ésima función de cada título, las más largas primero
+    pedidos = sorted(
+        (ronda, -duraciones[id_pelicula], id_pelicula)
+        for id_pelicula, cantidad in objetivos.items()
+        for ronda in range(cantidad)
+    )
+    # (minuto en que se libera, -capacidad, sala): a igual hora, la más grande
+    libres = [
+        (_redondear(inicio, paso), -capacidad, sala)
+        for sala, capacidad in salas.items()
+    ]
+    heapq.heapify(libres)
+
+    nuevas = []
+    pendientes = {}
+    provisorio = 0
+    for _, menos_duracion, id_pelicula in pedidos:
+        duracion = -menos_duracion
+        colocada = False
+        # La sala que se libera antes es la única candidata: si ahí no
+        # entra antes del cierre, no entra en ninguna
+        while libres and libres[0][0] + duracion <= fin:
+            libre, menos_capacidad, sala = heapq.heappop(libres)
+            hora = _hora(libre)
+            if horarios.conflictos(sala, hora, duracion):
+                # Choca con una función existente: probar un poco más tarde
+                heapq.heappush(libres, (libre + paso, menos_capacidad, sala))
+                continue
+            provisorio += 1
+            horarios.agregar(f"nueva-{provisorio}", sala, hora, duracion)
+            nuevas.append(
+                {
+                    "id_pelicula": id_pelicula,
+                    "sala": sala,
+                    "hora": hora,
+                    "asientos_disponibles": str(-menos_capacidad),
+                }
+            )
+            heapq.heappush(
+                libres,
+                (_redondear(libre + duracion + limpieza, paso), menos_capacidad, sala),
+            )
+            colocada = True
+            break
+        if not colocada:
+            pendientes[id_pelicula] = pendientes.get(id_pelicula, 0) + 1
+    nuevas.sort(key=lambda fn: (fn["sala"].zfill(6), fn["hora"]))
+    return nuevas, pendientes
+
+
+def _pares(texto: str, campo: str, maximo: int) -> dict:
+    """'1:120,2:80' -> {'1': 120, '2': 80}."""
+    pares = {}
+    for par in filter(None, (p.strip() for p in texto.split(","))):
+        clave, _, valor = par.partition(":")
+        clave = clave.strip()
+        if not clave.isdigit():
+            raise ValueError(f"{campo}: '{clave}' debe ser un número.")
+        pares[clave] = validar_entero(valor, campo, minimo=1, maximo=maximo)
+    return pares
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m programador",
+        description="Genera la cartelera del día repartiendo funciones en las salas.",
+    )
+    parser.add_argument("--salas", required=True, help="sala:capacidad,...")
+    parser.add_argument("--objetivos", help="id_pelicula:funciones,...")
+    parser.add_argument(
+        "--por-titulo",
+        type=int,
+        default=2,
+        help="funciones por título si no se dan --objetivos (por defecto 2)",
+    )
+    parser.add_argument("--apertura", default="10:00")
+    parser.add_argument("--cierre", default="23:30")
+    parser.add_argument(
+        "--simular", action="store_true", help="mostrar la cartelera sin guardarla"
+    )
+    args = parser.parse_args(argv)
+
+    almacen = obtener_almacenamiento()
+    try:
+        salas = _pares(args.salas, "Capacidad", 1000)
+        apertura = validar_hora(args.apertura, "Apertura")
+        cierre = validar_hora(args.cierre, "Cierre")
+        todas = duraciones_peliculas(almacen.leer_peliculas())
+        duraciones = {id_: d for id_, d in todas.items() if d > 0}
+        if args.objetivos:
+            objetivos = _pares(args.objetivos, "Funciones", 100)
+            faltan = sorted(set(objetivos) - set(duraciones))
+            if faltan:
+                raise ValueError(f"Películas inexistentes o sin duración: {faltan}")
+        else:
+            objetivos = dict.fromkeys(duraciones, args.por_titulo)
+    except ValueError as e:
+        parser.error(str(e).strip())
+
+    inicio = time.perf_counter()
+    funciones = almacen.leer_funciones()
+    horarios = IndiceHorarios.desde_funciones(funciones, todas)
+    nuevas, pendientes = programar(
+        duraciones, salas, objetivos, apertura, cierre, horarios=horarios
+    )
+    for fn in nuevas:
+        fn["asientos"] = crear_mapa_asientos(int(fn["asientos_disponibles"]))
+    segundos = time.perf_counter() - inicio
+
+    for fn in nuevas:
+        print(
+            f"Sala {fn['sala']:>3}  {fn['hora']}  película {fn['id_pelicula']} "
+            f"({duraciones[fn['id_pelicula']]} min)"
+        )
+    for id_pelicula, cantidad in sorted(pendientes.items()):
+        print(f"No entraron {cantidad} funciones de la película {id_pelicula}.")
+    print(f"{len(nuevas)} funciones programadas en {segundos:.3f} s.")
+    if args.simular or not nuevas:
+        return 0
+    try:
+        # Los ids se piden recién al guardar, todos en una sola reserva (que
+        # también escribe: la secuencia de funciones)
+        ids = almacen.reservar_ids("funciones", len(nuevas))
+        for fn, id_funcion in zip(nuevas, ids):
+            fn["id_funcion"] = str(id_funcion)
+        almacen.guardar_funciones(nuevas, modificadas=nuevas)
+    except (OSError, sqlite3.Error) as e:
+        print(f"No se pudo guardar la cartelera: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,17 +1,22 @@
-import curses
-import json
 import os
 import re
-
-from rich import box
-from rich.console import Console
-from rich.panel import Panel
-from rich.table import Table
-
-from funciones import cargar_funciones, guardar_funcion, ver_funciones
+from typing import TYPE_CHECKING
+
+from almacenamiento import AsientosOcupados, obtener_almacenamiento
+from asientos import MapaAsientos, mejores_asientos
+from consola import Consola, importar_perezoso
+from funciones import cargar_funcion, cargar_funciones, ver_funciones
+from metricas import instrumentar
+from paginacion import mostrar_paginado
 from Peliculas import cargar_peliculas_dict
+from retenciones import SesionRetencion, obtener_retenciones
+from validacion import NOMBRE_CLIENTE
+
+if TYPE_CHECKING:
+    from rich.table import Table
 
-console = Console()
+curses = importar_perezoso("curses")
+console = Consola()
 # Configuración de la sala
 filas = ["A", "B", "C", "D", "E"]
 columnas = ["1", "2", "3", "4", "5", "6"]
@@ -29,6 +34,8 @@ def limpiar_pantalla():
 
 # Función para mostrar el título
 def mostrar_titulo(titulo: str):
+    from rich.panel import Panel
+
     console.print(
         Panel(
             f"[bold white on dark_blue]{titulo.upper()}[/bold white on dark_blue]",
@@ -51,7 +58,6 @@ def crear_reserva() -> None:
     console.print(
         "[bold black on gold1]Ingresa los datos para la reserva:[/bold black on gold1]\n"
     )
-    import re
 
     # Validar nombre del cliente (sin números)
     while True:
@@ -61,7 +67,7 @@ def crear_reserva() -> None:
         if not nombre:
             console.print("[yellow]El nombre no puede estar vacío.[/yellow]")
             continue
-        if not re.match(r"^[A-Za-zÁÉÍÓÚáéíóúÑñ\s]+$", nombre):
+        if not NOMBRE_CLIENTE.fullmatch(nombre):
             console.print(
                 "[yellow]El nombre solo puede contener letras y espacios. No se permiten números ni símbolos.[/yellow]"
             )
@@ -106,173 +112,327 @@ def crear_reserva() -> None:
     pausar_pantalla()
 
 
+def _tabla_reservas(pagina) -> "Table":
+    from rich import box
+    from rich.table import Table
+
+    tabla = Table(
+        show_header=True,
+        header_style="bold bright_white",
+        box=box.ROUNDED,
+        border_style="bold dark_blue",
+        show_lines=True,
+    )
+    tabla.add_column("ID Reserva", justify="center", style="orange3")
+    tabla.add_column("Función", justify="center", style="gold1")
+    tabla.add_column("Cliente", justify="left", style="bold grey70")
+    tabla.add_column("Boletos", justify="center", style="bold grey70")
+    tabla.add_column("Asientos", justify="left", style="bold grey70")
+
+    for r in pagina:
+        tabla.add_row(
+            str(r["id_reserva"]),
+            str(r["id_funcion"]),
+            r["nombre_cliente"],
+            str(r["cantidad_boletos"]),
+            ", ".join(r["asientos"]),
+        )
+    return tabla
+
+
 def ver_reservas() -> None:
     limpiar_pantalla()
     mostrar_titulo("Reservas por Función")
 
-    ruta = "reservas.json"
-    if not os.path.exists(ruta):
+    # Las reservas se leen y dibujan por páginas, en orden de ID
+    reservas = obtener_almacenamiento().iterar_reservas()
+    if not mostrar_paginado(console, reservas, _tabla_reservas):
         console.print("[bold yellow]No hay reservas registradas.[/bold yellow]")
-        pausar_pantalla()
-        return
-
-    with open(ruta, "r", encoding="utf-8") as f:
-        reservas = json.load(f)
-
-    if not reservas:
-        console.print("[bold yellow]No hay reservas registradas.[/bold yellow]")
-        pausar_pantalla()
-        return
-
-    # Agrupar reservas por función
-    funciones = {}
-    for reserva in reservas:
-        id_funcion = reserva["id_funcion"]
-        if id_funcion not in funciones:
-            funciones[id_funcion] = []
-        funciones[id_funcion].append(reserva)
-
-    # Mostrar tabla por cada función
-    for id_funcion, grupo in funciones.items():
-        console.print(f"\n[gold1 on dark_red]Función: {id_funcion}[/gold1 on dark_red]")
-        tabla = Table(
-            show_header=True,
-            header_style="bold bright_white",
-            box=box.ROUNDED,
-            border_style="bold dark_blue",
-            show_lines=True,
-        )
-        tabla.add_column("ID Reserva", justify="center", style="orange3")
-        tabla.add_column("Cliente", justify="left", style="bold grey70")
-        tabla.add_column("Boletos", justify="center", style="bold grey70")
-        tabla.add_column("Asientos", justify="left", style="bold grey70")
-
-        for r in grupo:
-            tabla.add_row(
-                str(r["id_reserva"]),
-                r["nombre_cliente"],
-                str(r["cantidad_boletos"]),
-                ", ".join(r["asientos"]),
-            )
-
-        console.print(tabla)
 
     pausar_pantalla()
 
 
 def cargar_ocupados():
-    ruta = "reservas.json"
     ocupados = []
-    if os.path.exists(ruta):
-        with open(ruta, "r", encoding="utf-8") as f:
-            reservas = json.load(f)
-            for reserva in reservas:
-                ocupados.extend(reserva.get("asientos", []))
+    for reserva in obtener_almacenamiento().leer_reservas():
+        ocupados.extend(reserva.get("asientos", []))
     return ocupados
 
 
+@instrumentar("guardar_reserva")
 def guardar_reserva(nombre_cliente, id_funcion, asientos):
-    ruta = "reservas.json"
-    if os.path.exists(ruta):
-        with open(ruta, "r", encoding="utf-8") as f:
-            reservas = json.load(f)
-    else:
-        reservas = []
-
-    nueva_reserva = {
-        "id_reserva": len(reservas) + 1,
-        "nombre_cliente": nombre_cliente,
-        "id_funcion": id_funcion,
-        "asientos": asientos,
-        "cantidad_boletos": len(asientos),
-    }
-
-    reservas.append(nueva_reserva)
-
-    with open(ruta, "w", encoding="utf-8") as f:
-        json.dump(reservas, f, indent=4, ensure_ascii=False)
-
-
-def seleccionar_asientos(stdscr, mapa):
-    curses.curs_set(0)
-    curses.start_color()
-    curses.init_pair(1, curses.COLOR_BLACK, curses.COLOR_GREEN)  # Disponible
-    curses.init_pair(2, curses.COLOR_WHITE, curses.COLOR_RED)  # Ocupado
-    curses.init_pair(3, curses.COLOR_BLACK, curses.COLOR_YELLOW)  # Cursor
-    curses.init_pair(4, curses.COLOR_WHITE, curses.COLOR_GREEN)  # Seleccionado
-
-    def clave(asiento):
-        col = re.search(r"[A-Z]+", asiento).group()
-        fila = int(re.search(r"\d+", asiento).group())
-        return (fila, col)
-
-    asientos_ordenados = sorted(mapa.keys(), key=clave)
-    #  Extraer filas y columnas en orden correcto
-    filas = sorted({int(re.search(r"\d+", a).group()) for a in asientos_ordenados})
-    columnas = sorted(
-        {re.search(r"[A-Z]+", a).group() for a in asientos_ordenados},
-        key=lambda c: (len(c), c),
+    return obtener_almacenamiento().insertar_reserva(
+        nombre_cliente, id_funcion, asientos
     )
-    fila_idx = 0
-    col_idx = 0
-    seleccionados = []
 
-    while True:
-        stdscr.clear()
-        stdscr.addstr(
+
+# Etiqueta de asiento de un mapa dict: columna en letras y fila en número
+_ETIQUETA = re.compile(r"([A-Z]+)(\d+)")
+ANCHO_CABECERA = 4  # líneas de título, leyenda y mensaje antes de la grilla
+
+
+def _grilla(mapa) -> list:
+    """
+    Filas de etiquetas en el orden de la sala (None donde no hay asiento).
+    Un MapaAsientos ya conoce su distribución; un dict se ordena una vez.
+    """
+    if isinstance(mapa, MapaAsientos):
+        ancho = len(mapa.columnas)
+        return [
+            [
+                f"{col}{fila + 1}" if fila * ancho + j < mapa.total else None
+                for j, col in enumerate(mapa.columnas)
+            ]
+            for fila in range(mapa.filas)
+        ]
+    partes = {}
+    for asiento in mapa:
+        coincidencia = _ETIQUETA.fullmatch(asiento)
+        if coincidencia:
+            partes[asiento] = (int(coincidencia[2]), coincidencia[1])
+    filas = sorted({fila for fila, _ in partes.values()})
+    columnas = sorted({col for _, col in partes.values()}, key=lambda c: (len(c), c))
+    indice_fila = {fila: i for i, fila in enumerate(filas)}
+    indice_columna = {col: j for j, col in enumerate(columnas)}
+    grilla = [[None] * len(columnas) for _ in filas]
+    for asiento, (fila, col) in partes.items():
+        grilla[indice_fila[fila]][indice_columna[col]] = asiento
+    return grilla
+
+
+class _SelectorAsientos:
+    """
+    Estado de la pantalla de selección. La grilla se arma una vez y cada
+    tecla repinta solo las celdas que cambiaron (cursor anterior y nuevo,
+    asientos elegidos o soltados, retenciones ajenas que aparecieron o
+    vencieron) con noutrefresh/doupdate. Si la sala no entra en la terminal
+    se muestra una ventana que sigue al cursor; solo al desplazarla (o al
+    cambiar el tamaño de la terminal) se redibuja todo.
+    """
+
+    def __init__(self, stdscr, mapa, sesion=None):
+        self.stdscr = stdscr
+        self.mapa = mapa
+        self.sesion = sesion
+        self.grilla = _grilla(mapa)
+        self.posiciones = {
+            asiento: (i, j)
+            for i, fila in enumerate(self.grilla)
+            for j, asiento in enumerate(fila)
+            if asiento is not None
+        }
+        self.ancho_celda = max(map(len, self.posiciones), default=2) + 3
+        self.fila = self.columna = 0  # cursor
+        self.fila0 = self.columna0 = 0  # primera fila/columna visible
+        self.filas_vista = self.columnas_vista = 1
+        self.seleccionados = {}  # asiento -> None, en el orden en que se eligieron
+        self.ajenos = set()
+        self.mensaje = ""
+        self._sucias = set()
+        self._todo = True
+
+    # ------------------- Dibujo -------------------
+
+    def _ajustar_vista(self):
+        """Acomoda la ventana visible para que incluya al cursor."""
+        alto, ancho = self.stdscr.getmaxyx()
+        self.filas_vista = max(1, (alto - ANCHO_CABECERA - 2) // 2)
+        self.columnas_vista = max(1, (ancho - 4) // self.ancho_celda)
+        fila0 = min(max(self.fila0, self.fila - self.filas_vista + 1), self.fila)
+        columna0 = min(
+            max(self.columna0, self.columna - self.columnas_vista + 1), self.columna
+        )
+        if (fila0, columna0) != (self.fila0, self.columna0):
+            self.fila0, self.columna0 = fila0, columna0
+            self._todo = True
+
+    def _color(self, asiento: str, i: int, j: int):
+        if self.mapa.get(asiento, "libre") == "ocupado":
+            return curses.color_pair(2)
+        if (i, j) == (self.fila, self.columna):
+            return curses.color_pair(3)
+        if asiento in self.seleccionados:
+            return curses.color_pair(4)
+        if asiento in self.ajenos:
+            return curses.color_pair(5)
+        return curses.color_pair(1)
+
+    def _dibujar_celda(self, i: int, j: int):
+        asiento = self.grilla[i][j]
+        if asiento is None:
+            return
+        if not (
+            self.fila0 <= i < self.fila0 + self.filas_vista
+            and self.columna0 <= j < self.columna0 + self.columnas_vista
+        ):
+            return
+        y = ANCHO_CABECERA + (i - self.fila0) * 2
+        x = 4 + (j - self.columna0) * self.ancho_celda
+        self.stdscr.addstr(y, x, f"[{asiento}]", self._color(asiento, i, j))
+
+    def _dibujar_mensaje(self):
+        self.stdscr.move(3, 0)
+        self.stdscr.clrtoeol()
+        if self.mensaje:
+            self.stdscr.addstr(3, 2, self.mensaje)
+
+    def _dibujar_todo(self):
+        self.stdscr.erase()
+        self.stdscr.addstr(
             1,
             2,
-            " SELECCIONA TUS ASIENTOS (ENTER para elegir, Q para salir)",
+            " SELECCIONA TUS ASIENTOS (ENTER para elegir, 1-9 mejores N juntos,"
+            " Q para salir)",
             curses.A_BOLD,
         )
-        stdscr.addstr(
+        self.stdscr.addstr(
             2,
             2,
-            " Verde=Libre | Rojo=Ocupado | Amarillo=Cursor | Verde claro=Seleccionado",
+            " Verde=Libre | Rojo=Ocupado | Amarillo=Cursor | Verde claro=Seleccionado"
+            " | Magenta=Retenido",
         )
-
-        for i, fila in enumerate(filas):
-            for j, col in enumerate(columnas):
-                asiento = f"{col}{fila}"
-                if asiento not in mapa:
-                    continue
-                y = 4 + i * 2
-                x = 4 + j * 6
-                estado = mapa.get(asiento, "libre")
-                if estado == "ocupado":
-                    color = curses.color_pair(2)
-                elif i == fila_idx and j == col_idx:
-                    color = curses.color_pair(3)
-                elif asiento in seleccionados:
-                    color = curses.color_pair(4)
-                else:
-                    color = curses.color_pair(1)
-
-                stdscr.attron(color)
-                stdscr.addstr(y, x, f"[{asiento}]")
-                stdscr.attroff(color)
-        stdscr.refresh()
-        key = stdscr.getch()
-
-        if key == curses.KEY_UP and fila_idx > 0:
-            fila_idx -= 1
-        elif key == curses.KEY_DOWN and fila_idx < len(filas) - 1:
-            fila_idx += 1
-        elif key == curses.KEY_LEFT and col_idx > 0:
-            col_idx -= 1
-        elif key == curses.KEY_RIGHT and col_idx < len(columnas) - 1:
-            col_idx += 1
-        elif key == ord("\n"):
-            asiento_actual = f"{columnas[col_idx]}{filas[fila_idx]}"
-            if (
-                mapa.get(asiento_actual) == "libre"
-                and asiento_actual not in seleccionados
+        self._dibujar_mensaje()
+        filas = len(self.grilla)
+        columnas = len(self.grilla[0]) if self.grilla else 0
+        for i in range(self.fila0, min(filas, self.fila0 + self.filas_vista)):
+            for j in range(
+                self.columna0, min(columnas, self.columna0 + self.columnas_vista)
             ):
-                seleccionados.append(asiento_actual)
-        elif key in [ord("q"), ord("Q")]:
-            break
+                self._dibujar_celda(i, j)
+        if filas > self.filas_vista or columnas > self.columnas_vista:
+            self.stdscr.addstr(
+                ANCHO_CABECERA + self.filas_vista * 2,
+                2,
+                f" Filas {self.fila0 + 1}-{min(filas, self.fila0 + self.filas_vista)}"
+                f" de {filas}, columnas {self.columna0 + 1}-"
+                f"{min(columnas, self.columna0 + self.columnas_vista)} de {columnas}"
+                " (las flechas desplazan la vista)",
+            )
+
+    def pintar(self):
+        self._ajustar_vista()
+        if self._todo:
+            self._dibujar_todo()
+        else:
+            for i, j in self._sucias:
+                self._dibujar_celda(i, j)
+        self._todo = False
+        self._sucias.clear()
+        self.stdscr.noutrefresh()
+        curses.doupdate()
+
+    def _marcar(self, asientos):
+        self._sucias.update(
+            self.posiciones[a] for a in asientos if a in self.posiciones
+        )
+
+    def _cambiar_mensaje(self, mensaje: str):
+        if mensaje != self.mensaje:
+            self.mensaje = mensaje
+            if not self._todo:
+                self._dibujar_mensaje()
 
-    return seleccionados
+    # ------------------- Acciones -------------------
+
+    def mover(self, filas: int, columnas: int):
+        fila = min(max(self.fila + filas, 0), len(self.grilla) - 1)
+        columna = min(max(self.columna + columnas, 0), len(self.grilla[0]) - 1)
+        self._sucias.update({(self.fila, self.columna), (fila, columna)})
+        self.fila, self.columna = fila, columna
+
+    def actualizar_ajenos(self):
+        if self.sesion is None:
+            return
+        self.sesion.renovar_si_hace_falta()
+        ajenos = self.sesion.ajenos()
+        self._marcar(ajenos ^ self.ajenos)
+        self.ajenos = ajenos
+
+    def alternar(self):
+        """ENTER: elige o suelta el asiento bajo el cursor."""
+        asiento = self.grilla[self.fila][self.columna]
+        self._cambiar_mensaje("")
+        if asiento is None:
+            return
+        if asiento in self.seleccionados:
+            del self.seleccionados[asiento]
+            if self.sesion is not None:
+                self.sesion.soltar(asiento)
+        elif self.mapa.get(asiento) == "libre":
+            if asiento in self.ajenos or (
+                self.sesion is not None and not self.sesion.tomar(asiento)
+            ):
+                self._cambiar_mensaje(f"{asiento} está retenido por otra caja.")
+                return
+            self.seleccionados[asiento] = None
+        self._marcar([asiento])
+
+    def elegir_mejores(self, cantidad: int):
+        """Reemplaza la selección por los mejores `cantidad` asientos juntos."""
+        previos = list(self.seleccionados)
+        if self.sesion is not None:
+            for asiento in previos:
+                self.sesion.soltar(asiento)
+        self.seleccionados = {}
+        self._marcar(previos)
+        propuestos = mejores_asientos(self.mapa, cantidad, self.ajenos)
+        if self.sesion is not None and not all(
+            self.sesion.tomar(a) for a in propuestos
+        ):
+            for asiento in propuestos:
+                self.sesion.soltar(asiento)
+            propuestos = []
+        if not propuestos:
+            self._cambiar_mensaje(f"No hay {cantidad} asientos juntos disponibles.")
+            return
+        self.seleccionados = dict.fromkeys(propuestos)
+        self._marcar(propuestos)
+        i, j = self.posiciones[propuestos[0]]
+        self.mover(i - self.fila, j - self.columna)
+        self._cambiar_mensaje(f"Mejores {cantidad} juntos: {', '.join(propuestos)}")
+
+    def ejecutar(self) -> list:
+        if not self.grilla:
+            return []
+        while True:
+            self.actualizar_ajenos()
+            self.pintar()
+            key = self.stdscr.getch()
+            if key == curses.KEY_UP:
+                self.mover(-1, 0)
+            elif key == curses.KEY_DOWN:
+                self.mover(1, 0)
+            elif key == curses.KEY_LEFT:
+                self.mover(0, -1)
+            elif key == curses.KEY_RIGHT:
+                self.mover(0, 1)
+            elif key == curses.KEY_RESIZE:
+                self._todo = True
+            elif key == ord("\n"):
+                self.alternar()
+            elif ord("1") <= key <= ord("9"):
+                self.elegir_mejores(key - ord("0"))
+            elif key in [ord("q"), ord("Q")]:
+                return list(self.seleccionados)
+
+
+def seleccionar_asientos(stdscr, mapa, sesion=None):
+    """
+    Pantalla de selección. Con una SesionRetencion, cada asiento elegido
+    queda retenido para esta caja y los retenidos por otras se muestran en
+    magenta y no se pueden elegir; la pantalla se refresca cada segundo.
+    Las teclas 1-9 reemplazan la selección por los mejores N asientos juntos.
+    """
+    curses.curs_set(0)
+    curses.start_color()
+    curses.init_pair(1, curses.COLOR_BLACK, curses.COLOR_GREEN)  # Disponible
+    curses.init_pair(2, curses.COLOR_WHITE, curses.COLOR_RED)  # Ocupado
+    curses.init_pair(3, curses.COLOR_BLACK, curses.COLOR_YELLOW)  # Cursor
+    curses.init_pair(4, curses.COLOR_WHITE, curses.COLOR_GREEN)  # Seleccionado
+    curses.init_pair(5, curses.COLOR_WHITE, curses.COLOR_MAGENTA)  # Retenido
+    if sesion is not None:
+        stdscr.timeout(1000)
+    return _SelectorAsientos(stdscr, mapa, sesion).ejecutar()
 
 
 def main():
@@ -289,9 +449,10 @@ def main():
         print("\nNo se seleccionaron asientos. Reserva cancelada.")
 
 
+@instrumentar("ejecutar_reserva")
 def ejecutar_reserva(nombre_cliente: str, id_funcion: str) -> list:
-    funciones = cargar_funciones()
-    funcion = next((f for f in funciones if f["id_funcion"] == id_funcion), None)
+    # Solo la función elegida: su mapa y los ocupados de su archivo del índice
+    funcion = cargar_funcion(id_funcion)
 
     if not funcion:
         console.print(
@@ -308,8 +469,19 @@ def ejecutar_reserva(nombre_cliente: str, id_funcion: str) -> list:
         )
         return []
 
-    # Mostrar interfaz visual para seleccionar
-    seleccionados = curses.wrapper(lambda stdscr: seleccionar_asientos(stdscr, mapa))
+    # Mostrar interfaz visual para seleccionar; lo elegido queda retenido
+    # para esta caja hasta confirmar, cancelar o que venza la retención
+    sesion = SesionRetencion(obtener_retenciones(), id_funcion)
+    try:
+        return _confirmar_seleccion(nombre_cliente, id_funcion, mapa, sesion)
+    finally:
+        sesion.liberar_todo()
+
+
+def _confirmar_seleccion(nombre_cliente, id_funcion, mapa, sesion) -> list:
+    seleccionados = curses.wrapper(
+        lambda stdscr: seleccionar_asientos(stdscr, mapa, sesion)
+    )
 
     if not seleccionados:
         console.print(
@@ -330,14 +502,26 @@ def ejecutar_reserva(nombre_cliente: str, id_funcion: str) -> list:
         )
         return []
 
-    # Marcar como ocupados
-    for asiento in seleccion_valida:
-        mapa[asiento] = "ocupado"
-
-    funcion["asientos"] = mapa
-    funcion["asientos_disponibles"] = sum(1 for v in mapa.values() if v == "libre")
+    perdidos = sesion.perdidos(seleccion_valida)
+    if perdidos:
+        console.print(
+            f"[yellow]La retención venció y otra caja tomó: {', '.join(perdidos)}. "
+            "Reserva cancelada, elige de nuevo.[/yellow]"
+        )
+        return []
 
-    guardar_funcion(funciones)
-    guardar_reserva(nombre_cliente, id_funcion, seleccion_valida)
+    # Confirmar: la reserva solo se guarda si nadie vendió esos asientos
+    # mientras se elegían. Los ocupados salen de las reservas, así que
+    # funciones.csv no se reescribe.
+    try:
+        guardar_reserva(nombre_cliente, id_funcion, seleccion_valida)
+    except AsientosOcupados as e:
+        console.print(
+            f"[yellow]Otra caja acaba de vender: {', '.join(e.asientos)}. "
+            "Reserva cancelada, elige de nuevo.[/yellow]"
+        )
+        return []
 
+    for asiento in seleccion_valida:
+        mapa[asiento] = "ocupado"
     return seleccion_valida
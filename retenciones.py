@@ -0,0 +1,233 @@
+"""
+Retenciones temporales de asientos mientras se eligen.
+
+Cuando una caja marca un asiento en la pantalla de selección, el asiento
+queda retenido a su nombre por unos minutos (TTL). Las demás cajas lo ven
+como retenido y no pueden elegirlo; si la caja no confirma ni renueva, la
+retención vence sola.
+
+Las retenciones se comparten entre procesos en retenciones.json (ruta
+configurable con CINE_RETENCIONES), que se reescribe de forma atómica (sin
+fsync) y bajo bloqueo. En memoria cada proceso guarda además un min-heap de
+vencimientos, así que barrer las vencidas solo mira las que ya vencieron.
+"""
+
+import heapq
+import json
+import os
+import time
+
+from bloqueo import bloquear
+from cache_datos import firma_archivo
+from escritura import escribir_atomico
+
+ARCHIVO_RETENCIONES = "retenciones.json"
+TTL_RETENCION = 300  # segundos
+
+
+class RegistroRetenciones:
+    """Tabla (id_funcion, asiento) -> (dueño, vencimiento) con vencimiento por TTL."""
+
+    def __init__(self, ruta: str = ARCHIVO_RETENCIONES, ttl=TTL_RETENCION, reloj=None):
+        self.ruta = ruta
+        self.ttl = ttl
+        self.reloj = reloj or time.time
+        self._retenciones = {}  # (id_funcion, asiento) -> (dueño, vence)
+        self._vencimientos = []  # heap de (vence, id_funcion, asiento)
+        self._firma = None
+
+    # ------------------- Estado compartido -------------------
+
+    def _cargar(self):
+        """Relee el archivo solo si otro proceso lo cambió."""
+        firma = firma_archivo(self.ruta)
+        if firma == self._firma:
+            return
+        datos = {}
+        if firma is not None:
+            try:
+                with open(self.ruta, "r", encoding="utf-8") as f:
+                    datos = json.load(f)
+            except (OSError, ValueError):
+                datos = {}
+        self._retenciones = {}
+        for id_funcion, asientos in datos.items():
+            for asiento, (dueno, vence) in asientos.items():
+                self._retenciones[(id_funcion, asiento)] = (dueno, vence)
+        self._vencimientos = [
+            (vence, id_funcion, asiento)
+            for (id_funcion, asiento), (_, vence) in self._retenciones.items()
+        ]
+        heapq.heapify(self._vencimientos)
+        self._firma = firma
+
+    def _guardar(self):
+        datos = {}
+        for (id_funcion, asiento), retencion in self._retenciones.items():
+            datos.setdefault(id_funcion, {})[asiento] = list(retencion)
+        # Reemplazo atómico sin fsync: cada tecla de la selección guarda, y
+        # las retenciones vencen solas, así que no hace falta que sobrevivan
+        # a un corte de energía
+        escribir_atomico(
+            self.ruta,
+            lambda f: json.dump(datos, f, ensure_ascii=False),
+            sincronizar=False,
+            encoding="utf-8",
+        )
+        self._firma = firma_archivo(self.ruta)
+
+    def _barrer(self, ahora: float) -> bool:
+        """Quita las retenciones vencidas. Devuelve True si quitó alguna."""
+        cambios = False
+        while self._vencimientos and self._vencimientos[0][0] <= ahora:
+            vence, id_funcion, asiento = heapq.heappop(self._vencimientos)
+            actual = self._retenciones.get((id_funcion, asiento))
+            # Las renovadas dejan su vencimiento viejo en el heap: se ignoran
+            if actual is not None and actual[1] == vence:
+                del self._retenciones[(id_funcion, asiento)]
+                cambios = True
+        return cambios
+
+    def _poner(self, id_funcion: str, asiento: str, dueno: str, vence: float):
+        self._retenciones[(id_funcion, asiento)] = (dueno, vence)
+        heapq.heappush(self._vencimientos, (vence, id_funcion, asiento))
+
+    # ------------------- Operaciones -------------------
+
+    def retener(self, id_funcion, asientos, dueno: str) -> list:
+        """
+        Retiene los asientos libres de retención (o ya retenidos por `dueno`,
+        que se renuevan). Devuelve los que otra caja tiene retenidos.
+        """
+        id_funcion = str(id_funcion)
+        with bloquear(self.ruta):
+            self._cargar()
+            ahora = self.reloj()
+            self._barrer(ahora)
+            ajenos = [
+                a
+                for a in asientos
+                if self._retenciones.get((id_funcion, a), (dueno,))[0] != dueno
+            ]
+            if len(ajenos) < len(asientos):
+                for asiento in asientos:
+                    if asiento not in ajenos:
+                        self._poner(id_funcion, asiento, dueno, ahora + self.ttl)
+                self._guardar()
+        return ajenos
+
+    def renovar(self, id_funcion, dueno: str) -> list:
+        """Extiende las retenciones de `dueno` en la función; devuelve las que siguen."""
+        id_funcion = str(id_funcion)
+        with bloquear(self.ruta):
+            self._cargar()
+            ahora = self.reloj()
+            cambios = self._barrer(ahora)
+            propios = [
+                asiento
+                for (funcion, asiento), (d, _) in self._retenciones.items()
+                if funcion == id_funcion and d == dueno
+            ]
+            for asiento in propios:
+                self._poner(id_funcion, asiento, dueno, ahora + self.ttl)
+            if propios or cambios:
+                self._guardar()
+        return propios
+
+    def liberar(self, id_funcion, dueno: str, asientos=None):
+        """Suelta las retenciones de `dueno` (todas las de la función si asientos es None)."""
+        id_funcion = str(id_funcion)
+        with bloquear(self.ruta):
+            self._cargar()
+            self._barrer(self.reloj())
+            sueltos = [
+                clave
+                for clave, (d, _) in self._retenciones.items()
+                if clave[0] == id_funcion
+                and d == dueno
+                and (asientos is None or clave[1] in asientos)
+            ]
+            for clave in sueltos:
+                del self._retenciones[clave]
+            if sueltos:
+                self._guardar()
+
+    def retenidos(self, id_funcion, excepto: str = None) -> dict:
+        """Asiento -> dueño de las retenciones vigentes de la función."""
+        id_funcion = str(id_funcion)
+        # Bajo el bloqueo como las demás: la API y el menú comparten el
+        # registro desde hilos distintos, y cargar o barrer cambia el estado
+        with bloquear(self.ruta):
+            self._cargar()
+            self._barrer(self.reloj())
+            return {
+                asiento: dueno
+                for (funcion, asiento), (dueno, _) in self._retenciones.items()
+                if funcion == id_funcion and dueno != excepto
+            }
+
+
+class SesionRetencion:
+    """
+    Retenciones de una caja mientras elige asientos para una función.
+    No toca el archivo hasta que se retiene el primer asiento.
+    """
+
+    def __init__(self, registro: RegistroRetenciones, id_funcion, dueno: str = None):
+        self.registro = registro
+        self.id_funcion = str(id_funcion)
+        self.dueno = dueno or os.urandom(16).hex()
+        self.propios = set()
+        self._ultima_renovacion = 0.0
+
+    def tomar(self, asiento: str) -> bool:
+        if self.registro.retener(self.id_funcion, [asiento], self.dueno):
+            return False
+        self.propios.add(asiento)
+        self._ultima_renovacion = self.registro.reloj()
+        return True
+
+    def soltar(self, asiento: str):
+        if asiento in self.propios:
+            self.propios.discard(asiento)
+            self.registro.liberar(self.id_funcion, self.dueno, [asiento])
+
+    def ajenos(self) -> set:
+        return set(self.registro.retenidos(self.id_funcion, excepto=self.dueno))
+
+    def renovar_si_hace_falta(self):
+        """Renueva cuando pasó un tercio del TTL desde la última renovación."""
+        if not self.propios:
+            return
+        ahora = self.registro.reloj()
+        if ahora - self._ultima_renovacion >= self.registro.ttl / 3:
+            self.propios = set(self.registro.renovar(self.id_funcion, self.dueno))
+            self._ultima_renovacion = ahora
+
+    def perdidos(self, asientos) -> list:
+        """
+        De los asientos elegidos, los que esta caja retuvo pero ya no puede
+        confirmar porque la retención venció y otra caja los tomó. Los que
+        siguen libres se vuelven a retener.
+        """
+        asientos = [a for a in asientos if a in self.propios]
+        if not asientos:
+            return []
+        return self.registro.retener(self.id_funcion, asientos, self.dueno)
+
+    def liberar_todo(self):
+        if self.propios:
+            self.propios = set()
+            self.registro.liberar(self.id_funcion, self.dueno)
+
+
+_registro = None
+
+
+def obtener_retenciones() -> RegistroRetenciones:
+    global _registro
+    if _registro is None:
+        _registro = RegistroRetenciones(
+            os.environ.get("CINE_RETENCIONES", ARCHIVO_RETENCIONES)
+        )
+    return _registro
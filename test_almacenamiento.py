@@ -0,0 +1,200 @@
+import json
+import os
+import tempfile
+import unittest
+
+import almacenamiento
+
+
+class TestAlmacenamientoSQLite(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.almacen = almacenamiento.AlmacenamientoSQLite(
+            os.path.join(self.tmp.name, "cine.db")
+        )
+
+    def tearDown(self):
+        self.almacen.cerrar()
+        self.tmp.cleanup()
+
+    def test_modo_wal(self):
+        (modo,) = self.almacen.conexion.execute("PRAGMA journal_mode").fetchone()
+        self.assertEqual(modo, "wal")
+
+    def test_buscar_peliculas_sigue_los_cambios(self):
+        self.almacen.insertar_pelicula(
+            {"ID": "1", "Titulo": "Dune", "Genero": "Acción", "Duracion_min": "155"}
+        )
+        self.assertEqual(len(self.almacen.buscar_peliculas("accion")), 1)
+        self.almacen.eliminar_pelicula("1")
+        self.assertEqual(self.almacen.buscar_peliculas("accion"), [])
+
+    def test_crud_peliculas(self):
+        self.assertEqual(self.almacen.siguiente_id_pelicula(), "1")
+        self.almacen.insertar_pelicula(
+            {"ID": "1", "Titulo": "Dune", "Genero": "Ciencia", "Duracion_min": "155"}
+        )
+        self.assertEqual(self.almacen.siguiente_id_pelicula(), "2")
+        fila = self.almacen.obtener_pelicula("1")
+        self.assertEqual(fila["Titulo"], "Dune")
+
+        fila["Titulo"] = "Dune 2"
+        self.assertTrue(self.almacen.actualizar_pelicula(fila))
+        self.assertEqual(self.almacen.obtener_pelicula("1")["Titulo"], "Dune 2")
+
+        self.assertTrue(self.almacen.eliminar_pelicula("1"))
+        self.assertFalse(self.almacen.eliminar_pelicula("1"))
+        self.assertIsNone(self.almacen.obtener_pelicula("1"))
+
+    def test_guardar_solo_funciones_modificadas(self):
+        f1 = {"id_funcion": "1", "id_pelicula": "1", "sala": "1", "hora": "10:00"}
+        f2 = {"id_funcion": "2", "id_pelicula": "1", "sala": "2", "hora": "12:00"}
+        self.almacen.guardar_funciones([f1, f2])
+        f2["hora"] = "13:00"
+        self.almacen.guardar_funciones([f1, f2], modificadas=[f2])
+        filas = self.almacen.leer_funciones()
+        self.assertEqual([f["hora"] for f in filas], ["10:00", "13:00"])
+
+    def test_reserva_rechaza_asientos_vendidos(self):
+        self.almacen.insertar_reserva("Ana", "1", ["A1", "A2"])
+        with self.assertRaises(almacenamiento.AsientosOcupados) as ctx:
+            self.almacen.insertar_reserva("Luis", "1", ["A3", "A2"])
+        self.assertEqual(ctx.exception.asientos, ["A2"])
+        self.assertEqual(len(self.almacen.leer_reservas()), 1)
+        # Otra función no choca
+        self.almacen.insertar_reserva("Luis", "2", ["A2"])
+
+    def test_insertar_reserva(self):
+        r1 = self.almacen.insertar_reserva("Ana", "1", ["A1", "A2"])
+        r2 = self.almacen.insertar_reserva("Luis", "1", ["B1"])
+        self.assertEqual((r1["id_reserva"], r2["id_reserva"]), (1, 2))
+        reservas = self.almacen.leer_reservas()
+        self.assertEqual(reservas[0]["asientos"], ["A1", "A2"])
+        self.assertEqual(reservas[1]["cantidad_boletos"], 1)
+
+
+class TestFuncionesArchivos(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.ruta = os.path.join(self.tmp.name, "funciones.csv")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def terminal(self):
+        return almacenamiento.AlmacenamientoArchivos(
+            os.path.join(self.tmp.name, "peliculas.csv"),
+            self.ruta,
+            os.path.join(self.tmp.name, "reservas.json"),
+        )
+
+    def test_modificadas_no_pisan_lo_guardado_por_otra_terminal(self):
+        f1 = {"id_funcion": "1", "id_pelicula": "1", "sala": "1", "hora": "10:00"}
+        una, otra = self.terminal(), self.terminal()
+        una.guardar_funciones([f1])
+        funciones = una.leer_funciones()  # la lista que queda en pantalla
+
+        f2 = {"id_funcion": "2", "id_pelicula": "1", "sala": "2", "hora": "12:00"}
+        otra.guardar_funciones(otra.leer_funciones() + [f2], modificadas=[f2])
+
+        funciones[0]["hora"] = "11:00"
+        f3 = {"id_funcion": "3", "id_pelicula": "1", "sala": "3", "hora": "15:00"}
+        una.guardar_funciones(funciones + [f3], modificadas=[funciones[0], f3])
+        filas = self.terminal().leer_funciones()
+        self.assertEqual(
+            [(f["id_funcion"], f["hora"]) for f in filas],
+            [("1", "11:00"), ("2", "12:00"), ("3", "15:00")],
+        )
+
+    def test_sin_modificadas_reescribe_todo(self):
+        almacen = self.terminal()
+        f1 = {"id_funcion": "1", "id_pelicula": "1", "sala": "1", "hora": "10:00"}
+        f2 = {"id_funcion": "2", "id_pelicula": "1", "sala": "2", "hora": "12:00"}
+        almacen.guardar_funciones([f1, f2])
+        almacen.guardar_funciones([f2])
+        self.assertEqual([f["id_funcion"] for f in almacen.leer_funciones()], ["2"])
+
+
+class TestImportarExportar(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        ruta = self.tmp.name
+        self.archivos = almacenamiento.AlmacenamientoArchivos(
+            os.path.join(ruta, "peliculas.csv"),
+            os.path.join(ruta, "funciones.csv"),
+            os.path.join(ruta, "reservas.json"),
+        )
+        self.bd = almacenamiento.AlmacenamientoSQLite(os.path.join(ruta, "cine.db"))
+
+    def tearDown(self):
+        self.bd.cerrar()
+        self.tmp.cleanup()
+
+    def test_ida_y_vuelta(self):
+        self.archivos.insertar_pelicula(
+            {"ID": "7", "Titulo": "Coco", "Genero": "Animada", "Duracion_min": "105"}
+        )
+        self.archivos.guardar_funciones(
+            [{"id_funcion": "1", "id_pelicula": "7", "sala": "2", "hora": "18:00"}]
+        )
+        self.archivos.insertar_reserva("Ana", "1", ["A1"])
+
+        almacenamiento.copiar_datos(self.archivos, self.bd)
+        self.assertEqual(self.bd.obtener_pelicula("7")["Titulo"], "Coco")
+        self.assertEqual(self.bd.leer_funciones()[0]["sala"], "2")
+        self.assertEqual(self.bd.leer_reservas()[0]["asientos"], ["A1"])
+
+        self.bd.insertar_reserva("Luis", "1", ["A2"])
+        almacenamiento.copiar_datos(self.bd, self.archivos)
+        self.assertEqual(len(self.archivos.leer_reservas()), 2)
+        self.assertEqual(self.archivos.leer_peliculas()[0]["ID"], "7")
+
+
+class TestDiarioReservas(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.instantanea = os.path.join(self.tmp.name, "reservas.json")
+        self.ruta_diario = os.path.join(self.tmp.name, "reservas.jsonl")
+        with open(self.instantanea, "w", encoding="utf-8") as f:
+            json.dump([{"id_reserva": 1, "id_funcion": "1", "asientos": ["A1"]}], f)
+        self.diario = almacenamiento.DiarioReservas(self.instantanea, self.ruta_diario)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_agregar_no_reescribe_instantanea(self):
+        antes = os.path.getmtime(self.instantanea)
+        reserva = self.diario.agregar("Ana", "1", ["A2"])
+        self.assertEqual(reserva["id_reserva"], 2)
+        self.assertEqual(os.path.getmtime(self.instantanea), antes)
+        with open(self.ruta_diario, encoding="utf-8") as f:
+            self.assertEqual(len(f.readlines()), 1)
+        ids = [r["id_reserva"] for r in self.diario.leer()]
+        self.assertEqual(ids, [1, 2])
+
+    def test_linea_cortada_se_ignora(self):
+        self.diario.agregar("Ana", "1", ["A2"])
+        with open(self.ruta_diario, "a", encoding="utf-8") as f:
+            f.write('{"id_reserva": 3, "nombre')
+        reserva = self.diario.agregar("Luis", "1", ["A3"])
+        self.assertEqual(reserva["id_reserva"], 3)
+        ids = [r["id_reserva"] for r in self.diario.leer()]
+        self.assertEqual(ids, [1, 2, 3])
+
+    def test_compactar(self):
+        self.diario.agregar("Ana", "1", ["A2"])
+        self.assertEqual(self.diario.compactar(), 2)
+        self.assertEqual(os.path.getsize(self.ruta_diario), 0)
+        with open(self.instantanea, encoding="utf-8") as f:
+            self.assertEqual(len(json.load(f)), 2)
+        self.assertEqual(self.diario.agregar("Luis", "1", ["A3"])["id_reserva"], 3)
+
+    def test_compacta_al_superar_limite(self):
+        self.diario.limite_bytes = 1
+        self.diario.agregar("Ana", "1", ["A2"])
+        self.assertEqual(os.path.getsize(self.ruta_diario), 0)
+        self.assertEqual(len(self.diario.leer()), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,169 @@
+import asyncio
+import http.client
+import json
+import os
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+
+import almacenamiento
+import retenciones
+from api import ServidorAPI, listar_funciones
+from funciones import armar_funcion
+
+
+class TestAPI(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        ruta = cls.tmp.name
+        cls.rutas = [
+            os.path.join(ruta, n)
+            for n in ("peliculas.csv", "funciones.csv", "reservas.json")
+        ]
+        datos = almacenamiento.AlmacenamientoArchivos(*cls.rutas)
+        datos.reemplazar_peliculas(
+            [{"ID": "1", "Titulo": "Dune", "Genero": "Ciencia", "Duracion_min": "155"}]
+        )
+        datos.reemplazar_funciones(
+            [
+                {
+                    "id_funcion": "1",
+                    "id_pelicula": "1",
+                    "sala": "1",
+                    "hora": "20:00",
+                    "asientos_disponibles": 12,
+                    "asientos": {},
+                }
+            ]
+        )
+        cls.retenciones_previas = retenciones._registro
+        retenciones._registro = retenciones.RegistroRetenciones(
+            os.path.join(ruta, "retenciones.json")
+        )
+
+        cls.loop = asyncio.new_event_loop()
+        cls.servidor = ServidorAPI(
+            "127.0.0.1",
+            0,
+            crear_almacen=lambda: almacenamiento.AlmacenamientoArchivos(
+                *cls.rutas, dir_indice=os.path.join(ruta, "ocupados.idx")
+            ),
+        )
+        cls.host, cls.puerto = cls.loop.run_until_complete(cls.servidor.iniciar())
+        cls.hilo = threading.Thread(target=cls.loop.run_forever, daemon=True)
+        cls.hilo.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        asyncio.run_coroutine_threadsafe(cls.servidor.cerrar(), cls.loop).result(10)
+        cls.loop.call_soon_threadsafe(cls.loop.stop)
+        cls.hilo.join(10)
+        cls.loop.close()
+        retenciones._registro = cls.retenciones_previas
+        cls.tmp.cleanup()
+
+    def pedir(self, metodo, ruta, datos=None, conexion=None):
+        conexion = conexion or http.client.HTTPConnection(self.host, self.puerto)
+        cuerpo = json.dumps(datos) if datos is not None else None
+        conexion.request(metodo, ruta, body=cuerpo)
+        respuesta = conexion.getresponse()
+        return respuesta.status, json.loads(respuesta.read())
+
+    def test_listados(self):
+        estado, peliculas = self.pedir("GET", "/peliculas")
+        self.assertEqual(estado, 200)
+        self.assertEqual(peliculas[0]["titulo"], "Dune")
+        estado, funciones = self.pedir("GET", "/funciones")
+        self.assertEqual(estado, 200)
+        self.assertEqual(funciones[0]["titulo"], "Dune")
+        self.assertEqual(funciones[0]["asientos_totales"], 12)
+
+    def test_reserva_y_conflicto(self):
+        estado, reserva = self.pedir(
+            "POST",
+            "/reservas",
+            {"nombre_cliente": "Ana", "id_funcion": "1", "asientos": ["A1", "B1"]},
+        )
+        self.assertEqual(estado, 201, reserva)
+        self.assertEqual(reserva["cantidad_boletos"], 2)
+
+        estado, error = self.pedir(
+            "POST",
+            "/reservas",
+            {"nombre_cliente": "Luis", "id_funcion": "1", "asientos": ["B1"]},
+        )
+        self.assertEqual(estado, 409)
+        self.assertEqual(error["asientos"], ["B1"])
+
+        estado, mapa = self.pedir("GET", "/funciones/1/asientos")
+        self.assertEqual(estado, 200)
+        self.assertIn("A1", mapa["ocupados"])
+        self.assertEqual(len(mapa["asientos"]), 12)
+
+    def test_reserva_de_los_mejores_juntos(self):
+        estado, reserva = self.pedir(
+            "POST",
+            "/reservas",
+            {"nombre_cliente": "Eva", "id_funcion": "1", "cantidad": 2},
+        )
+        self.assertEqual(estado, 201, reserva)
+        self.assertEqual(reserva["cantidad_boletos"], 2)
+        self.assertEqual({a[1:] for a in reserva["asientos"]}, {"3"})
+
+        estado, error = self.pedir(
+            "POST",
+            "/reservas",
+            {"nombre_cliente": "Eva", "id_funcion": "1", "cantidad": 4},
+        )
+        self.assertEqual(estado, 409, error)
+        estado, _ = self.pedir(
+            "POST",
+            "/reservas",
+            {"nombre_cliente": "Eva", "id_funcion": "1", "cantidad": 0},
+        )
+        self.assertEqual(estado, 400)
+
+    def test_errores(self):
+        self.assertEqual(self.pedir("GET", "/nada")[0], 404)
+        self.assertEqual(self.pedir("GET", "/funciones/99/asientos")[0], 404)
+        self.assertEqual(self.pedir("DELETE", "/peliculas")[0], 405)
+        estado, _ = self.pedir(
+            "POST",
+            "/reservas",
+            {"nombre_cliente": "Ana1", "id_funcion": "1", "asientos": ["C1"]},
+        )
+        self.assertEqual(estado, 400)
+        estado, _ = self.pedir(
+            "POST",
+            "/reservas",
+            {"nombre_cliente": "Ana", "id_funcion": "1", "asientos": ["Z9"]},
+        )
+        self.assertEqual(estado, 400)
+
+    def test_conexion_persistente(self):
+        conexion = http.client.HTTPConnection(self.host, self.puerto)
+        for _ in range(20):
+            self.assertEqual(self.pedir("GET", "/peliculas", conexion=conexion)[0], 200)
+        conexion.close()
+
+
+class TestListarFunciones(unittest.TestCase):
+    def test_libres_ignora_asientos_que_no_existen(self):
+        funcion = armar_funcion(
+            {"id_funcion": "1", "id_pelicula": "1", "asientos_disponibles": 4},
+            {"A1", "Z99", "Z98", "Z97", "Z96"},
+        )
+        with (
+            patch("api.cargar_funciones", return_value=[funcion]),
+            patch("api.cargar_peliculas_dict", return_value={"1": "Dune"}),
+        ):
+            (resumen,) = listar_funciones()
+        self.assertEqual(
+            (resumen["asientos_totales"], resumen["asientos_libres"]), (4, 3)
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,127 @@
+import unittest
+
+from asientos import (
+    MapaAsientos,
+    TramosLibres,
+    calcular_distribucion,
+    crear_mapa_asientos,
+    deserializar_asientos,
+    mejores_asientos,
+    serializar_asientos,
+)
+
+
+class TestMapaAsientos(unittest.TestCase):
+    def test_mismas_claves_que_el_dict(self):
+        mapa = crear_mapa_asientos(10)
+        self.assertEqual(
+            list(mapa),
+            ["A1", "B1", "C1", "A2", "B2", "C2", "A3", "B3", "C3", "A4"],
+        )
+        self.assertEqual(set(mapa.values()), {"libre"})
+        self.assertNotIn("B4", mapa)
+        self.assertNotIn("D1", mapa)
+        self.assertNotIn("A0", mapa)
+
+    def test_marcar_y_contar(self):
+        mapa = crear_mapa_asientos(50)
+        mapa["A1"] = "ocupado"
+        mapa["C3"] = "ocupado"
+        self.assertEqual(mapa["A1"], "ocupado")
+        self.assertEqual(mapa.get("B1"), "libre")
+        self.assertEqual((mapa.ocupados(), mapa.libres()), (2, 48))
+        mapa["A1"] = "libre"
+        self.assertEqual(mapa.ocupados(), 1)
+        with self.assertRaises(ValueError):
+            mapa["A2"] = "roto"
+
+    def test_coordenadas(self):
+        mapa = crear_mapa_asientos(9)
+        mapa["B2"] = "ocupado"
+        self.assertTrue(mapa.esta_ocupado(1, 1))
+        self.assertFalse(mapa.esta_ocupado(0, 1))
+        self.assertEqual(mapa.etiqueta(2, 0), "A3")
+        with self.assertRaises(IndexError):
+            mapa.posicion(3, 0)
+
+    def test_serializacion_compacta(self):
+        mapa = crear_mapa_asientos(500)
+        mapa["A1"] = "ocupado"
+        mapa["T22"] = "ocupado"
+        texto = serializar_asientos(mapa)
+        self.assertTrue(texto.startswith("bits:500:"))
+        copia = deserializar_asientos(texto)
+        self.assertIsInstance(copia, MapaAsientos)
+        self.assertEqual(copia, mapa)
+        self.assertEqual(copia.ocupados(), 2)
+
+    def test_deserializar_json_antiguo(self):
+        texto = '{"A1": "libre", "B1": "ocupado"}'
+        self.assertEqual(deserializar_asientos(texto), {"A1": "libre", "B1": "ocupado"})
+        self.assertEqual(deserializar_asientos("bits:roto"), {})
+
+
+class TestDistribucion(unittest.TestCase):
+    def test_distribucion_mas_cuadrada(self):
+        self.assertEqual(calcular_distribucion(1), (1, ("A",)))
+        self.assertEqual(calcular_distribucion(2), (2, ("A",)))
+        self.assertEqual(calcular_distribucion(10), (4, ("A", "B", "C")))
+        filas, columnas = calcular_distribucion(500)
+        self.assertEqual((filas, len(columnas)), (23, 22))
+        self.assertEqual(calcular_distribucion(0), (0, ("A",)))
+
+    def test_etiquetas_de_varias_letras(self):
+        _, columnas = calcular_distribucion(800 * 800)
+        self.assertEqual(columnas[25:28], ("Z", "AA", "AB"))
+        self.assertEqual(columnas[701:703], ("ZZ", "AAA"))
+
+    def test_plantilla_compartida(self):
+        a = crear_mapa_asientos(120)
+        b = crear_mapa_asientos(120)
+        a["A1"] = "ocupado"
+        self.assertIs(a.columnas, b.columnas)
+        self.assertEqual(b["A1"], "libre")
+
+
+class TestMejoresAsientos(unittest.TestCase):
+    def test_centrados_en_la_fila_ideal(self):
+        mapa = crear_mapa_asientos(500)  # 23 filas x 22 columnas
+        self.assertEqual(mejores_asientos(mapa, 4), ["J14", "K14", "L14", "M14"])
+
+    def test_cambia_de_fila_antes_que_alejarse_del_centro(self):
+        mapa = crear_mapa_asientos(500)
+        mapa["L14"] = "ocupado"
+        self.assertEqual(mejores_asientos(mapa, 4), ["J15", "K15", "L15", "M15"])
+
+    def test_se_corre_dentro_del_tramo(self):
+        mapa = crear_mapa_asientos(9)  # 3 x 3
+        self.assertEqual(mejores_asientos(mapa, 2), ["A2", "B2"])
+        mapa["A2"] = "ocupado"
+        self.assertEqual(mejores_asientos(mapa, 2), ["B2", "C2"])
+        self.assertEqual(mejores_asientos(mapa, 2, excluidos=["C2"]), ["A3", "B3"])
+
+    def test_sin_lugar_para_el_grupo(self):
+        mapa = {"A1": "libre", "B1": "ocupado", "A2": "libre"}
+        self.assertEqual(mejores_asientos(mapa, 2), [])
+        self.assertEqual(mejores_asientos(mapa, 1), ["A2"])
+        self.assertEqual(mejores_asientos(mapa, 0), [])
+
+    def test_ocupar_hasta_llenar(self):
+        tramos = TramosLibres(crear_mapa_asientos(500))
+        vendidos = []
+        while True:
+            grupo = tramos.mejores(4)
+            if not grupo:
+                break
+            self.assertEqual(
+                len({a.lstrip("ABCDEFGHIJKLMNOPQRSTUV") for a in grupo}), 1
+            )
+            tramos.ocupar(grupo)
+            vendidos.extend(grupo)
+        self.assertEqual(len(vendidos), len(set(vendidos)))
+        # Al menos 5 grupos de 4 en cada una de las 22 filas completas
+        self.assertGreaterEqual(len(vendidos), 22 * 5 * 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
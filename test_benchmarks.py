@@ -0,0 +1,83 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+
+from benchmarks import arranque, ejecutar
+
+
+class TestEjecutar(unittest.TestCase):
+    def test_guarda_la_base_y_detecta_regresiones(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            base = os.path.join(tmp, "base.json")
+            argumentos = [
+                "--escala",
+                "mini",
+                "--tiempo",
+                "0",
+                "--datos",
+                tmp,
+                "--base",
+                base,
+                "--solo",
+                "crear_mapa_asientos",
+                "guardar_reserva",
+            ]
+            with redirect_stdout(io.StringIO()):
+                self.assertEqual(ejecutar.main(argumentos + ["--guardar-base"]), 0)
+            with open(base, encoding="utf-8") as f:
+                guardada = json.load(f)
+            self.assertEqual(set(guardada), {"crear_mapa_asientos", "guardar_reserva"})
+
+            # Una base imposible de alcanzar se informa como regresión
+            guardada["crear_mapa_asientos"]["ops_s"] = 1e12
+            with open(base, "w", encoding="utf-8") as f:
+                json.dump(guardada, f)
+            with redirect_stdout(io.StringIO()) as salida:
+                self.assertEqual(ejecutar.main(argumentos), 1)
+            self.assertIn("REGRESIÓN", salida.getvalue())
+
+    def test_comparar_tolera_ruido(self):
+        base = {"ops_s": 100.0, "pico_kib": 1000.0}
+        self.assertEqual(
+            ejecutar.comparar({"ops_s": 80.0, "pico_kib": 1200.0}, base, 0.25), []
+        )
+        self.assertEqual(
+            len(ejecutar.comparar({"ops_s": 50.0, "pico_kib": 2000.0}, base, 0.25)), 2
+        )
+
+
+class TestArranque(unittest.TestCase):
+    def test_lee_importtime(self):
+        texto = (
+            "import time: self [us] | cumulative | imported package\n"
+            "import time:       120 |        120 |   _io\n"
+            "import time:      2616 |       2616 |         enum\n"
+            "import time:       640 |       4796 |       re\n"
+            "otra línea\n"
+            "import time:       450 |       8003 | main\n"
+        )
+        self.assertEqual(
+            arranque.leer_importtime(texto),
+            [
+                ("main", 8003, 450),
+                ("re", 4796, 640),
+                ("enum", 2616, 2616),
+                ("_io", 120, 120),
+            ],
+        )
+
+    def test_mide_el_primer_menu(self):
+        (segundos,) = arranque.medir_arranque(1)
+        self.assertGreater(segundos, 0)
+        nombres = [nombre for nombre, _, _ in arranque.importaciones()]
+        self.assertIn("main", nombres)
+        # Los submenús no se importan hasta elegirlos
+        self.assertNotIn("almacenamiento", nombres)
+        self.assertNotIn("readchar", nombres)
+
+
+if __name__ == "__main__":
+    unittest.main()
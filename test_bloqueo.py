@@ -0,0 +1,103 @@
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+import almacenamiento
+from bloqueo import bloquear
+from escritura import agrupar_escrituras
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+RAIZ = os.path.dirname(os.path.abspath(__file__))
+
+# Cada proceso intenta vender el mismo asiento; imprime "ok" o "ocupado"
+VENDER = """
+import sys
+import almacenamiento
+almacen = almacenamiento.AlmacenamientoArchivos(
+    sys.argv[1], sys.argv[2], sys.argv[3], modo_reservas=sys.argv[4],
+    ruta_diario=sys.argv[3] + "l", dir_indice=sys.argv[3] + ".idx",
+)
+try:
+    almacen.insertar_reserva(sys.argv[5], "1", ["C3", sys.argv[5]])
+    print("ok")
+except almacenamiento.AsientosOcupados:
+    print("ocupado")
+"""
+
+
+@unittest.skipIf(fcntl is None, "fcntl no disponible")
+class TestBloqueo(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.ruta = os.path.join(self.tmp.name, "reservas.json")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def bloqueado_por_otro(self) -> bool:
+        fd = os.open(self.ruta + ".lock", os.O_RDWR | os.O_CREAT)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return True
+        finally:
+            os.close(fd)
+        return False
+
+    def test_bloquea_y_suelta(self):
+        with bloquear(self.ruta):
+            with bloquear(self.ruta):  # reentrante
+                self.assertTrue(self.bloqueado_por_otro())
+            self.assertTrue(self.bloqueado_por_otro())
+        self.assertFalse(self.bloqueado_por_otro())
+
+    def test_en_grupo_se_suelta_al_confirmar(self):
+        with agrupar_escrituras():
+            with bloquear(self.ruta):
+                pass
+            self.assertTrue(self.bloqueado_por_otro())
+        self.assertFalse(self.bloqueado_por_otro())
+
+    def vender_en_paralelo(self, modo: str):
+        rutas = [
+            os.path.join(self.tmp.name, n)
+            for n in ("peliculas.csv", "funciones.csv", "reservas.json")
+        ]
+        entorno = dict(os.environ, PYTHONPATH=RAIZ, CINE_FSYNC="0")
+        procesos = [
+            subprocess.Popen(
+                [sys.executable, "-c", VENDER, *rutas, modo, f"D{i}"],
+                stdout=subprocess.PIPE,
+                text=True,
+                env=entorno,
+                cwd=self.tmp.name,
+            )
+            for i in range(1, 7)
+        ]
+        salidas = [p.communicate(timeout=60)[0].strip() for p in procesos]
+        self.assertEqual(salidas.count("ok"), 1, salidas)
+        self.assertEqual(salidas.count("ocupado"), 5, salidas)
+
+        almacen = almacenamiento.AlmacenamientoArchivos(
+            *rutas,
+            modo_reservas=modo,
+            ruta_diario=rutas[2] + "l",
+            dir_indice=rutas[2] + ".idx",
+        )
+        self.assertEqual(len(almacen.leer_reservas()), 1)
+
+    def test_ventas_concurrentes_json(self):
+        self.vender_en_paralelo("json")
+
+    def test_ventas_concurrentes_diario(self):
+        self.vender_en_paralelo("diario")
+
+
+if __name__ == "__main__":
+    unittest.main()
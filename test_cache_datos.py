@@ -0,0 +1,85 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import almacenamiento
+from cache_datos import CacheArchivos
+
+
+class TestCacheArchivos(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.ruta = os.path.join(self.tmp.name, "datos.txt")
+        with open(self.ruta, "w", encoding="utf-8") as f:
+            f.write("uno")
+        self.cache = CacheArchivos()
+        self.cargas = 0
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def cargar(self):
+        self.cargas += 1
+        with open(self.ruta, encoding="utf-8") as f:
+            return f.read()
+
+    def test_no_recarga_si_no_cambia(self):
+        self.assertEqual(self.cache.leer("d", [self.ruta], self.cargar), "uno")
+        self.assertEqual(self.cache.leer("d", [self.ruta], self.cargar), "uno")
+        self.assertEqual(self.cargas, 1)
+
+    def test_recarga_si_cambia(self):
+        self.cache.leer("d", [self.ruta], self.cargar)
+        with open(self.ruta, "w", encoding="utf-8") as f:
+            f.write("dos más")
+        self.assertEqual(self.cache.leer("d", [self.ruta], self.cargar), "dos más")
+        self.assertEqual(self.cargas, 2)
+
+    def test_escritura_directa(self):
+        with open(self.ruta, "w", encoding="utf-8") as f:
+            f.write("tres")
+        self.cache.escribir("d", [self.ruta], "tres")
+        self.assertEqual(self.cache.leer("d", [self.ruta], self.cargar), "tres")
+        self.assertEqual(self.cargas, 0)
+        self.cache.invalidar()
+        self.assertIsNone(self.cache.vigente("d", [self.ruta]))
+
+
+class TestCacheEnAlmacenamiento(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        ruta = self.tmp.name
+        self.almacen = almacenamiento.AlmacenamientoArchivos(
+            os.path.join(ruta, "peliculas.csv"),
+            os.path.join(ruta, "funciones.csv"),
+            os.path.join(ruta, "reservas.json"),
+            dir_indice=os.path.join(ruta, "ocupados.idx"),
+        )
+        self.almacen.insertar_pelicula(
+            {"ID": "1", "Titulo": "Coco", "Genero": "Animada", "Duracion_min": "105"}
+        )
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_lecturas_sin_tocar_disco(self):
+        self.almacen.leer_peliculas()
+        with patch("builtins.open", side_effect=AssertionError("lectura")):
+            self.assertEqual(self.almacen.leer_peliculas()[0]["Titulo"], "Coco")
+            self.assertEqual(self.almacen.leer_reservas(), [])
+            self.assertEqual(self.almacen.leer_reservas(), [])
+
+    def test_copias_independientes(self):
+        fila = self.almacen.obtener_pelicula("1")
+        fila["Titulo"] = "Otro"
+        self.assertEqual(self.almacen.obtener_pelicula("1")["Titulo"], "Coco")
+
+    def test_escritura_actualiza_cache(self):
+        self.almacen.insertar_reserva("Ana", "1", ["A1"])
+        with patch("builtins.open", side_effect=AssertionError("lectura")):
+            self.assertEqual(len(self.almacen.leer_reservas()), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+import unittest
+
+from catalogo import CatalogoPeliculas
+
+
+def pelicula(id_, titulo="X", genero="Drama"):
+    return {"ID": id_, "Titulo": titulo, "Genero": genero, "Duracion_min": "90"}
+
+
+class TestCatalogoPeliculas(unittest.TestCase):
+    def setUp(self):
+        self.catalogo = CatalogoPeliculas(
+            [pelicula("3", "Coco"), pelicula("10", "Dune"), pelicula("7", "Up")]
+        )
+
+    def test_obtener_por_id(self):
+        self.assertEqual(self.catalogo.obtener("10")["Titulo"], "Dune")
+        self.assertIsNone(self.catalogo.obtener("99"))
+        self.assertIn("7", self.catalogo)
+
+    def test_siguiente_id(self):
+        self.assertEqual(self.catalogo.siguiente_id(), "11")
+        self.catalogo.agregar(pelicula("11"))
+        self.assertEqual(self.catalogo.siguiente_id(), "12")
+
+    def test_actualizar_y_eliminar_mantienen_orden(self):
+        self.assertTrue(self.catalogo.actualizar(pelicula("10", "Dune 2")))
+        self.assertTrue(self.catalogo.eliminar("3"))
+        self.assertFalse(self.catalogo.eliminar("3"))
+        self.assertFalse(self.catalogo.actualizar(pelicula("3")))
+        self.assertEqual([f["Titulo"] for f in self.catalogo.filas()], ["Dune 2", "Up"])
+
+    def test_id_repetido_conserva_ambas_filas(self):
+        self.catalogo.agregar(pelicula("7", "Otra"))
+        self.assertEqual(self.catalogo.obtener("7")["Titulo"], "Up")
+        self.assertEqual(len(self.catalogo), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
+
+
+class TestBusquedaCatalogo(unittest.TestCase):
+    def setUp(self):
+        self.catalogo = CatalogoPeliculas(
+            [
+                pelicula("1", "El Señor de los Anillos", "Fantasía"),
+                pelicula("2", "Interestelar", "Ciencia Ficción"),
+                pelicula("3", "Dune", "ciencia ficcion"),
+                pelicula("4", "Coco", "Animación"),
+            ]
+        )
+
+    def ids(self, filas):
+        return [f["ID"] for f in filas]
+
+    def test_genero_exacto_ignora_mayusculas_y_tildes(self):
+        self.assertEqual(
+            self.ids(self.catalogo.buscar_genero("CIENCIA FICCIÓN")), ["2", "3"]
+        )
+        self.assertEqual(self.catalogo.buscar_genero("ciencia"), [])
+
+    def test_genero_prefijo_y_palabras(self):
+        self.assertEqual(
+            self.ids(self.catalogo.buscar_genero("cien", "prefijo")), ["2", "3"]
+        )
+        self.assertEqual(
+            self.ids(self.catalogo.buscar_genero("fic", "palabras")), ["2", "3"]
+        )
+        self.assertEqual(self.catalogo.buscar_genero("fic", "prefijo"), [])
+
+    def test_titulo_por_palabras(self):
+        self.assertEqual(self.ids(self.catalogo.buscar_titulo("senor an")), ["1"])
+        self.assertEqual(self.catalogo.buscar_titulo("senor coco"), [])
+
+    def test_indice_se_actualiza_con_cambios(self):
+        self.assertEqual(self.ids(self.catalogo.buscar_genero("animacion")), ["4"])
+        self.catalogo.actualizar(pelicula("4", "Coco", "Drama"))
+        self.catalogo.agregar(pelicula("5", "Up", "Animación"))
+        self.assertEqual(self.ids(self.catalogo.buscar_genero("animacion")), ["5"])
+
+    def test_modo_desconocido(self):
+        with self.assertRaises(ValueError):
+            self.catalogo.buscar_genero("drama", "difuso")
@@ -0,0 +1,49 @@
+import subprocess
+import sys
+import unittest
+from unittest.mock import patch
+
+import consola
+import funciones
+import reservas
+
+
+class TestConsola(unittest.TestCase):
+    def test_importa_recien_al_usar_un_atributo(self):
+        # En un proceso nuevo, para que nadie lo haya importado antes
+        codigo = (
+            "import sys, consola\n"
+            "m = consola.importar_perezoso('colorsys')\n"
+            "antes = 'colorsys' in sys.modules\n"
+            "m.rgb_to_hsv(0, 0, 0)\n"
+            "print(antes, 'colorsys' in sys.modules)\n"
+        )
+        salida = subprocess.run(
+            [sys.executable, "-c", codigo], capture_output=True, text=True, check=True
+        )
+        self.assertEqual(salida.stdout.split(), ["False", "True"])
+
+    def test_modulo_ya_importado_se_devuelve_tal_cual(self):
+        self.assertIs(consola.importar_perezoso("unittest"), unittest)
+
+    def test_los_reemplazos_quedan_en_el_representante(self):
+        modulo = consola.importar_perezoso("modulo_de_prueba_que_no_existe")
+        modulo.funcion = len
+        self.assertIs(modulo.funcion, len)
+        with self.assertRaises(ImportError):
+            modulo.otra
+
+    def test_una_sola_consola_compartida(self):
+        self.assertIs(consola.obtener_consola(), consola.obtener_consola())
+        with patch("consola._consola") as compartida:
+            funciones.console.print("a")
+            reservas.console.print("b")
+        self.assertEqual(compartida.print.call_count, 2)
+        with patch("funciones.console.print") as imprimir:
+            funciones.console.print("hola")
+            imprimir.assert_called_once_with("hola")
+            self.assertIsNot(reservas.console.print, imprimir)
+
+
+if __name__ == "__main__":
+    unittest.main()
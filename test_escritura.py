@@ -0,0 +1,135 @@
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+import escritura
+from escritura import agrupar_escrituras, escribir_atomico, guardado_interactivo
+
+
+def escribir_texto(texto):
+    return lambda f: f.write(texto)
+
+
+class TestEscritura(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.ruta = os.path.join(self.tmp.name, "datos.txt")
+        with open(self.ruta, "w", encoding="utf-8") as f:
+            f.write("viejo")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def leer(self):
+        with open(self.ruta, encoding="utf-8") as f:
+            return f.read()
+
+    @patch("os.fsync")
+    def test_escribe_y_sincroniza(self, mock_fsync):
+        escribir_atomico(self.ruta, escribir_texto("nuevo"), encoding="utf-8")
+        self.assertEqual(self.leer(), "nuevo")
+        self.assertFalse(os.path.exists(self.ruta + ".tmp"))
+        # Archivo y directorio
+        self.assertEqual(mock_fsync.call_count, 2)
+
+    def test_error_conserva_el_original(self):
+        def falla(f):
+            f.write("a medias")
+            raise RuntimeError("corte")
+
+        with self.assertRaises(RuntimeError):
+            escribir_atomico(self.ruta, falla, encoding="utf-8")
+        self.assertEqual(self.leer(), "viejo")
+        self.assertFalse(os.path.exists(self.ruta + ".tmp"))
+
+    @patch("os.fsync")
+    def test_grupo_confirma_al_salir(self, mock_fsync):
+        otra = os.path.join(self.tmp.name, "otra.txt")
+        with agrupar_escrituras():
+            for i in range(5):
+                escribir_atomico(self.ruta, escribir_texto(f"v{i}"), encoding="utf-8")
+            escribir_atomico(otra, escribir_texto("x"), encoding="utf-8")
+            with agrupar_escrituras():
+                escribir_atomico(otra, escribir_texto("y"), encoding="utf-8")
+            self.assertEqual(self.leer(), "viejo")
+            mock_fsync.assert_not_called()
+        self.assertEqual(self.leer(), "v4")
+        with open(otra, encoding="utf-8") as f:
+            self.assertEqual(f.read(), "y")
+        # Un fsync por archivo y uno por el directorio compartido
+        self.assertEqual(mock_fsync.call_count, 3)
+
+    def test_grupo_con_error_descarta(self):
+        with self.assertRaises(ValueError):
+            with agrupar_escrituras():
+                escribir_atomico(self.ruta, escribir_texto("nuevo"), encoding="utf-8")
+                raise ValueError("cancelado")
+        self.assertEqual(self.leer(), "viejo")
+        self.assertFalse(os.path.exists(self.ruta + ".tmp"))
+
+    @patch("os.fsync")
+    def test_sin_fsync(self, mock_fsync):
+        escritura.configurar_escritura(False)
+        try:
+            escribir_atomico(self.ruta, escribir_texto("nuevo"), encoding="utf-8")
+        finally:
+            escritura.configurar_escritura(True)
+        self.assertEqual(self.leer(), "nuevo")
+        mock_fsync.assert_not_called()
+
+    @patch("os.fsync")
+    def test_sin_sincronizar_ni_esperar_al_grupo(self, mock_fsync):
+        with agrupar_escrituras():
+            escribir_atomico(
+                self.ruta, escribir_texto("nuevo"), sincronizar=False, encoding="utf-8"
+            )
+            self.assertEqual(self.leer(), "nuevo")
+        mock_fsync.assert_not_called()
+
+
+class TestVentana(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.ruta = os.path.join(self.tmp.name, "datos.txt")
+        escritura.configurar_escritura(True, ventana_ms=60_000)
+
+    def tearDown(self):
+        escritura.configurar_escritura(True, ventana_ms=0)
+        self.tmp.cleanup()
+
+    @patch("os.fsync")
+    def test_difiere_los_fsync_del_menu(self, mock_fsync):
+        otra = os.path.join(self.tmp.name, "otra.txt")
+        with guardado_interactivo():
+            for i in range(5):
+                escribir_atomico(self.ruta, escribir_texto(f"v{i}"), encoding="utf-8")
+            with open(otra, "a", encoding="utf-8") as f:
+                f.write("linea\n")
+                escritura.sincronizar_archivo(f)
+        with open(self.ruta, encoding="utf-8") as f:
+            self.assertEqual(f.read(), "v4")  # reemplazado en el momento
+        mock_fsync.assert_not_called()
+        escritura.vaciar_pendientes()
+        # Un fsync por archivo y uno por el directorio compartido
+        self.assertEqual(mock_fsync.call_count, 3)
+
+    @patch("os.fsync")
+    def test_fuera_del_menu_sincroniza_en_el_momento(self, mock_fsync):
+        escribir_atomico(self.ruta, escribir_texto("nuevo"), encoding="utf-8")
+        self.assertEqual(mock_fsync.call_count, 2)
+
+    @patch("os.fsync")
+    def test_el_temporizador_sincroniza(self, mock_fsync):
+        escritura.configurar_escritura(True, ventana_ms=20)
+        with guardado_interactivo():
+            escribir_atomico(self.ruta, escribir_texto("nuevo"), encoding="utf-8")
+        limite = time.monotonic() + 5
+        while mock_fsync.call_count < 2 and time.monotonic() < limite:
+            time.sleep(0.01)
+        self.assertEqual(mock_fsync.call_count, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
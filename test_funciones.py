@@ -1,5 +1,5 @@
 import unittest
-from unittest.mock import MagicMock, mock_open, patch
+from unittest.mock import mock_open, patch
 
 import funciones
 
@@ -68,9 +68,10 @@ class TestFunciones(unittest.TestCase):
 
     # ------------------- guardar_funcion -------------------
 
+    @patch("os.fsync")
     @patch("os.replace")
     @patch("builtins.open", new_callable=mock_open)
-    def test_guardar_funcion_escribe_csv(self, mock_file, mock_replace):
+    def test_guardar_funcion_escribe_csv(self, mock_file, mock_replace, mock_fsync):
         funciones.guardar_funcion(self.funciones_mock)
         mock_file.assert_called_once_with(
             "funciones.csv.tmp", "w", newline="", encoding="utf-8"
@@ -118,15 +119,6 @@ class TestFunciones(unittest.TestCase):
 
     # ------------------- Pruebas para funciones de UI y cálculo -------------------
 
-    def test_calcular_max_asientos(self):
-        # Simular una pantalla de 80x24
-        mock_stdscr = MagicMock()
-        mock_stdscr.getmaxyx.return_value = (24, 80)
-        max_asientos = funciones.calcular_max_asientos(mock_stdscr)
-        # max_columnas = 80 // 6 = 13
-        # max_filas = (24 - 4) // 2 = 10
-        self.assertEqual(max_asientos, 13 * 10)
-
     @patch("os.path.exists", return_value=True)
     @patch(
         "builtins.open", new_callable=mock_open, read_data="ID,Titulo\n1,Pelicula 1\n"
@@ -0,0 +1,137 @@
+import io
+import os
+import tempfile
+import tracemalloc
+import unittest
+from contextlib import redirect_stderr, redirect_stdout
+
+import almacenamiento
+import generador
+from asientos import crear_mapa_asientos
+from horarios import IndiceHorarios, duraciones_peliculas, minutos
+from Peliculas import verificar_encabezados_csv
+
+
+class TestGenerador(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.ruta = self.tmp.name
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def almacen(self):
+        return almacenamiento.AlmacenamientoArchivos(
+            os.path.join(self.ruta, "peliculas.csv"),
+            os.path.join(self.ruta, "funciones.csv"),
+            os.path.join(self.ruta, "reservas.json"),
+            dir_indice=os.path.join(self.ruta, "ocupados.idx"),
+        )
+
+    def test_datos_coherentes(self):
+        resumen = generador.generar(self.ruta, 30, 200, 900, semilla=7)
+        self.assertEqual(
+            (resumen["peliculas"], resumen["funciones"], resumen["reservas"]),
+            (30, 200, 900),
+        )
+        for nombre, campos in (
+            ("peliculas.csv", almacenamiento.CAMPOS_PELICULAS),
+            ("funciones.csv", almacenamiento.CAMPOS_FUNCIONES),
+        ):
+            self.assertEqual(
+                verificar_encabezados_csv(os.path.join(self.ruta, nombre), campos),
+                (True, None),
+            )
+        almacen = self.almacen()
+        duraciones = duraciones_peliculas(almacen.leer_peliculas())
+        funciones = {fn["id_funcion"]: fn for fn in almacen.leer_funciones()}
+        self.assertEqual(len(funciones), 200)
+
+        # Películas existentes y salas sin superposiciones ni funciones
+        # que terminen después del cierre
+        indice = IndiceHorarios()
+        for id_funcion, fn in funciones.items():
+            duracion = duraciones[fn["id_pelicula"]]
+            self.assertEqual(indice.conflictos(fn["sala"], fn["hora"], duracion), [])
+            indice.agregar(id_funcion, fn["sala"], fn["hora"], duracion)
+            self.assertLessEqual(
+                minutos(fn["hora"]) + duracion, minutos(generador.CIERRE)
+            )
+        self.assertEqual(
+            len({fn["sala"] for fn in funciones.values()}), resumen["salas"]
+        )
+
+        reservas = almacen.leer_reservas()
+        self.assertEqual([r["id_reserva"] for r in reservas], list(range(1, 901)))
+        vendidos = {}
+        for r in reservas:
+            fn = funciones[r["id_funcion"]]
+            mapa = crear_mapa_asientos(int(fn["asientos_disponibles"]))
+            self.assertEqual(r["cantidad_boletos"], len(r["asientos"]))
+            for asiento in r["asientos"]:
+                self.assertIn(asiento, mapa)
+                self.assertNotIn(asiento, vendidos.setdefault(r["id_funcion"], set()))
+                vendidos[r["id_funcion"]].add(asiento)
+        for id_funcion, asientos in vendidos.items():
+            capacidad = int(funciones[id_funcion]["asientos_disponibles"])
+            self.assertLessEqual(len(asientos), capacidad // 2)
+            self.assertEqual(almacen.ocupados_de(id_funcion), asientos)
+
+        # El último asiento sigue libre y se puede vender
+        capacidad = int(funciones["1"]["asientos_disponibles"])
+        ultimo = generador.etiqueta_asiento(capacidad, capacidad - 1)
+        nueva = almacen.insertar_reserva("Ana", "1", [ultimo])
+        self.assertEqual(nueva["id_reserva"], 901)
+
+    def test_misma_semilla_mismos_datos(self):
+        otro = os.path.join(self.ruta, "otro")
+        generador.generar(self.ruta, 10, 20, 50, semilla=3)
+        generador.generar(otro, 10, 20, 50, semilla=3)
+        for nombre in ("peliculas.csv", "funciones.csv", "reservas.json"):
+            with open(os.path.join(self.ruta, nombre), "rb") as fa:
+                with open(os.path.join(otro, nombre), "rb") as fb:
+                    self.assertEqual(fa.read(), fb.read(), nombre)
+
+    def test_reservas_que_no_entran_no_dejan_archivos(self):
+        with self.assertRaises(ValueError):
+            generador.generar(self.ruta, 5, 2, 500)
+        self.assertEqual(os.listdir(self.ruta), [])
+
+    def test_error_no_mezcla_datos_nuevos_con_viejos(self):
+        generador.generar(self.ruta, 5, 10, 20, semilla=1)
+        antes = {}
+        for nombre in ("peliculas.csv", "funciones.csv", "reservas.json"):
+            with open(os.path.join(self.ruta, nombre), "rb") as f:
+                antes[nombre] = f.read()
+        with self.assertRaises(ValueError):
+            generador.generar(self.ruta, 8, 2, 500, semilla=2)
+        for nombre, contenido in antes.items():
+            with open(os.path.join(self.ruta, nombre), "rb") as f:
+                self.assertEqual(f.read(), contenido, nombre)
+
+    def test_memoria_no_crece_con_las_filas(self):
+        def pico(reservas):
+            tracemalloc.start()
+            try:
+                generador.generar(self.ruta, 100, reservas // 5, reservas)
+                return tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+
+        chico, grande = pico(1_000), pico(20_000)
+        self.assertLess(grande, chico * 2 + 256 * 1024)
+
+    def test_cli_no_pisa_sin_forzar(self):
+        argumentos = ["--destino", self.ruta, "--peliculas", "5"]
+        argumentos += ["--funciones", "10", "--reservas", "20"]
+        with redirect_stdout(io.StringIO()) as salida:
+            self.assertEqual(generador.main(argumentos), 0)
+        self.assertIn("20 reservas", salida.getvalue())
+        with redirect_stderr(io.StringIO()), self.assertRaises(SystemExit):
+            generador.main(argumentos)
+        with redirect_stdout(io.StringIO()):
+            self.assertEqual(generador.main(argumentos + ["--forzar"]), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+import unittest
+
+from horarios import IndiceHorarios, duraciones_peliculas, minutos
+
+
+class TestHorarios(unittest.TestCase):
+    def setUp(self):
+        self.indice = IndiceHorarios.desde_funciones(
+            [
+                {"id_funcion": "1", "id_pelicula": "1", "sala": "1", "hora": "18:00"},
+                {"id_funcion": "2", "id_pelicula": "2", "sala": "2", "hora": "18:00"},
+                {"id_funcion": "3", "id_pelicula": "1", "sala": "", "hora": ""},
+            ],
+            duraciones_peliculas(
+                [
+                    {"ID": "1", "Duracion_min": "154"},
+                    {"ID": "2", "Duracion_min": "90"},
+                ]
+            ),
+            limpieza=15,
+        )
+
+    def test_minutos(self):
+        self.assertEqual(minutos("09:30"), 570)
+        self.assertIsNone(minutos("24:00"))
+        self.assertIsNone(minutos(""))
+
+    def test_superposicion_por_duracion_y_limpieza(self):
+        # 18:00 + 154 + 15 = 20:49
+        self.assertEqual(self.indice.conflictos("1", "19:00", 90), ["1"])
+        self.assertEqual(self.indice.conflictos("1", "20:48", 90), ["1"])
+        self.assertEqual(self.indice.conflictos("1", "20:49", 90), [])
+        # Una función anterior que termina encima de la de las 18:00
+        self.assertEqual(self.indice.conflictos("1", "16:30", 90), ["1"])
+        self.assertEqual(self.indice.conflictos("1", "16:00", 90), [])
+        # Otra sala no cuenta
+        self.assertEqual(self.indice.conflictos("3", "19:00", 90), [])
+
+    def test_editar_excluye_la_propia_y_quitar(self):
+        self.assertEqual(self.indice.conflictos("1", "18:30", 154, excepto="1"), [])
+        self.indice.quitar("1")
+        self.assertEqual(self.indice.conflictos("1", "19:00", 90), [])
+
+    def test_cruza_medianoche(self):
+        self.indice.agregar("4", "2", "23:30", 120)  # hasta las 01:45
+        self.assertEqual(self.indice.conflictos("2", "01:00", 60), ["4"])
+        self.assertEqual(self.indice.conflictos("2", "01:45", 60), [])
+        self.assertEqual(self.indice.conflictos("2", "22:30", 60), ["4"])
+
+    def test_muchas_funciones(self):
+        indice = IndiceHorarios(limpieza=10)
+        for dia in range(7):
+            for n in range(6):
+                indice.agregar(f"{dia}-{n}", "1", f"{10 + n * 2:02d}:00", 100 + dia)
+        self.assertEqual(len(indice.conflictos("1", "11:00", 5)), 7)
+        self.assertEqual(indice.conflictos("1", "22:00", 60), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
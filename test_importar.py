@@ -0,0 +1,151 @@
+import json
+import os
+import tempfile
+import unittest
+
+import almacenamiento
+from importar import Importador
+
+
+class TestImportarArchivos(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.almacen = self.crear_almacen()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def crear_almacen(self):
+        ruta = self.tmp.name
+        return almacenamiento.AlmacenamientoArchivos(
+            os.path.join(ruta, "peliculas.csv"),
+            os.path.join(ruta, "funciones.csv"),
+            os.path.join(ruta, "reservas.json"),
+            dir_indice=os.path.join(ruta, "ocupados.idx"),
+        )
+
+    def archivo(self, nombre, contenido):
+        ruta = os.path.join(self.tmp.name, nombre)
+        with open(ruta, "w", encoding="utf-8") as f:
+            f.write(contenido)
+        return ruta
+
+    def test_importa_en_orden_y_valida(self):
+        peliculas = self.archivo(
+            "p.csv",
+            "Titulo,Genero,Duracion_min\n"
+            "Dune,Ciencia ficción,155\n"
+            "Mala$,Drama,90\n"
+            "Coco,Animación,105\n",
+        )
+        funciones = self.archivo(
+            "f.jsonl",
+            json.dumps(
+                {
+                    "id_pelicula": "1",
+                    "sala": "1",
+                    "hora": "9:30",
+                    "asientos_disponibles": 10,
+                }
+            )
+            + "\n"
+            + json.dumps(
+                {
+                    "id_pelicula": "1",
+                    "sala": "1",
+                    "hora": "09:30",
+                    "asientos_disponibles": 5,
+                }
+            )
+            + "\nno es json\n",
+        )
+        reservas = self.archivo(
+            "r.csv",
+            "nombre_cliente,id_funcion,asientos\nAna,1,A1 a2\nLuis,1,A2\nEva,9,A1\n",
+        )
+        importador = Importador(self.almacen, tamano_lote=2)
+        importador.importar("peliculas", peliculas)
+        importador.importar("funciones", funciones)
+        importador.importar("reservas", reservas)
+        self.assertFalse(importador.terminar())
+
+        self.assertEqual(
+            importador.importadas, {"peliculas": 2, "funciones": 1, "reservas": 1}
+        )
+        self.assertEqual(
+            importador.rechazadas, {"peliculas": 1, "funciones": 2, "reservas": 2}
+        )
+        self.assertEqual(
+            [(os.path.basename(r), n) for r, n, _ in importador.errores],
+            [("p.csv", 3), ("f.jsonl", 2), ("f.jsonl", 3), ("r.csv", 3), ("r.csv", 4)],
+        )
+
+        almacen = self.crear_almacen()
+        self.assertEqual([p["ID"] for p in almacen.leer_peliculas()], ["1", "2"])
+        funcion = almacen.obtener_funcion("1")
+        self.assertEqual(
+            (funcion["hora"], funcion["asientos_disponibles"]), ("09:30", "10")
+        )
+        self.assertEqual(almacen.ocupados_de("1"), {"A1", "A2"})
+
+    def test_estricto_no_escribe_nada(self):
+        peliculas = self.archivo(
+            "p.jsonl",
+            '{"Titulo": "Dune", "Genero": "Ciencia", "Duracion_min": 155}\n'
+            '{"Titulo": "Larga", "Genero": "Drama", "Duracion_min": 900}\n',
+        )
+        importador = Importador(self.almacen, tamano_lote=1, estricto=True)
+        importador.importar("peliculas", peliculas)
+        self.assertFalse(importador.terminar())
+        self.assertEqual(importador.importadas["peliculas"], 0)
+        self.assertEqual(self.crear_almacen().leer_peliculas(), [])
+
+    def test_lote_con_asiento_vendido_no_escribe_nada(self):
+        self.almacen.reemplazar_peliculas(
+            [{"ID": "1", "Titulo": "Dune", "Genero": "Ciencia", "Duracion_min": "155"}]
+        )
+        self.almacen.reemplazar_funciones(
+            [
+                {
+                    "id_funcion": "1",
+                    "id_pelicula": "1",
+                    "sala": "1",
+                    "hora": "20:00",
+                    "asientos_disponibles": 4,
+                    "asientos": {},
+                }
+            ]
+        )
+        self.almacen.insertar_reserva("Ana", "1", ["A1"])
+        with self.assertRaises(almacenamiento.AsientosOcupados):
+            self.almacen.importar_lote(
+                peliculas=[
+                    {
+                        "ID": "2",
+                        "Titulo": "Coco",
+                        "Genero": "Drama",
+                        "Duracion_min": "90",
+                    }
+                ],
+                reservas=[("Luis", "1", ["A2"]), ("Eva", "1", ["A1"])],
+            )
+        self.assertEqual(len(self.almacen.leer_peliculas()), 1)
+        self.assertEqual(len(self.almacen.leer_reservas()), 1)
+
+
+class TestImportarSQLite(TestImportarArchivos):
+    def tearDown(self):
+        for almacen in getattr(self, "_abiertos", []):
+            almacen.cerrar()
+        super().tearDown()
+
+    def crear_almacen(self):
+        almacen = almacenamiento.AlmacenamientoSQLite(
+            os.path.join(self.tmp.name, "cine.db")
+        )
+        self._abiertos = getattr(self, "_abiertos", []) + [almacen]
+        return almacen
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,142 @@
+import json
+import os
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+
+import almacenamiento
+from bloqueo import bloquear
+from indice_ocupados import IndiceOcupados
+
+
+class TestIndiceOcupadosArchivos(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        ruta = self.tmp.name
+        self.ruta_reservas = os.path.join(ruta, "reservas.json")
+        with open(self.ruta_reservas, "w", encoding="utf-8") as f:
+            json.dump(
+                [
+                    {"id_reserva": 1, "id_funcion": "1", "asientos": ["A1", "A2"]},
+                    {"id_reserva": 2, "id_funcion": "2", "asientos": ["B1"]},
+                ],
+                f,
+            )
+        self.dir_indice = os.path.join(ruta, "ocupados.idx")
+        self.almacen = almacenamiento.AlmacenamientoArchivos(
+            os.path.join(ruta, "peliculas.csv"),
+            os.path.join(ruta, "funciones.csv"),
+            self.ruta_reservas,
+            dir_indice=self.dir_indice,
+        )
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_construye_indice_por_funcion(self):
+        self.assertEqual(self.almacen.ocupados_de("1"), {"A1", "A2"})
+        self.assertEqual(self.almacen.ocupados_de("2"), {"B1"})
+        self.assertEqual(self.almacen.ocupados_de("3"), set())
+        self.assertTrue(os.path.exists(os.path.join(self.dir_indice, "1.txt")))
+
+    def test_reserva_actualiza_indice_sin_reconstruir(self):
+        self.almacen.ocupados_de("1")
+        ruta_2 = os.path.join(self.dir_indice, "2.txt")
+        with open(ruta_2, "a", encoding="utf-8") as f:
+            f.write("MARCA\n")
+        self.almacen.insertar_reserva("Ana", "1", ["A3"])
+        self.assertEqual(self.almacen.ocupados_de("1"), {"A1", "A2", "A3"})
+        # Si se hubiera reconstruido, la marca habría desaparecido
+        with open(ruta_2, encoding="utf-8") as f:
+            self.assertIn("MARCA", f.read())
+
+    def test_indice_persistente_entre_instancias(self):
+        self.almacen.ocupados_de("1")
+        self.almacen.insertar_reserva("Ana", "1", ["A3"])
+        otro = almacenamiento.AlmacenamientoArchivos(
+            ruta_reservas=self.ruta_reservas, dir_indice=self.dir_indice
+        )
+        self.assertEqual(otro.ocupados_de("1"), {"A1", "A2", "A3"})
+
+    def test_cambio_externo_reconstruye(self):
+        self.almacen.ocupados_de("1")
+        with open(self.ruta_reservas, "w", encoding="utf-8") as f:
+            json.dump([{"id_reserva": 1, "id_funcion": "1", "asientos": ["C9"]}], f)
+        self.assertEqual(self.almacen.ocupados_de("1"), {"C9"})
+        self.assertEqual(self.almacen.ocupados_de("2"), set())
+
+    def otro_almacen(self):
+        return almacenamiento.AlmacenamientoArchivos(
+            ruta_reservas=self.ruta_reservas, dir_indice=self.dir_indice
+        )
+
+    def test_reconstruccion_espera_el_bloqueo_y_no_repite(self):
+        otro = self.otro_almacen()
+        reconstrucciones = []
+        original = IndiceOcupados.reconstruir
+
+        def contar(indice):
+            reconstrucciones.append(indice)
+            original(indice)
+
+        resultado = {}
+        with patch.object(IndiceOcupados, "reconstruir", contar):
+            with bloquear(self.ruta_reservas):
+                hilo = threading.Thread(
+                    target=lambda: resultado.update(uno=otro.ocupados_de("1"))
+                )
+                hilo.start()
+                hilo.join(0.2)
+                self.assertTrue(hilo.is_alive())  # espera el bloqueo
+                self.almacen.ocupados_de("1")
+            hilo.join()
+        # El segundo encontró la firma al día y no reconstruyó
+        self.assertEqual(reconstrucciones, [self.almacen.indice])
+        self.assertEqual(resultado["uno"], {"A1", "A2"})
+
+    def test_reconstruccion_fallida_no_deja_firma_valida(self):
+        self.almacen.ocupados_de("1")
+        with open(self.ruta_reservas, "w", encoding="utf-8") as f:
+            json.dump([{"id_reserva": 1, "id_funcion": "2", "asientos": ["C9"]}], f)
+        with patch.object(
+            IndiceOcupados, "_escribir_funcion", side_effect=OSError("disco lleno")
+        ):
+            with self.assertRaises(OSError):
+                self.otro_almacen().ocupados_de("1")
+        self.assertFalse(os.path.exists(os.path.join(self.dir_indice, "_firma.json")))
+        otro = self.otro_almacen()
+        self.assertEqual(otro.ocupados_de("1"), set())
+        self.assertEqual(otro.ocupados_de("2"), {"C9"})
+        self.assertFalse(os.path.exists(os.path.join(self.dir_indice, "1.txt")))
+
+
+class TestIndiceOcupadosSQLite(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.almacen = almacenamiento.AlmacenamientoSQLite(
+            os.path.join(self.tmp.name, "cine.db")
+        )
+
+    def tearDown(self):
+        self.almacen.cerrar()
+        self.tmp.cleanup()
+
+    def test_ocupados_por_funcion(self):
+        self.almacen.insertar_reserva("Ana", "1", ["A1", "A2"])
+        self.almacen.insertar_reserva("Luis", "2", ["A1"])
+        self.assertEqual(
+            self.almacen.ocupados_por_funcion(["1", "2", "3"]),
+            {"1": {"A1", "A2"}, "2": {"A1"}, "3": set()},
+        )
+
+    def test_reemplazar_reconstruye(self):
+        self.almacen.insertar_reserva("Ana", "1", ["A1"])
+        self.almacen.reemplazar_reservas(
+            [{"id_reserva": 5, "id_funcion": "1", "asientos": ["B2"]}]
+        )
+        self.assertEqual(self.almacen.ocupados_de("1"), {"B2"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,145 @@
+import json
+import os
+import tempfile
+import time
+import unittest
+
+import almacenamiento
+import funciones
+import metricas
+import reservas
+
+
+@metricas.instrumentar("prueba")
+def operacion(fallar=False):
+    if fallar:
+        raise ValueError("falla")
+    return 42
+
+
+class TestMetricas(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.anterior = metricas._ruta
+        metricas.reiniciar()
+        metricas.configurar_metricas(os.path.join(self.tmp.name, "m.prom"))
+
+    def tearDown(self):
+        metricas.configurar_metricas(self.anterior)
+        metricas.reiniciar()
+        self.tmp.cleanup()
+
+    def test_desactivadas_no_registran(self):
+        metricas.configurar_metricas(None)
+        self.assertEqual(operacion(), 42)
+        with metricas.tramo("bloque") as a, metricas.tramo("otro") as b:
+            self.assertIs(a, b)
+        self.assertEqual(metricas.como_json(), {})
+
+    def test_cuenta_errores_y_cubetas(self):
+        self.assertEqual(operacion(), 42)
+        with self.assertRaises(ValueError):
+            operacion(fallar=True)
+        with metricas.tramo("bloque"):
+            time.sleep(0.003)
+        resumen = metricas.como_json()
+        self.assertEqual(list(resumen), ["bloque", "prueba"])  # más lento primero
+        self.assertEqual(
+            (resumen["prueba"]["cuenta"], resumen["prueba"]["errores"]), (2, 1)
+        )
+        self.assertEqual(resumen["bloque"]["cubetas"]["0.005"], 1)
+        self.assertGreaterEqual(resumen["bloque"]["max_ms"], 3)
+        self.assertLessEqual(resumen["bloque"]["p95_ms"], 5)
+
+    def test_percentil_por_cubetas(self):
+        histograma = metricas.Histograma()
+        for segundos in [0.002] * 90 + [0.2] * 9 + [30]:
+            histograma.registrar(segundos)
+        self.assertEqual(histograma.percentil(0.5), 0.0025)
+        self.assertEqual(histograma.percentil(0.95), 0.25)
+        self.assertEqual(histograma.percentil(1.0), 30)
+
+    def test_texto_prometheus(self):
+        for _ in range(3):
+            operacion()
+        texto = metricas.texto_prometheus()
+        self.assertIn("# TYPE cine_operacion_segundos histogram", texto)
+        self.assertIn(
+            'cine_operacion_segundos_bucket{operacion="prueba",le="+Inf"} 3', texto
+        )
+        self.assertIn('cine_operacion_segundos_count{operacion="prueba"} 3', texto)
+        self.assertIn('cine_operacion_errores_total{operacion="prueba"} 0', texto)
+        # Las cubetas son acumulativas
+        cuentas = [
+            int(linea.rsplit(" ", 1)[1])
+            for linea in texto.splitlines()
+            if linea.startswith("cine_operacion_segundos_bucket")
+        ]
+        self.assertEqual(cuentas, sorted(cuentas))
+
+    def test_exporta_json_o_prometheus_segun_la_extension(self):
+        operacion()
+        ruta = os.path.join(self.tmp.name, "m-{pid}.json")
+        metricas.configurar_metricas(ruta)
+        metricas.exportar()
+        ruta = ruta.replace("{pid}", str(os.getpid()))
+        with open(ruta, encoding="utf-8") as f:
+            self.assertEqual(json.load(f)["prueba"]["cuenta"], 1)
+        prometheus = os.path.join(self.tmp.name, "m.prom")
+        metricas.exportar(prometheus)
+        with open(prometheus, encoding="utf-8") as f:
+            self.assertTrue(f.read().startswith("# HELP"))
+
+    def test_costo_desactivadas(self):
+        metricas.configurar_metricas(None)
+        veces = 100_000
+        inicio = time.perf_counter()
+        for _ in range(veces):
+            operacion()
+        self.assertLess((time.perf_counter() - inicio) / veces, 2e-6)
+
+    def test_operaciones_del_cine(self):
+        ruta = self.tmp.name
+        almacen = almacenamiento.AlmacenamientoArchivos(
+            os.path.join(ruta, "peliculas.csv"),
+            os.path.join(ruta, "funciones.csv"),
+            os.path.join(ruta, "reservas.json"),
+            dir_indice=os.path.join(ruta, "ocupados.idx"),
+        )
+        previo = almacenamiento._almacen
+        almacenamiento.configurar_almacenamiento(almacen)
+        try:
+            funciones.guardar_funcion(
+                [
+                    {
+                        "id_funcion": "1",
+                        "id_pelicula": "1",
+                        "sala": "1",
+                        "hora": "10:00",
+                        "asientos_disponibles": 10,
+                        "asientos": {},
+                    }
+                ]
+            )
+            almacen.cache = type(almacen.cache)()  # obliga a releer el CSV
+            funciones.cargar_funciones()
+            reservas.guardar_reserva("Ana", "1", ["A1"])
+            with self.assertRaises(almacenamiento.AsientosOcupados):
+                reservas.guardar_reserva("Luis", "1", ["A1"])
+        finally:
+            almacenamiento.configurar_almacenamiento(previo)
+        resumen = metricas.como_json()
+        for nombre in ("guardar_funcion", "cargar_funciones"):
+            self.assertEqual(resumen[nombre]["cuenta"], 1, nombre)
+        self.assertIn("leer_csv_funciones", resumen)
+        self.assertEqual(
+            (
+                resumen["guardar_reserva"]["cuenta"],
+                resumen["guardar_reserva"]["errores"],
+            ),
+            (2, 1),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+import unittest
+from unittest.mock import MagicMock, patch
+
+import readchar
+
+from paginacion import Paginador, mostrar_paginado
+
+
+class TestPaginador(unittest.TestCase):
+    def test_lee_solo_lo_necesario(self):
+        leidas = []
+
+        def filas():
+            for i in range(1000):
+                leidas.append(i)
+                yield i
+
+        paginador = Paginador(filas(), tamano=10)
+        self.assertEqual(paginador.pagina(0), list(range(10)))
+        self.assertLessEqual(len(leidas), 11)
+        self.assertFalse(paginador.completo)
+
+    def test_ultima_pagina_y_fuera_de_rango(self):
+        paginador = Paginador(range(25), tamano=10)
+        self.assertEqual(paginador.pagina(2), [20, 21, 22, 23, 24])
+        self.assertTrue(paginador.completo)
+        self.assertEqual(paginador.leidas, 3)
+        self.assertEqual(paginador.pagina(3), [])
+        self.assertEqual(paginador.pagina(0), list(range(10)))
+
+    def test_cierra_el_generador(self):
+        cerrado = []
+
+        def filas():
+            try:
+                yield from range(100)
+            finally:
+                cerrado.append(True)
+
+        paginador = Paginador(filas(), tamano=10)
+        paginador.pagina(0)
+        paginador.cerrar()
+        self.assertEqual(cerrado, [True])
+
+
+class TestMostrarPaginado(unittest.TestCase):
+    def test_sin_filas(self):
+        console = MagicMock()
+        self.assertFalse(mostrar_paginado(console, [], list))
+        console.print.assert_not_called()
+
+    @patch("paginacion.readchar.readkey")
+    def test_una_pagina_no_espera_teclas(self, mock_readkey):
+        console = MagicMock()
+        self.assertTrue(mostrar_paginado(console, [1, 2], list, tamano=5))
+        console.print.assert_called_once_with([1, 2])
+        mock_readkey.assert_not_called()
+
+    @patch(
+        "paginacion.readchar.readkey",
+        side_effect=[readchar.key.RIGHT, readchar.key.RIGHT, readchar.key.LEFT, "q"],
+    )
+    def test_navegacion(self, mock_readkey):
+        console = MagicMock()
+        mostrar_paginado(console, range(12), list, tamano=5)
+        paginas = [
+            c.args[0]
+            for c in console.print.call_args_list
+            if isinstance(c.args[0], list)
+        ]
+        self.assertEqual(
+            paginas,
+            [[0, 1, 2, 3, 4], [5, 6, 7, 8, 9], [10, 11], [5, 6, 7, 8, 9]],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -69,8 +69,14 @@ class TestPeliculas(unittest.TestCase):
         read_data="ID,Titulo,Genero,Duracion_min\n1,Matrix,Acción,120\n",
     )
     @patch("Peliculas.pausar")
-    def test_eliminar_pelicula(self, mock_pausar, mock_file, mock_input):
+    @patch("os.replace")
+    @patch("os.fsync")
+    def test_eliminar_pelicula(
+        self, mock_fsync, mock_replace, mock_pausar, mock_file, mock_input
+    ):
         Peliculas.eliminar_pelicula()
+        # Se escribe en un temporal que reemplaza al original
+        mock_replace.assert_called_once_with("peliculas.csv.tmp", "peliculas.csv")
         handle = mock_file()
         written = "".join(call.args[0] for call in handle.write.call_args_list)
         # Debe contener solo los encabezados, sin la película eliminada
@@ -139,9 +145,10 @@ class TestPeliculas(unittest.TestCase):
         self.assertFalse(is_valid)
         self.assertIn("no existe", error)
 
+    @patch("os.fsync")
     @patch("os.replace")
     @patch("builtins.open", new_callable=mock_open)
-    def test_safe_write_csv(self, mock_open, mock_replace):
+    def test_safe_write_csv(self, mock_open, mock_replace, mock_fsync):
         fieldnames = ["ID", "Titulo"]
         rows = [{"ID": "1", "Titulo": "Test"}]
         Peliculas.safe_write_csv("test.csv", fieldnames, rows)
@@ -153,6 +160,8 @@ class TestPeliculas(unittest.TestCase):
         handle.write.assert_any_call("ID,Titulo\r\n")
         handle.write.assert_any_call("1,Test\r\n")
         mock_replace.assert_called_once_with("test.csv.tmp", "test.csv")
+        # fsync del temporal y del directorio
+        self.assertEqual(mock_fsync.call_count, 2)
 
     # --- Pruebas para funciones de carga y búsqueda ---
     @patch("os.path.exists", return_value=True)
@@ -0,0 +1,102 @@
+import glob
+import io
+import json
+import os
+import pstats
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from unittest.mock import patch
+
+import readchar
+
+import funciones
+import perfilado
+
+ENTER = readchar.key.ENTER
+
+
+def armar_asientos(cantidad):
+    asientos = [{"asiento": f"A{i}", "estado": "libre"} for i in range(cantidad)]
+    perfilado.punto("asientos")
+    return len(asientos)
+
+
+class TestPerfilado(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.directorio = os.path.join(self.tmp.name, "perfiles")
+        perfilado.configurar_perfilado(self.directorio)
+
+    def tearDown(self):
+        perfilado.configurar_perfilado(None)
+        self.tmp.cleanup()
+
+    def volcados(self):
+        return sorted(glob.glob(os.path.join(self.directorio, "*.json")))
+
+    def test_desactivado_no_vuelca(self):
+        perfilado.configurar_perfilado(None)
+        with perfilado.perfilar_accion("nada"):
+            armar_asientos(10)
+        self.assertFalse(
+            os.path.exists(self.directorio) and os.listdir(self.directorio)
+        )
+
+    def test_vuelca_perfil_y_memoria_por_accion(self):
+        with perfilado.perfilar_accion("armar"):
+            # Una acción dentro de otra no abre un perfil aparte
+            with perfilado.perfilar_accion("anidada"):
+                armar_asientos(20_000)
+        (volcado,) = self.volcados()
+        with open(volcado, encoding="utf-8") as f:
+            datos = json.load(f)
+        self.assertEqual(datos["accion"], "armar")
+        self.assertGreater(datos["pico_kib"], 1000)
+        # El punto ve los dicts de asientos vivos; al terminar ya se liberaron
+        lugar = datos["puntos"]["asientos"][0]
+        self.assertTrue(lugar["lugar"].startswith("test_perfilado.py:"))
+        self.assertGreater(lugar["kib"], 1000)
+        self.assertTrue(all(r["kib"] < 1000 for r in datos["retenido"]))
+
+        estadisticas = pstats.Stats(volcado[: -len(".json")] + ".prof")
+        nombres = {funcion for _, _, funcion in estadisticas.stats}
+        self.assertIn("armar_asientos", nombres)
+
+    def test_acciones_del_menu(self):
+        with (
+            # Ver funciones y luego bajar hasta VOLVER
+            patch(
+                "funciones.readchar.readkey",
+                side_effect=[ENTER] + [readchar.key.DOWN] * 3 + [ENTER],
+            ),
+            patch("funciones.limpiar_pantalla"),
+            patch("funciones.pausar_pantalla"),
+            patch("funciones.mostrar_tabla_peliculas", return_value={}),
+            patch("funciones.cargar_funciones", return_value=[]),
+            patch("funciones.console.print"),
+        ):
+            funciones.menu_funciones()
+        (volcado,) = self.volcados()
+        self.assertIn("-ver_funciones.json", volcado)
+
+    def test_informe_junta_los_volcados(self):
+        for _ in range(2):
+            with perfilado.perfilar_accion("armar"):
+                armar_asientos(5_000)
+        with perfilado.perfilar_accion("otra"):
+            pass
+        texto = perfilado.informe(self.directorio)
+        self.assertRegex(texto, r"armar\s+2 ")
+        self.assertIn("test_perfilado.py:", texto)
+        self.assertIn("armar_asientos", texto)
+        solo = perfilado.informe(self.directorio, accion="otra")
+        self.assertNotIn("armar ", solo)
+
+        with redirect_stdout(io.StringIO()) as salida:
+            self.assertEqual(perfilado.main([self.directorio, "--top", "5"]), 0)
+        self.assertIn("Funciones con más tiempo acumulado", salida.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,185 @@
+import io
+import os
+import tempfile
+import time
+import unittest
+from contextlib import redirect_stderr, redirect_stdout
+from unittest.mock import patch
+
+import almacenamiento
+import programador
+from horarios import IndiceHorarios, minutos
+
+
+class TestProgramador(unittest.TestCase):
+    duraciones = {"1": 154, "2": 90, "3": 120}
+
+    def assert_sin_superposiciones(self, nuevas, duraciones, limpieza=15):
+        indice = IndiceHorarios(limpieza)
+        for numero, fn in enumerate(nuevas):
+            duracion = duraciones[fn["id_pelicula"]]
+            self.assertEqual(indice.conflictos(fn["sala"], fn["hora"], duracion), [])
+            indice.agregar(str(numero), fn["sala"], fn["hora"], duracion)
+
+    def test_reparte_sin_superponer_y_antes_del_cierre(self):
+        nuevas, pendientes = programador.programar(
+            self.duraciones,
+            {"1": 120, "2": 80},
+            {"1": 3, "2": 3, "3": 2},
+            "10:00",
+            "23:30",
+            limpieza=15,
+        )
+        self.assertEqual((len(nuevas), pendientes), (8, {}))
+        self.assert_sin_superposiciones(nuevas, self.duraciones)
+        for fn in nuevas:
+            fin = minutos(fn["hora"]) + self.duraciones[fn["id_pelicula"]]
+            self.assertLessEqual(fin, minutos("23:30"))
+            self.assertEqual(minutos(fn["hora"]) % programador.PASO_MIN, 0)
+        # A la misma hora va primero la sala más grande
+        primera = min(nuevas, key=lambda fn: (fn["hora"], fn["sala"]))
+        self.assertEqual(
+            (primera["sala"], primera["asientos_disponibles"]), ("1", "120")
+        )
+
+    def test_informa_lo_que_no_entra(self):
+        nuevas, pendientes = programador.programar(
+            {"1": 154}, {"1": 100}, {"1": 10}, "10:00", "18:00", limpieza=15
+        )
+        self.assertEqual(len(nuevas), 2)
+        self.assertEqual(pendientes, {"1": 8})
+
+    def test_respeta_funciones_existentes(self):
+        horarios = IndiceHorarios(15)
+        horarios.agregar("7", "1", "12:00", 120)
+        nuevas, _ = programador.programar(
+            {"2": 90}, {"1": 100}, {"2": 3}, "10:00", "23:30", horarios=horarios
+        )
+        self.assertEqual([fn["hora"] for fn in nuevas], ["10:00", "14:15", "16:00"])
+
+    def test_50_salas_7_dias_en_menos_de_un_segundo(self):
+        duraciones = {str(i): 85 + (i * 7) % 80 for i in range(1, 41)}
+        salas = {str(s): 60 + s * 4 for s in range(1, 51)}
+        inicio = time.perf_counter()
+        total = 0
+        for dia in range(7):
+            # Cada día con otra mezcla de títulos y cantidades
+            objetivos = {
+                id_: 4 + (int(id_) + dia) % 8
+                for id_ in duraciones
+                if (int(id_) + dia) % 3
+            }
+            nuevas, _ = programador.programar(duraciones, salas, objetivos)
+            self.assert_sin_superposiciones(nuevas, duraciones)
+            total += len(nuevas)
+        self.assertLess(time.perf_counter() - inicio, 1.0)
+        self.assertGreater(total, 50 * 7 * 3)
+
+
+class TestProgramadorCLI(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        ruta = self.tmp.name
+        self.almacen = almacenamiento.AlmacenamientoArchivos(
+            os.path.join(ruta, "peliculas.csv"),
+            os.path.join(ruta, "funciones.csv"),
+            os.path.join(ruta, "reservas.json"),
+            dir_indice=os.path.join(ruta, "ocupados.idx"),
+        )
+        self.almacen.reemplazar_peliculas(
+            [
+                {
+                    "ID": "1",
+                    "Titulo": "Dune",
+                    "Genero": "Ciencia",
+                    "Duracion_min": "155",
+                },
+                {
+                    "ID": "2",
+                    "Titulo": "Coco",
+                    "Genero": "Animación",
+                    "Duracion_min": "105",
+                },
+            ]
+        )
+        self.almacen.reemplazar_funciones(
+            [
+                {
+                    "id_funcion": "4",
+                    "id_pelicula": "1",
+                    "sala": "1",
+                    "hora": "10:00",
+                    "asientos_disponibles": 50,
+                    "asientos": {},
+                }
+            ]
+        )
+        self.previo = almacenamiento._almacen
+        almacenamiento.configurar_almacenamiento(self.almacen)
+
+    def tearDown(self):
+        almacenamiento.configurar_almacenamiento(self.previo)
+        self.tmp.cleanup()
+
+    def test_guarda_la_cartelera_en_un_lote(self):
+        with redirect_stdout(io.StringIO()):
+            programador.main(["--salas", "1:100,2:80", "--objetivos", "1:2,2:2"])
+        funciones = self.almacen.leer_funciones()
+        self.assertEqual(
+            [fn["id_funcion"] for fn in funciones], ["4", "5", "6", "7", "8"]
+        )
+        self.assertEqual(funciones[1]["sala"], "1")
+        self.assertNotEqual(funciones[1]["hora"], "10:00")
+
+    def test_no_pisa_funciones_guardadas_mientras_programa(self):
+        leer = self.almacen.leer_funciones
+        pendiente = [True]
+
+        def leer_y_otra_terminal_guarda():
+            funciones = leer()
+            if pendiente:  # solo la primera lectura, la de la cartelera
+                pendiente.clear()
+                extra = {
+                    "id_funcion": "99",
+                    "id_pelicula": "2",
+                    "sala": "9",
+                    "hora": "10:00",
+                }
+                self.almacen.guardar_funciones([extra], modificadas=[extra])
+            return funciones
+
+        with (
+            patch.object(
+                self.almacen, "leer_funciones", side_effect=leer_y_otra_terminal_guarda
+            ),
+            redirect_stdout(io.StringIO()),
+        ):
+            self.assertEqual(
+                programador.main(["--salas", "1:100", "--objetivos", "1:1"]), 0
+            )
+        ids = [fn["id_funcion"] for fn in leer()]
+        self.assertIn("99", ids)
+        self.assertEqual(len(ids), 3)
+
+    def test_error_al_guardar_termina_con_1(self):
+        for metodo in ("reservar_ids", "guardar_funciones"):
+            with (
+                self.subTest(metodo),
+                patch.object(self.almacen, metodo, side_effect=OSError("disco lleno")),
+                redirect_stdout(io.StringIO()),
+                redirect_stderr(io.StringIO()) as errores,
+            ):
+                codigo = programador.main(["--salas", "1:100", "--objetivos", "1:1"])
+                self.assertEqual(codigo, 1)
+                self.assertIn("disco lleno", errores.getvalue())
+        self.assertEqual(len(self.almacen.leer_funciones()), 1)
+
+    def test_simular_no_guarda(self):
+        with redirect_stdout(io.StringIO()) as salida:
+            programador.main(["--salas", "3:100", "--por-titulo", "1", "--simular"])
+        self.assertIn("2 funciones programadas", salida.getvalue())
+        self.assertEqual(len(self.almacen.leer_funciones()), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -6,6 +6,7 @@ import unittest
 from unittest.mock import MagicMock, mock_open, patch
 
 import reservas
+from asientos import crear_mapa_asientos
 
 sys.modules["curses"] = MagicMock()
 sys.modules["curses.wrapper"] = MagicMock()
@@ -15,12 +16,17 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")
 
 
 class TestReservas(unittest.TestCase):
+    @patch("os.fsync")
+    @patch("os.replace")
     @patch("builtins.open", new_callable=mock_open, read_data="[]")
     @patch("os.path.exists", return_value=False)
-    def test_guardar_reserva_crea_archivo(self, mock_exists, mock_file):
+    def test_guardar_reserva_crea_archivo(
+        self, mock_exists, mock_file, mock_replace, mock_fsync
+    ):
         """Verifica que se cree el archivo y se escriba una reserva."""
         reservas.guardar_reserva("Zharith", "FUNC1", ["A1", "A2"])
-        mock_file.assert_called_once_with("reservas.json", "w", encoding="utf-8")
+        mock_file.assert_called_once_with("reservas.json.tmp", "w", encoding="utf-8")
+        mock_replace.assert_called_once_with("reservas.json.tmp", "reservas.json")
         handle = mock_file()
         handle.write.assert_called()  # Se escribió algo en el archivo
 
@@ -38,18 +44,16 @@ class TestReservas(unittest.TestCase):
         self.assertEqual(len(ocupados), 2)
 
     @patch(
-        "reservas.cargar_funciones",
-        return_value=[
-            {
-                "id_funcion": "FUNC2",
-                "asientos": {
-                    "A1": "libre",
-                    "A2": "libre",
-                    "B1": "libre",
-                    "B2": "libre",
-                },
-            }
-        ],
+        "reservas.cargar_funcion",
+        return_value={
+            "id_funcion": "FUNC2",
+            "asientos": {
+                "A1": "libre",
+                "A2": "libre",
+                "B1": "libre",
+                "B2": "libre",
+            },
+        },
     )
     @patch("reservas.cargar_ocupados", return_value=["A1", "A2"])
     @patch("reservas.guardar_reserva")
@@ -61,8 +65,27 @@ class TestReservas(unittest.TestCase):
         asientos = reservas.ejecutar_reserva("Zharith", "FUNC2")
         self.assertEqual(asientos, ["B1", "B2"])
         mock_guardar.assert_called_once_with("Zharith", "FUNC2", ["B1", "B2"])
+        # Carga solo la función elegida, no la cartelera completa
+        mock_funciones.assert_called_once_with("FUNC2")
 
-    @patch("reservas.cargar_funciones", return_value=[{"id_funcion": "FUNC3"}])
+    @patch(
+        "reservas.cargar_funcion",
+        return_value={"id_funcion": "FUNC2", "asientos": {"A1": "libre"}},
+    )
+    @patch(
+        "reservas.guardar_reserva",
+        side_effect=reservas.AsientosOcupados(["A1"]),
+    )
+    @patch("reservas.curses.wrapper", return_value=["A1"])
+    @patch("reservas.console.print")
+    def test_ejecutar_reserva_asiento_vendido_por_otra_caja(
+        self, mock_print, mock_wrapper, mock_guardar, mock_funciones
+    ):
+        """Si otro proceso vendió el asiento mientras se elegía, no se reserva."""
+        self.assertEqual(reservas.ejecutar_reserva("Zharith", "FUNC2"), [])
+        mock_guardar.assert_called_once()
+
+    @patch("reservas.cargar_funcion", return_value={"id_funcion": "FUNC3"})
     @patch("reservas.curses.wrapper", return_value=[])
     @patch("reservas.guardar_reserva")
     def test_ejecutar_reserva_sin_asientos(
@@ -73,6 +96,57 @@ class TestReservas(unittest.TestCase):
         self.assertEqual(resultado, [])
         mock_guardar.assert_not_called()
 
+    def pantalla(self, mock_curses, teclas, alto=40, ancho=120):
+        mock_curses.KEY_UP, mock_curses.KEY_DOWN = 259, 258
+        mock_curses.KEY_LEFT, mock_curses.KEY_RIGHT = 260, 261
+        mock_curses.KEY_RESIZE = 410
+        pantalla = MagicMock()
+        pantalla.getmaxyx.return_value = (alto, ancho)
+        pantalla.getch.side_effect = teclas
+        return pantalla
+
+    @patch("reservas.curses")
+    def test_seleccionar_mejores_asientos_con_una_tecla(self, mock_curses):
+        """La tecla 2 elige los dos mejores asientos juntos."""
+        mapa = crear_mapa_asientos(9)
+        mapa["A2"] = "ocupado"
+        pantalla = self.pantalla(mock_curses, [ord("2"), ord("q")])
+        self.assertEqual(reservas.seleccionar_asientos(pantalla, mapa), ["B2", "C2"])
+
+    @patch("reservas.curses")
+    def test_selector_repinta_solo_lo_que_cambia(self, mock_curses):
+        """Mover el cursor repinta dos celdas, sin borrar la pantalla."""
+        teclas = [261, ord("\n"), ord("q")]
+        pantalla = self.pantalla(mock_curses, [])
+        pintadas = []
+
+        def leer_tecla():
+            pintadas.append(pantalla.addstr.call_count)
+            return teclas.pop(0)
+
+        pantalla.getch.side_effect = leer_tecla
+        seleccion = reservas.seleccionar_asientos(pantalla, crear_mapa_asientos(100))
+        self.assertEqual(seleccion, ["B1"])
+        # Después del dibujo inicial: 2 celdas al mover, 1 al elegir
+        self.assertEqual(pintadas[1] - pintadas[0], 2)
+        self.assertEqual(pintadas[2] - pintadas[1], 1)
+        pantalla.erase.assert_called_once()
+        pantalla.clear.assert_not_called()
+
+    @patch("reservas.curses")
+    def test_selector_desplaza_salas_grandes(self, mock_curses):
+        """Una sala de 500 asientos se recorre en una terminal de 24x80."""
+        teclas = [258] * 21 + [261] * 21 + [ord("\n"), ord("q")]
+        pantalla = self.pantalla(mock_curses, teclas, alto=24, ancho=80)
+        seleccion = reservas.seleccionar_asientos(pantalla, crear_mapa_asientos(500))
+        self.assertEqual(seleccion, ["V22"])
+        y, x, texto = [
+            c.args[:3] for c in pantalla.addstr.call_args_list if "V22" in c.args[2]
+        ][-1]
+        self.assertLess(y, 24)
+        self.assertLessEqual(x + len(texto), 80)
+        self.assertGreater(pantalla.erase.call_count, 1)
+
     # --- Pruebas de validación y flujo principal ---
 
     @patch("reservas.cargar_funciones", return_value=[{"id_funcion": "F1"}])
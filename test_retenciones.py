@@ -0,0 +1,126 @@
+import os
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+
+from retenciones import RegistroRetenciones, SesionRetencion
+
+
+class Reloj:
+    def __init__(self):
+        self.ahora = 1000.0
+
+    def __call__(self):
+        return self.ahora
+
+
+class TestRetenciones(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.ruta = os.path.join(self.tmp.name, "retenciones.json")
+        self.reloj = Reloj()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def registro(self):
+        # Cada registro es como otra caja: comparte solo el archivo
+        return RegistroRetenciones(self.ruta, ttl=300, reloj=self.reloj)
+
+    def test_retener_bloquea_a_otra_caja(self):
+        caja1, caja2 = self.registro(), self.registro()
+        self.assertEqual(caja1.retener("1", ["A1", "A2"], "c1"), [])
+        self.assertEqual(caja2.retener("1", ["A2", "A3"], "c2"), ["A2"])
+        self.assertEqual(caja2.retenidos("1", excepto="c2"), {"A1": "c1", "A2": "c1"})
+        # Otra función no se ve afectada
+        self.assertEqual(caja2.retener("2", ["A1"], "c2"), [])
+
+    def test_vencen_con_el_ttl(self):
+        caja1, caja2 = self.registro(), self.registro()
+        caja1.retener("1", ["A1"], "c1")
+        self.reloj.ahora += 299
+        self.assertEqual(caja2.retener("1", ["A1"], "c2"), ["A1"])
+        self.reloj.ahora += 1
+        self.assertEqual(caja2.retener("1", ["A1"], "c2"), [])
+
+    def test_renovar_extiende_y_el_heap_ignora_lo_viejo(self):
+        caja1, caja2 = self.registro(), self.registro()
+        caja1.retener("1", ["A1"], "c1")
+        self.reloj.ahora += 200
+        self.assertEqual(caja1.renovar("1", "c1"), ["A1"])
+        self.reloj.ahora += 200  # venció el plazo original, no el renovado
+        self.assertEqual(caja2.retener("1", ["A1"], "c2"), ["A1"])
+        self.assertEqual(caja1.retenidos("1"), {"A1": "c1"})
+
+    @patch("os.fsync")
+    def test_retener_y_renovar_no_sincronizan(self, mock_fsync):
+        caja1, caja2 = self.registro(), self.registro()
+        caja1.retener("1", ["A1"], "c1")
+        caja1.renovar("1", "c1")
+        self.assertEqual(caja2.retener("1", ["A1"], "c2"), ["A1"])
+        mock_fsync.assert_not_called()
+        self.assertFalse(os.path.exists(self.ruta + ".tmp"))
+
+    def test_retenidos_y_retener_desde_dos_hilos(self):
+        # Como la API y el menú: el mismo registro desde hilos distintos
+        registro = self.registro()
+        errores = []
+        listo = threading.Event()
+
+        def consultar():
+            try:
+                while not listo.is_set():
+                    registro.retenidos("1")
+            except Exception as e:  # pragma: no cover - es lo que se busca evitar
+                errores.append(e)
+
+        hilo = threading.Thread(target=consultar)
+        hilo.start()
+        try:
+            for i in range(200):
+                self.assertEqual(registro.retener("1", [f"A{i}"], "c1"), [])
+                if i % 2:
+                    registro.liberar("1", "c1", [f"A{i}"])
+        finally:
+            listo.set()
+            hilo.join()
+        self.assertEqual(errores, [])
+        self.assertEqual(len(registro.retenidos("1")), 100)
+        # Otra caja ve las mismas retenciones en el archivo
+        self.assertEqual(len(self.registro().retenidos("1")), 100)
+
+    def test_liberar(self):
+        caja1, caja2 = self.registro(), self.registro()
+        caja1.retener("1", ["A1", "A2"], "c1")
+        caja1.liberar("1", "c1", ["A1"])
+        self.assertEqual(caja2.retener("1", ["A1", "A2"], "c2"), ["A2"])
+        caja1.liberar("1", "c1")
+        self.assertEqual(caja2.retener("1", ["A2"], "c2"), [])
+
+    def test_sesion(self):
+        sesion = SesionRetencion(self.registro(), "1", "c1")
+        otra = SesionRetencion(self.registro(), "1", "c2")
+        self.assertTrue(sesion.tomar("A1"))
+        self.assertFalse(otra.tomar("A1"))
+        self.assertEqual(otra.ajenos(), {"A1"})
+
+        # Vence, otra caja lo toma y la confirmación lo detecta
+        self.reloj.ahora += 301
+        self.assertTrue(otra.tomar("A1"))
+        self.assertEqual(sesion.perdidos(["A1"]), ["A1"])
+
+        otra.liberar_todo()
+        self.assertEqual(sesion.perdidos(["A1"]), [])
+        self.assertEqual(otra.ajenos(), {"A1"})
+
+    def test_sesion_sin_retenciones_no_escribe(self):
+        sesion = SesionRetencion(self.registro(), "1")
+        self.assertEqual(sesion.perdidos(["A1"]), [])
+        sesion.renovar_si_hace_falta()
+        sesion.liberar_todo()
+        self.assertFalse(os.path.exists(self.ruta))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,162 @@
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+import almacenamiento
+from secuencias import TAMANO_REGISTRO, Secuencia, mayor_id
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+RAIZ = os.path.dirname(os.path.abspath(__file__))
+
+# Cada proceso pide 50 ids de a uno y los imprime
+PEDIR = """
+import sys
+from secuencias import Secuencia
+secuencia = Secuencia(sys.argv[1], bloque=int(sys.argv[2]))
+print(" ".join(str(secuencia.siguiente()) for _ in range(50)))
+"""
+
+
+class TestSecuencia(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.ruta = os.path.join(self.tmp.name, "reservas.json.seq")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_mayor_id(self):
+        self.assertEqual(mayor_id(["3", " 12 ", "a7", "", None]), 12)
+        self.assertEqual(mayor_id([]), 0)
+
+    def test_arranca_desde_la_semilla_y_persiste(self):
+        self.assertEqual(Secuencia(self.ruta, lambda: 41).siguiente(), 42)
+        # Otra instancia (otro proceso) sigue desde lo guardado, sin semilla
+        otra = Secuencia(self.ruta, lambda: 0)
+        self.assertEqual(list(otra.reservar(3)), [43, 44, 45])
+
+    def test_bloques_por_proceso(self):
+        a = Secuencia(self.ruta, bloque=10)
+        b = Secuencia(self.ruta, bloque=10)
+        self.assertEqual([a.siguiente(), a.siguiente()], [1, 2])
+        self.assertEqual(b.siguiente(), 11)
+        self.assertEqual(a.siguiente(), 3)
+
+    def test_asegurar_solo_avanza(self):
+        secuencia = Secuencia(self.ruta)
+        secuencia.asegurar(20)
+        secuencia.asegurar(5)
+        self.assertEqual(secuencia.siguiente(), 21)
+
+    def test_registro_cortado_usa_el_anterior(self):
+        self.assertEqual(list(Secuencia(self.ruta).reservar(5)), [1, 2, 3, 4, 5])
+        # Un corte a mitad de la escritura del registro siguiente: esos ids
+        # nunca se entregaron, así que se sigue desde el registro anterior
+        with open(self.ruta, "r+b") as f:
+            f.seek(0)
+            f.write(b"2 6 1c29")
+        self.assertEqual(Secuencia(self.ruta).siguiente(), 6)
+
+    @unittest.skipIf(fcntl is None, "fcntl no disponible")
+    def test_procesos_concurrentes_no_repiten(self):
+        entorno = dict(os.environ, PYTHONPATH=RAIZ, CINE_FSYNC="0")
+        procesos = [
+            subprocess.Popen(
+                [sys.executable, "-c", PEDIR, self.ruta, str(bloque)],
+                stdout=subprocess.PIPE,
+                text=True,
+                env=entorno,
+            )
+            for bloque in (1, 1, 7, 7)
+        ]
+        ids = [int(i) for p in procesos for i in p.communicate(timeout=60)[0].split()]
+        self.assertEqual(len(ids), 200)
+        self.assertEqual(len(set(ids)), 200)
+        self.assertEqual(os.path.getsize(self.ruta), 2 * TAMANO_REGISTRO)
+
+
+class TestIdsAlmacenamiento(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def archivos(self, modo="json"):
+        ruta = self.tmp.name
+        return almacenamiento.AlmacenamientoArchivos(
+            os.path.join(ruta, "peliculas.csv"),
+            os.path.join(ruta, "funciones.csv"),
+            os.path.join(ruta, "reservas.json"),
+            modo_reservas=modo,
+            ruta_diario=os.path.join(ruta, "reservas.jsonl"),
+            dir_indice=os.path.join(ruta, "ocupados.idx"),
+        )
+
+    def borrar_y_reservar(self, almacen):
+        almacen.insertar_reserva("Ana", "1", ["A1"])
+        almacen.insertar_reserva("Luis", "1", ["A2"])
+        almacen.reemplazar_reservas(almacen.leer_reservas()[:1])
+        nueva = almacen.insertar_reserva("Eva", "1", ["A3"])
+        self.assertEqual(nueva["id_reserva"], 3)
+
+    def test_reserva_borrada_no_repite_id_json(self):
+        self.borrar_y_reservar(self.archivos())
+
+    def test_reserva_borrada_no_repite_id_diario(self):
+        self.borrar_y_reservar(self.archivos("diario"))
+
+    def test_reserva_borrada_no_repite_id_sqlite(self):
+        almacen = almacenamiento.AlmacenamientoSQLite(
+            os.path.join(self.tmp.name, "cine.db")
+        )
+        try:
+            self.borrar_y_reservar(almacen)
+        finally:
+            almacen.cerrar()
+
+    def test_semilla_desde_los_datos(self):
+        almacen = self.archivos()
+        almacen.reemplazar_funciones(
+            [{"id_funcion": "9", "id_pelicula": "1", "sala": "1", "hora": "10:00"}]
+        )
+        os.remove(almacen.secuencias["funciones"].ruta)
+        self.assertEqual(self.archivos().siguiente_id("funciones"), 10)
+
+    def test_pelicula_eliminada_no_repite_id(self):
+        for almacen in (
+            self.archivos(),
+            almacenamiento.AlmacenamientoSQLite(os.path.join(self.tmp.name, "c.db")),
+        ):
+            id_ = almacen.siguiente_id_pelicula()
+            almacen.insertar_pelicula(
+                {
+                    "ID": id_,
+                    "Titulo": "Dune",
+                    "Genero": "Ciencia",
+                    "Duracion_min": "155",
+                }
+            )
+            almacen.eliminar_pelicula(id_)
+            self.assertEqual(almacen.siguiente_id_pelicula(), "2")
+            almacen.insertar_pelicula(
+                {
+                    "ID": "30",
+                    "Titulo": "Coco",
+                    "Genero": "Animación",
+                    "Duracion_min": "105",
+                }
+            )
+            self.assertEqual(list(almacen.reservar_ids("peliculas", 2)), [31, 32])
+            if almacen.nombre == "sqlite":
+                almacen.cerrar()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+import unittest
+
+from funciones import validar_hora
+from Peliculas import validar_texto
+from validacion import (
+    TEXTO_PELICULA,
+    validar_columna,
+    validar_filas,
+    validar_nombre,
+    validar_textos,
+)
+
+
+class TestValidacion(unittest.TestCase):
+    def test_columna_valida_cada_valor_distinto_una_vez(self):
+        llamadas = []
+
+        def validar(valor, campo):
+            llamadas.append(valor)
+            return validar_hora(valor, campo)
+
+        resultados, errores = validar_columna(
+            ["9:30", "25:00", "9:30", "9:30"], validar, "Hora"
+        )
+        self.assertEqual(resultados, ["09:30", None, "09:30", "09:30"])
+        self.assertEqual(errores, {1: "Hora fuera de rango. Usa 00:00-23:59."})
+        self.assertEqual(llamadas, ["9:30", "25:00"])
+
+    def test_textos_camino_rapido_y_errores_por_fila(self):
+        resultados, errores = validar_textos(
+            [" Dune ", "Coco"], validar_texto, TEXTO_PELICULA, "Título", 120
+        )
+        self.assertEqual((resultados, errores), (["Dune", "Coco"], {}))
+
+        resultados, errores = validar_textos(
+            ["Dune", "", "Con @", "a" * 121],
+            validar_texto,
+            TEXTO_PELICULA,
+            "Título",
+            120,
+        )
+        self.assertEqual(resultados, ["Dune", None, None, None])
+        self.assertEqual(sorted(errores), [1, 2, 3])
+        self.assertIn("caracteres inválidos", errores[2])
+
+    def test_filas_reporta_todos_los_errores_de_la_fila(self):
+        reglas = {
+            "nombre": ("nombre_cliente", lambda v: validar_columna(v, validar_nombre)),
+            "hora": ("hora", lambda v: validar_columna(v, validar_hora, "Hora")),
+        }
+        limpias, errores = validar_filas(
+            [
+                {"nombre_cliente": "Ana", "hora": "10:00"},
+                {"nombre_cliente": "R2D2", "hora": "10-00"},
+            ],
+            reglas,
+        )
+        self.assertEqual(limpias, [{"nombre": "Ana", "hora": "10:00"}, None])
+        self.assertEqual(len(errores[1]), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+"""
+Patrones de validación compilados una sola vez y validación por columnas.
+
+Los formularios (validar_texto, validar_hora, ...) y la carga masiva usan
+los mismos patrones de este módulo. Para lotes grandes, las funciones de
+columna reciben la lista de valores de un campo y devuelven los errores por
+fila, en lugar de validar registro por registro:
+
+- validar_columna valida cada valor distinto una sola vez (géneros, salas
+  y horarios se repiten mucho en una cartelera);
+- validar_textos comprueba la columna completa con una única búsqueda del
+  patrón y solo recorre valor por valor si algo falla.
+"""
+
+import re
+
+# Texto de películas: letras, números, espacios, guiones, comas y puntos
+TEXTO_PELICULA = re.compile(r"[A-Za-zÁÉÍÓÚáéíóú0-9\s\-\.,]+")
+# Texto de funciones: letras, números, espacios, guiones y dos puntos
+TEXTO_FUNCION = re.compile(r"[A-Za-zÁÉÍÓÚáéíóú0-9\s\-:]+")
+NOMBRE_CLIENTE = re.compile(r"[A-Za-zÁÉÍÓÚáéíóúÑñ\s]+")
+HORA = re.compile(r"(\d{1,2}):(\d{2})")
+
+
+def validar_nombre(valor: str, campo: str = "El nombre") -> str:
+    """Nombre de cliente: solo letras y espacios. Devuelve el valor limpio."""
+    valor = (valor or "").strip()
+    if not valor:
+        raise ValueError(f"{campo} no puede estar vacío.")
+    if not NOMBRE_CLIENTE.fullmatch(valor):
+        raise ValueError(f"{campo} solo puede contener letras y espacios.")
+    return valor
+
+
+def validar_columna(valores: list, validar, *args):
+    """
+    Aplica `validar(valor, *args)` a cada valor (hashable) de la columna,
+    una vez por valor distinto. Devuelve (resultados, errores): resultados
+    tiene None en las filas inválidas y errores mapea fila -> mensaje.
+    """
+    validos = {}
+    invalidos = {}
+    for valor in dict.fromkeys(valores):
+        try:
+            validos[valor] = validar(valor, *args)
+        except ValueError as e:
+            invalidos[valor] = str(e).strip()
+    if not invalidos:
+        return list(map(validos.__getitem__, valores)), {}
+    errores = {i: invalidos[v] for i, v in enumerate(valores) if v in invalidos}
+    return [validos.get(valor) for valor in valores], errores
+
+
+def validar_textos(valores: list, validar, patron, campo: str, max_len: int):
+    """
+    validar_columna para un validar_texto(valor, campo, max_len) cuyo patrón
+    admite espacios: si ningún valor está vacío ni pasa de max_len y la
+    columna unida con saltos de línea cumple `patron`, todos son válidos.
+    """
+    limpios = [(valor or "").strip() for valor in valores]
+    if (
+        limpios
+        and all(limpios)
+        and max(map(len, limpios)) <= max_len
+        and patron.fullmatch("\n".join(limpios))
+    ):
+        return limpios, {}
+    return validar_columna(valores, validar, campo, max_len)
+
+
+def validar_filas(filas: list, reglas: dict):
+    """
+    Valida una lista de filas (dicts) columna por columna. `reglas` mapea
+    cada columna de salida a (clave de entrada, validar_col), donde
+    validar_col(valores) devuelve (resultados, errores) como las funciones
+    de arriba. Devuelve (limpias, errores): limpias tiene un dict por fila
+    válida y None en las inválidas; errores mapea fila -> lista de mensajes.
+    """
+    columnas = []
+    errores = {}
+    for clave, validar_col in reglas.values():
+        resultados, fallidas = validar_col([fila.get(clave, "") for fila in filas])
+        columnas.append(resultados)
+        for indice, mensaje in fallidas.items():
+            errores.setdefault(indice, []).append(mensaje)
+    nombres = list(reglas)
+    limpias = [dict(zip(nombres, valores)) for valores in zip(*columnas)]
+    for indice in errores:
+        limpias[indice] = None
+    return limpias, errores